@@ -0,0 +1,472 @@
+"""
+Shared arena - many ships fly through one asteroid field at once, so spawning, moving and
+colliding the asteroids is paid once per frame for all of them rather than once per ship.
+
+The ships don't meet: each one has its own position, lives, score and shots. The field
+keeps track of whose game each of its asteroids is in - one that a ship crashes into or
+shoots down is only gone from that ship's game, and the fragments it splits into only
+join that ship's game. A ship alone in the arena plays the very game `Game.sim` plays.
+"""
+
+import math
+from typing import TYPE_CHECKING, Optional, Sequence
+
+import numpy as np
+
+from ai.nn import StackedNetworks
+from budget import EvalBudget, SimResult, Termination
+from constants import (
+    PHYSICS_STEP,
+    PLAYER_LIVES,
+    PLAYER_RADIUS,
+    PLAYER_SHOOT_COOLDOWN,
+    PLAYER_SHOOT_SPEED,
+    PLAYER_SPEED,
+    PLAYER_TURN_SPEED,
+    PRIMARY_WEOPON_DAMAGE,
+    SCREEN_DIAGONAL,
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+    SHOT_RADIUS,
+)
+from game_state import NN_INPUTS
+from vector_world import (
+    ASTEROID,
+    CENTER,
+    COLUMNS,
+    HALF_SIZE,
+    HEALTH,
+    KIND,
+    POS,
+    RADIUS,
+    SHOT,
+    VEL,
+    VectorGame,
+)
+
+if TYPE_CHECKING:
+    from ai.nn import NDArray, NeuralNetwork
+
+OWNER = COLUMNS
+"""Extra column of the ships' shots, the ship they belong to."""
+
+
+def _round(values: "NDArray") -> "NDArray":
+    """`round(value, 3)` of every value - NumPy's own rounding differs on near ties."""
+    rounded = np.round(values, 3)
+    scaled = values * 1000
+    near_ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    rounded[near_ties] = [round(value, 3) for value in values[near_ties].tolist()]
+    return rounded
+
+
+class _Field(VectorGame):
+    """
+    The shared asteroid field, a `VectorGame` whose collisions are resolved by the arena
+    for every ship's game. Its own player (row 0) isn't in any of them.
+    """
+
+    def __init__(self, arena: "SharedArena", seed: Optional[int] = None):
+        super().__init__(seed=seed)
+        self.arena = arena
+
+    def _collide(self, alive: "NDArray") -> None:
+        self.arena._collide(alive)
+
+
+class SharedArena:
+    """
+    Plays a game per network on the field of `seed`, all of them advancing a frame at a
+    time with one batched NN forward pass, like `BatchedSim`. The results mean what the
+    ones of `Game.sim` do - survived frames and score, with the same budgets and the same
+    penalty for ships that don't use all their actions.
+
+    A ship alone in the arena ends exactly as in a game of its own. With company it
+    plays a game of the same kind, not that one: asteroids only the others still have
+    keep bumping into its asteroids, and everybody's splits draw from the field's random
+    stream, which moves the spawns. Arena fitness is never mixed with the one of the
+    other backends, `benchmarks/bench_arena.py` shows how close the two are.
+    """
+
+    def __init__(
+        self,
+        networks: Sequence["NeuralNetwork"],
+        seed: Optional[int] = None,
+        dt: float = PHYSICS_STEP,
+        budget: Optional[EvalBudget] = None,
+    ):
+        count = len(networks)
+        self.dt = dt
+        self.budget = budget
+        """Limits of every ship's game, see `Game.sim`."""
+        self.networks = StackedNetworks(networks)
+        self.field = _Field(self, seed)
+
+        self.position = np.tile([SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2], (count, 1))
+        self.rotation = np.zeros(count)
+        self.shot_timer = np.zeros(count)
+        self.score = np.zeros(count)
+        self.lives = np.full(count, PLAYER_LIVES)
+        self.alive = np.ones(count, dtype=bool)
+        self.shots_fired = np.zeros(count, dtype=int)
+        self.shots_hit = np.zeros(count, dtype=int)
+
+        self.present = np.zeros((count, self.field.count), dtype=bool)
+        """(ships, field rows) mask of the asteroids in every ship's game."""
+        self.health = np.zeros((count, self.field.count))
+        """Health the asteroids have left in every ship's game, in field row order."""
+        self.own = np.zeros((64, COLUMNS + 1))
+        """The ships' shots, rows laid out as `VectorGame.table` plus `OWNER`."""
+        self.own_count = 0
+
+        self.running = np.arange(count)
+        """The ships whose games are still on."""
+        self.frame = 0
+        self.results: list[Optional[SimResult]] = [None] * count
+        """Result of every ship's game, None while it's running."""
+        self._taken_actions = [set() for _ in range(count)]
+        self._trackers = [
+            budget.tracker(dt) if budget is not None else None for _ in range(count)
+        ]
+        self._shot_alive = np.zeros(0, dtype=bool)
+        """Which of the shots are still flying this frame."""
+        self._kept = np.zeros(0, dtype=bool)
+        """Which of the field's rows its last step kept."""
+        self._split_by: list[int] = []
+        """The ship that split off each fragment waiting in `field._spawned`."""
+
+    @property
+    def own_rows(self) -> "NDArray":
+        return self.own[: self.own_count]
+
+    def run(self) -> list[SimResult]:
+        """Plays all games to the end, returns their results in the order of the networks."""
+        while len(self.running):
+            self.step()
+        return self.results  # type: ignore
+
+    def step(self) -> None:
+        """Retires the games that are over, then plays a frame of the others."""
+        self._retire()
+        running = self.running
+        if not len(running):
+            return
+
+        # a ship without asteroids in sight has no inputs, its action is thrown away
+        inputs, has_inputs = self._inputs(running)
+        actions = self.networks.predict(inputs)
+        for g, action, act in zip(running.tolist(), actions.tolist(), has_inputs.tolist()):
+            self._taken_actions[g].add(action if act else None)
+        self._act(running[has_inputs], actions[has_inputs])
+        self._update()
+        self.frame += 1
+
+    def _retire(self) -> None:
+        """Records the results of the games that are over and takes their ships out."""
+        running = self.running.tolist()
+        reasons = [self._termination(g) for g in running]
+        keep = [k for k, reason in enumerate(reasons) if reason is None]
+        if len(keep) == len(running):
+            return
+        for g, reason in zip(running, reasons):
+            if reason is not None:
+                # punish the ships that are not using all outputs
+                if len(self._taken_actions[g]) < 4:
+                    self.results[g] = SimResult(0, 0, reason)
+                else:
+                    self.results[g] = SimResult(self.frame, float(self.score[g]), reason)
+                # its asteroids leave the field unless another game has them
+                self.present[g] = False
+        self.running = self.running[keep]
+        self.networks.select(keep)
+        self._keep_own(np.isin(self.own_rows[:, OWNER], self.running))
+
+    def _termination(self, ship: int) -> Optional[Termination]:
+        """Why a ship's game has to end before the next frame, see `VectorGame.termination`."""
+        if not self.alive[ship]:
+            return Termination.DIED
+        tracker = self._trackers[ship]
+        if tracker is None:
+            return None
+        x, y = self.position[ship].tolist()
+        return tracker.check(self.frame, float(self.score[ship]), x, y)
+
+    def _inputs(self, running: "NDArray") -> tuple["NDArray", "NDArray"]:
+        """
+        NN inputs of the running ships, see `VectorGame.get_inputs`, and which of them
+        have an asteroid in sight at all.
+        """
+        rows = self.field.rows
+        # positions as complex numbers, `abs` is the same `hypot` `VectorGame` takes
+        delta = self.position[running].view(np.complex128) - rows[:, POS].view(np.complex128).T
+        dists = np.abs(delta)
+        dists[~self.present[running]] = np.inf
+        nearest = dists.argmin(axis=1)
+        distance = dists[np.arange(len(running)), nearest]
+        has_inputs = np.isfinite(distance)
+
+        nearest = nearest[has_inputs]
+        delta = delta[has_inputs, nearest]
+        dx, dy = delta.real.tolist(), delta.imag.tolist()
+        rotation = self.rotation[running[has_inputs]]
+        # `math.atan2` for the very angles `VectorGame` sees
+        angle = np.array(
+            [
+                (math.degrees(math.atan2(y, x)) - r) % 360
+                for x, y, r in zip(dx, dy, rotation.tolist())
+            ]
+        )
+        velocity = rows[nearest, VEL]
+
+        inputs = np.zeros((len(running), NN_INPUTS))
+        inputs[has_inputs, 0] = (_round(rotation) - 180) / 180
+        inputs[has_inputs, 1] = _round(distance[has_inputs]) / SCREEN_DIAGONAL
+        inputs[has_inputs, 2] = (angle - 180) / 180
+        # the ships never have a velocity of their own
+        inputs[has_inputs, 3] = _round(velocity[:, 0]) / SCREEN_WIDTH
+        inputs[has_inputs, 4] = _round(velocity[:, 1]) / SCREEN_HEIGHT
+        return inputs, has_inputs
+
+    def _act(self, ships: "NDArray", actions: "NDArray") -> None:
+        """Carries out the actions chosen by the AIs, see `VectorGame.act`."""
+        dt = self.dt
+        moving = ships[actions == 0]
+        if len(moving):
+            position = self.position[moving] + self._forward(moving) * PLAYER_SPEED * dt
+            # wrapped around the screen the same lopsided way as `Player.move`
+            for axis, size in ((0, SCREEN_WIDTH), (1, SCREEN_HEIGHT)):
+                coordinate = position[:, axis]
+                coordinate[:] = np.where(
+                    coordinate < 0, size, np.where(coordinate > size, coordinate - size, coordinate)
+                )
+            self.position[moving] = position
+
+        turning = ships[(actions == 1) | (actions == 2)]
+        if len(turning):
+            rotation = self.rotation[turning] + PLAYER_TURN_SPEED * dt
+            rotation = np.where(rotation < 0, rotation + 360, rotation)
+            self.rotation[turning] = np.where(rotation > 360, rotation - 360, rotation)
+
+        shooting = ships[actions == 3]
+        shooting = shooting[self.shot_timer[shooting] <= 0]
+        if len(shooting):
+            rows = self._append_own(len(shooting))
+            rows[:, POS] = self.position[shooting]
+            rows[:, VEL] = self._forward(shooting) * PLAYER_SHOOT_SPEED
+            rows[:, RADIUS] = SHOT_RADIUS
+            rows[:, HEALTH] = PRIMARY_WEOPON_DAMAGE
+            rows[:, KIND] = SHOT
+            rows[:, OWNER] = shooting
+            rows[:, HALF_SIZE] = SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2
+            self.shot_timer[shooting] = PLAYER_SHOOT_COOLDOWN
+            self.shots_fired[shooting] += 1
+
+    def _forward(self, ships: "NDArray") -> "NDArray":
+        """Unit vectors the ships are facing, with `VectorPlayer.forward`'s maths."""
+        angles = [math.radians(rotation) for rotation in self.rotation[ships].tolist()]
+        return np.array([(-math.sin(angle), math.cos(angle)) for angle in angles])
+
+    def _update(self) -> None:
+        """Advances the arena by one frame, the field once for every ship."""
+        dt = self.dt
+        self.shot_timer -= dt
+        shots = self.own_rows
+        shots[:, POS] += shots[:, VEL] * dt
+        inside = np.abs(shots[:, POS] - shots[:, CENTER]) <= shots[:, HALF_SIZE]
+        self._shot_alive = inside[:, 0] & inside[:, 1]
+
+        # the field's step has the arena resolve the collisions, see `_collide`
+        self.field.step(dt=dt)
+        if not self._kept.all():
+            self.present = self.present[:, self._kept]
+            self.health = self.health[:, self._kept]
+        # the fragments of a split are only in the game of the ship that split it
+        fragments = np.zeros((len(self.alive), len(self._split_by)), dtype=bool)
+        fragments[self._split_by, np.arange(len(self._split_by))] = True
+        self._add_columns(fragments)
+        self._split_by.clear()
+        self._keep_own(self._shot_alive)
+
+    def _add_columns(self, present: "NDArray") -> None:
+        """Adds the games of the asteroids appended to the field last, at full health."""
+        if not present.shape[1]:
+            return
+        health = self.field.rows[-present.shape[1] :, HEALTH]
+        self.present = np.concatenate((self.present, present), axis=1)
+        self.health = np.concatenate(
+            (self.health, np.repeat(health[None], len(present), axis=0)), axis=1
+        )
+
+    def _collide(self, alive: "NDArray") -> None:
+        """
+        `VectorGame._collide_in_order` with a player per game - asteroid by asteroid in
+        spawn order, the ships it hits first, then the asteroids it bumps into, then the
+        shots. Two asteroids only bump into each other if they're in a game together,
+        asteroids that are in no game anymore are dropped from `alive`.
+        """
+        field = self.field
+        new = field.count - self.present.shape[1]
+        if new:
+            # an asteroid the field spawns is in every game that's still on
+            playing = np.zeros((len(self.alive), new), dtype=bool)
+            playing[self.running] = True
+            self._add_columns(playing)
+
+        self._collide_games(alive)
+        alive[1:] &= self.present[:, 1:].any(axis=0)
+        self._kept = alive
+
+    def _collide_games(self, alive: "NDArray") -> None:
+        """The collision pass, it updates `present`, the ships and their shots in place."""
+        field = self.field
+        rows = field.rows
+        present = self.present
+        asteroids = np.flatnonzero(alive & present.any(axis=0))
+        if not len(asteroids):
+            return
+        z = rows[:, POS].view(np.complex128)[:, 0]
+        radius = rows[:, RADIUS]
+        here = z[asteroids]
+        reach = radius[asteroids]
+        own = self.own_rows
+        shot_alive = self._shot_alive
+        shots = np.flatnonzero(shot_alive)
+
+        # the contacts at the frame's start, by field row
+        ships = np.flatnonzero(self.alive)
+        ship_z = self.position.view(np.complex128)[:, 0]
+        hit_ships = np.abs(ship_z[ships][:, None] - here) <= reach + PLAYER_RADIUS
+        hit_ships &= present[ships][:, asteroids]
+        shot_z = own[:, POS].view(np.complex128)[:, 0]
+        owner = own[:, OWNER].astype(int)
+        hit_shots = np.abs(shot_z[shots][:, None] - here) <= reach + SHOT_RADIUS
+        hit_shots &= present[owner[shots]][:, asteroids]
+        first, second = np.nonzero(np.abs(here[:, None] - here) <= reach[:, None] + reach)
+        later = first < second
+        first, second = asteroids[first[later]], asteroids[second[later]]
+        # only asteroids that are in a game together bump into each other
+        together = (present[:, first] & present[:, second]).any(axis=0)
+        first, second = first[together], second[together]
+        if not (hit_ships.any() or hit_shots.any() or len(first)):
+            return
+
+        ships_touching: dict[int, list[int]] = {}
+        for s, k in zip(*hit_ships.nonzero()):
+            ships_touching.setdefault(int(asteroids[k]), []).append(int(ships[s]))
+        shots_touching: dict[int, list[int]] = {}
+        for k, s in zip(*hit_shots.T.nonzero()):
+            shots_touching.setdefault(int(asteroids[k]), []).append(int(shots[s]))
+        other_asteroids: dict[int, list[int]] = {}
+        for a, b in zip(first.tolist(), second.tolist()):
+            other_asteroids.setdefault(a, []).append(b)
+        touched = {*ships_touching, *shots_touching, *other_asteroids}
+
+        positions = z.tolist()
+        is_asteroid = rows[:, KIND] == ASTEROID
+        # where the asteroids pushed apart so far are, the others haven't moved
+        pushed = {}
+        for a in asteroids.tolist():
+            # untouched asteroids only come into play once asteroids were pushed around
+            if not pushed and a not in touched:
+                continue
+            games = present[:, a].copy()
+            reach_a = radius[a]
+            here_a = pushed.get(a, positions[a])
+            if a in pushed:
+                touching = np.abs(ship_z[ships] - here_a) <= reach_a + PLAYER_RADIUS
+                hit = ships[touching & games[ships]].tolist()
+            else:
+                hit = ships_touching.get(a, [])
+            for ship in hit:
+                if self.alive[ship]:
+                    present[ship, a] = False
+                    self._respawn(ship, points_lost=reach_a * 1.5 / 2)
+
+            if a in pushed:
+                others = field._touching(a, a + 1, is_asteroid)
+            else:
+                # asteroids only move when pushed, the rest can't have come any closer
+                others = other_asteroids.get(a, []) + [
+                    b
+                    for b, there in pushed.items()
+                    if b > a and abs(here_a - there) <= reach_a + radius[b] + 1e-6
+                ]
+                others = sorted(set(others))
+            while others and present[:, a].any():
+                b = others.pop(0)
+                if (
+                    alive[b]
+                    and (present[:, a] & present[:, b]).any()
+                    and field._resolve_pair(a, b)
+                ):
+                    pushed[a], pushed[b] = complex(z[a]), complex(z[b])
+                    others = field._touching(a, b + 1, is_asteroid)
+
+            # like `Game` this doesn't ask whether the asteroid is still in the game
+            if a in pushed:
+                touching = np.abs(shot_z - z[a]) <= reach_a + SHOT_RADIUS
+                hit = np.flatnonzero(touching & games[owner]).tolist()
+            else:
+                hit = shots_touching.get(a, [])
+            for shot in hit:
+                if not shot_alive[shot]:
+                    continue
+                ship = owner[shot]
+                shot_alive[shot] = False
+                self.shots_hit[ship] += 1
+                self.health[ship, a] -= own[shot, HEALTH]
+                if self.health[ship, a] <= 0:
+                    present[ship, a] = False
+                    self.score[ship] += self._split(ship, a)
+
+    def _split(self, ship: int, a: int) -> float:
+        """Points for shooting down field row `a`, `VectorGame._kill` splits it."""
+        fragments = len(self.field._spawned)
+        points = self.field._kill(a)
+        self._split_by += [ship] * (len(self.field._spawned) - fragments)
+        return points
+
+    def _respawn(self, ship: int, points_lost: float) -> None:
+        """Same rules as `Player.respawn`."""
+        self.lives[ship] -= 1
+        if not self.lives[ship]:
+            self.alive[ship] = False
+            return
+        self.score[ship] = max(0, self.score[ship] - points_lost)
+
+    def _append_own(self, count: int) -> "NDArray":
+        """Adds `count` zeroed own rows at the end, culled at the screen's edge unless changed."""
+        while self.own_count + count > len(self.own):
+            self.own = np.concatenate((self.own, np.zeros_like(self.own)))
+        rows = self.own[self.own_count : self.own_count + count]
+        rows[:] = 0
+        rows[:, CENTER] = SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2
+        self.own_count += count
+        return rows
+
+    def _keep_own(self, keep: "NDArray") -> None:
+        """Compacts the own rows down to the kept ones, in order."""
+        if keep.all():
+            return
+        kept = self.own_rows[keep]
+        self.own_count = len(kept)
+        self.own[: self.own_count] = kept
+
+
+def play_arenas(
+    networks: Sequence["NeuralNetwork"],
+    seeds: Sequence[int],
+    dt: float = PHYSICS_STEP,
+    budget: Optional[EvalBudget] = None,
+) -> list[SimResult]:
+    """Plays every network on the field of its seed, one arena per distinct seed."""
+    by_seed: dict[int, list[int]] = {}
+    for i, seed in enumerate(seeds):
+        by_seed.setdefault(seed, []).append(i)
+
+    results: list[Optional[SimResult]] = [None] * len(networks)
+    for seed, indices in by_seed.items():
+        arena = SharedArena([networks[i] for i in indices], seed, dt=dt, budget=budget)
+        for i, result in zip(indices, arena.run()):
+            results[i] = result
+    return results  # type: ignore
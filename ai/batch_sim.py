@@ -0,0 +1,87 @@
+"""Lock-step simulation of many headless games with one batched NN forward pass per frame."""
+
+from typing import TYPE_CHECKING, Optional, Sequence
+
+import numpy as np
+
+from ai.nn import StackedNetworks
+from budget import EvalBudget, SimResult
+from constants import PHYSICS_STEP
+from game_state import NN_INPUTS
+
+if TYPE_CHECKING:
+    from ai.nn import NeuralNetwork
+
+
+class BatchedSim:
+    """
+    Plays one `VectorGame` per network, all of them advancing a frame at a time.
+
+    Every frame the NN inputs of all running games are stacked into one (N, 5) matrix
+    and all decisions are made by a single batched forward pass. Games are retired as
+    soon as their player dies or their budget runs out, the results are the same as
+    calling `sim` on each game.
+    """
+
+    def __init__(
+        self,
+        networks: Sequence["NeuralNetwork"],
+        seeds: Sequence[int],
+        dt: float = PHYSICS_STEP,
+        budget: Optional[EvalBudget] = None,
+    ):
+        from vector_world import VectorGame
+
+        self.dt = dt
+        self.budget = budget
+        """Limits of every game, see `Game.sim`."""
+        self.networks = StackedNetworks(networks)
+        self.games = [VectorGame(seed=seed) for seed in seeds]
+
+    def run(self) -> list[SimResult]:
+        """Plays all games to the end, returns their results in the order of the networks."""
+        results: list[Optional[SimResult]] = [None] * len(self.games)
+        running = list(range(len(self.games)))
+        taken_actions = [set() for _ in self.games]
+        trackers = [
+            self.budget.tracker(self.dt) if self.budget is not None else None for _ in self.games
+        ]
+        inputs = np.zeros((len(running), NN_INPUTS))
+        frame = 0
+
+        while running:
+            # retire the finished games
+            reasons = [self.games[g].termination(frame, trackers[g]) for g in running]
+            alive = [k for k, reason in enumerate(reasons) if reason is None]
+            if len(alive) < len(running):
+                for g, reason in zip(running, reasons):
+                    if reason is not None:
+                        # punish the ships that are not using all outputs
+                        if len(taken_actions[g]) < 4:
+                            results[g] = SimResult(0, 0, reason)
+                        else:
+                            results[g] = SimResult(frame, self.games[g].player.score, reason)
+                running = [running[k] for k in alive]
+                self.networks.select(alive)
+                inputs = inputs[: len(running)]
+                if not running:
+                    break
+
+            # a game without asteroids has no inputs, its action is thrown away
+            has_inputs = []
+            for k, g in enumerate(running):
+                game_inputs = self.games[g].get_inputs(out=inputs[k])
+                has_inputs.append(game_inputs is not None)
+
+            actions = self.networks.predict(inputs).tolist()
+            for g, action, act in zip(running, actions, has_inputs):
+                game = self.games[g]
+                if act:
+                    game.act(action, dt=self.dt)
+                    taken_actions[g].add(action)
+                else:
+                    taken_actions[g].add(None)
+                game.step(dt=self.dt)
+            frame += 1
+
+        return results  # type: ignore
@@ -0,0 +1,124 @@
+"""Versioned, pickle-free checkpoints of a genetic training run."""
+
+import dataclasses
+import json
+import os
+import zipfile
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from ai.nn import NeuralNetwork, genome_length
+
+if TYPE_CHECKING:
+    from ai.nn import NDArray
+
+CHECKPOINT_PATH = "./ai/checkpoint.npz"
+
+CHECKPOINT_VERSION = 1
+"""Bumped whenever the stored arrays or metadata change in an incompatible way."""
+
+
+@dataclasses.dataclass
+class Checkpoint:
+    """
+    Everything needed to carry on training where it stopped.
+
+    The population is one contiguous (population size, genome length) float64 array, each
+    row a `NeuralNetwork.genome` laid out as `layout` says. The file is an uncompressed
+    `.npz` holding only plain arrays, no pickles, so it loads across refactors of the
+    classes and a single network can be read without unpickling anything.
+    """
+
+    population: "NDArray"
+    layout: list[tuple[int, int, str]]
+    """(input size, output size, activation name) of each layer."""
+    generation: int
+    rng_state: dict
+    """State of the gym's `np.random.Generator`, see `bit_generator.state`."""
+    mutation_schedule: dict[str, float]
+    fitness_history: "NDArray"
+    """(max fitness, average fitness) of every generation trained so far."""
+    config: dict = dataclasses.field(default_factory=dict)
+    """Settings of the run (backend, physics step...), for reference."""
+
+    @property
+    def champion(self) -> "NeuralNetwork":
+        """The first individual - the best one of the last evaluated generation."""
+        return NeuralNetwork.from_genome(self.population[0], self.layout)
+
+    def networks(self) -> list["NeuralNetwork"]:
+        """The population, every network is a view into its row of `population`."""
+        return [NeuralNetwork.from_genome(genome, self.layout) for genome in self.population]
+
+    def save(self, path: str = CHECKPOINT_PATH) -> None:
+        """Writes the checkpoint, atomically - a crash mid-write keeps the previous one."""
+        meta = {
+            "version": CHECKPOINT_VERSION,
+            "layout": self.layout,
+            "generation": self.generation,
+            "rng_state": self.rng_state,
+            "mutation_schedule": self.mutation_schedule,
+            "config": self.config,
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            np.savez(
+                f,
+                meta=np.array(json.dumps(meta)),
+                population=np.ascontiguousarray(self.population, dtype=np.float64),
+                fitness_history=np.asarray(self.fitness_history, dtype=np.float64).reshape(-1, 2),
+            )
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str = CHECKPOINT_PATH) -> "Checkpoint":
+        with np.load(path, allow_pickle=False) as data:
+            meta = _read_meta(data["meta"], path)
+            population = data["population"]
+            fitness_history = data["fitness_history"]
+
+        layout = [tuple(layer) for layer in meta["layout"]]
+        if population.ndim != 2 or population.shape[1] != genome_length(layout):  # type: ignore
+            raise ValueError(f"{path}: the population doesn't fit the layout {layout}")
+        return cls(
+            population=population,
+            layout=layout,  # type: ignore
+            generation=meta["generation"],
+            rng_state=meta["rng_state"],
+            mutation_schedule=meta["mutation_schedule"],
+            fitness_history=fitness_history,
+            config=meta.get("config", {}),
+        )
+
+
+def load_champion(path: str = CHECKPOINT_PATH) -> "NeuralNetwork":
+    """The champion of a checkpoint, reading only its row of the population."""
+    with zipfile.ZipFile(path) as archive:
+        with archive.open("meta.npy") as f:
+            meta = _read_meta(np.lib.format.read_array(f, allow_pickle=False), path)
+        with archive.open("population.npy") as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if fortran_order or len(shape) != 2:
+                raise ValueError(f"{path}: the population isn't stored row by row")
+            genome = np.frombuffer(f.read(shape[1] * dtype.itemsize), dtype=dtype).copy()
+
+    layout = [tuple(layer) for layer in meta["layout"]]
+    return NeuralNetwork.from_genome(genome, layout)  # type: ignore
+
+
+def _read_meta(meta_array: "np.ndarray", path: str) -> dict:
+    meta = json.loads(meta_array.item())
+    version: Optional[int] = meta.get("version")
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(
+            f"{path}: checkpoint version {version} isn't supported, expected {CHECKPOINT_VERSION}"
+        )
+    return meta
@@ -0,0 +1,86 @@
+"""Memoised fitness of individuals, so unchanged networks aren't simulated again."""
+
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Hashable, Optional
+
+if TYPE_CHECKING:
+    from ai.nn import NeuralNetwork
+
+CACHE_PATH = "./ai/fitness_cache.pkl"
+
+
+class FitnessCache:
+    """
+    Least recently used mapping of (network weights, game seed, game) to fitness.
+
+    Evaluation is deterministic - the same weights playing the same seeded game always
+    get the same score - so the elites copied into the next generation don't have to
+    play again when the seed stays the same. The cache can be persisted so a resumed
+    training run reuses the results of the previous one.
+    """
+
+    def __init__(self, max_size: int = 10_000, path: Optional[str] = None):
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, float] = OrderedDict()
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    @staticmethod
+    def key(ship: "NeuralNetwork", seed: int, game: str = "sprite") -> Hashable:
+        """Identifies an evaluation - a digest of every layer's parameters, the seed and the game."""
+        digest = hashlib.blake2b(digest_size=16)
+        for layer in ship.layers:
+            for array in (layer.weights, layer.biases):
+                digest.update(str(array.shape).encode())
+                digest.update(array.tobytes())
+        return (digest.digest(), seed, game)
+
+    def get(self, key: Hashable) -> Optional[float]:
+        """Returns the cached fitness or None, counting hits and misses."""
+        fitness = self._entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return fitness
+
+    def put(self, key: Hashable, fitness: float) -> None:
+        """Stores a fitness, evicting the least recently used entries over `max_size`."""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = fitness
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def save(self) -> None:
+        """Writes the entries to `path`, if the cache has one."""
+        if self.path is None:
+            return
+        with open(self.path, "wb") as f:
+            pickle.dump(list(self._entries.items()), f)
+
+    def load(self) -> None:
+        """Reads the entries from `path`, most recently used last."""
+        with open(self.path, "rb") as f:
+            entries = pickle.load(f)
+        for key, fitness in entries[-self.max_size :] if self.max_size > 0 else ():
+            self._entries[key] = fitness
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
@@ -1,9 +1,21 @@
-import random
-from typing import Optional
+import dataclasses
+import itertools
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Optional
 
 import numpy as np
 
-from ai.nn import DenseLayer, NeuralNetwork
+from ai.fitness_cache import FitnessCache
+from ai.batch_sim import BatchedSim
+from ai.nn import NeuralNetwork
+from budget import EvalBudget, SimResult, Termination
+from constants import PHYSICS_STEP
+
+if TYPE_CHECKING:
+    from ai.checkpoint import Checkpoint
+    from ai.racing import RaceResult, SuccessiveHalving
 
 SAVE_PATH = "./ai/best_ship.pkl"
 
@@ -13,6 +25,15 @@ MUTATION_RATE = 0.1
 MUTATION_STRENGTH = 0.5
 """How much a mutation changes an individual."""
 
+MUTATION_SCHEDULE = {
+    "rate": MUTATION_RATE,
+    "rate_decay": 0.99,
+    "strength": MUTATION_STRENGTH,
+    "strength_decay": 0.98,
+    "floor": 0.01,
+}
+"""Initial mutation rate and strength, their decay per generation and their lower bound."""
+
 
 class GeneticGym:
     """
@@ -29,161 +50,592 @@ class GeneticGym:
     _mutation_rate: Optional[float] = None
     _mutation_strength: Optional[float] = None
 
-    def __init__(self, population_size: int):
+    def __init__(
+        self,
+        population_size: int,
+        workers: int = 1,
+        backend: str = "sprite",
+        seed: Optional[int] = None,
+        eval_seed: Optional[int] = None,
+        cache_size: int = 10_000,
+        cache_path: Optional[str] = None,
+        precise_collisions: bool = False,
+        physics_step: float = PHYSICS_STEP,
+        budget: Optional[EvalBudget] = None,
+        prune_top_k: Optional[int] = None,
+        racing: Optional["SuccessiveHalving"] = None,
+    ):
+        """
+        By default every individual plays a fresh game seed every generation, so the
+        population has to get good at asteroid fields in general. An `eval_seed` has them
+        all play the same field instead - evaluations become repeatable and the elites'
+        fitness is taken from the cache, but the population learns that one field.
+        """
+        self.rng = np.random.default_rng(seed)
+        """All of the gym's randomness - initial weights, selection, breeding, game seeds."""
+        self.eval_seed = eval_seed
+        """The seed every individual plays the game with, None for fresh seeds."""
         self.gen_num = 0
         self.population_size = population_size
-        self.population = [self._ship_factory() for _ in range(population_size)]
+        ships = [self._ship_factory(self.rng) for _ in range(population_size)]
+        self.layout = ships[0].layout
+        self.genomes: "np.ndarray"
+        """
+        The population's weights, a (population size, genome length) array with a row
+        per individual, laid out as `NeuralNetwork.genome`.
+        """
+        self.population: list["NeuralNetwork"]
+        """The individuals, their layers are views into their rows of `genomes`."""
+        self.set_genomes(np.stack([ship.genome() for ship in ships]))
+        self.workers = workers
+        self.backend = backend
+        """
+        Game the individuals are evaluated in - `sprite` for `Game`, `vector` for `VectorGame`,
+        `batched` for all of the population's `VectorGame`s in lock-step or `arena` for the
+        whole population flying through one shared asteroid field. What a ship shoots down
+        there is only gone from its own game, but the field is still shared - a ship's
+        arena game is comparable to the one it plays alone, not the same, see `ai.arena`.
+        """
+        self.precise_collisions = precise_collisions
+        """Whether asteroids hit with their hulls rather than circles, `sprite` backend only."""
+        if precise_collisions and backend != "sprite":
+            raise ValueError("precise collisions are only supported by the sprite backend")
+        self.physics_step = physics_step
+        """
+        Game time per simulated frame - larger steps train faster, the champion is shown
+        with the same step.
+        """
+        self.budget = budget
+        """Limits of every evaluation game, None lets them run until the ship dies."""
+        self.prune_top_k = prune_top_k
+        """
+        With a budget that has `max_frames`, games stop as soon as the ship can't make it
+        into the generation's top-k anymore.
+        """
+        self.terminations: Counter = Counter()
+        """How the games of the last evaluation ended, by `Termination`."""
+        self.racing = racing
+        """
+        Evaluates every individual on several seeds, spending more of them on the ones that
+        are in the running for selection, see `ai.racing`. Off by default - one game each.
+        """
+        self.last_race: Optional["RaceResult"] = None
+        self.last_genomes: Optional["np.ndarray"] = None
+        """The genomes the last generation was bred from, `last_fitness` are their scores."""
+        self.last_fitness: list[float] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.fitness_cache = FitnessCache(max_size=cache_size, path=cache_path)
+        """Fitness of already evaluated (weights, seed) pairs, `cache_size=0` disables it."""
+        self.mutation_schedule = dict(MUTATION_SCHEDULE)
+        self.fitness_history: list[tuple[float, float]] = []
+        """(max fitness, average fitness) of every generation."""
+        self._rng_state: Optional[dict] = None
+        """The rng's state when the generation in progress started."""
 
     # annealing mutation rates for diversity early and refinement later
     @property
     def mutation_rate(self) -> float:
         """Determines how likely an individual is to mutate."""
         if not self._mutation_rate:
-            self._mutation_rate = max(0.01, MUTATION_RATE * 0.99**self.gen_num)
+            schedule = self.mutation_schedule
+            self._mutation_rate = max(
+                schedule["floor"], schedule["rate"] * schedule["rate_decay"] ** self.gen_num
+            )
         return self._mutation_rate
 
     @property
     def mutation_strength(self) -> float:
         """How much a mutation changes an individual."""
         if not self._mutation_strength:
-            self._mutation_strength = max(0.01, MUTATION_STRENGTH * 0.98**self.gen_num)
+            schedule = self.mutation_schedule
+            self._mutation_strength = max(
+                schedule["floor"],
+                schedule["strength"] * schedule["strength_decay"] ** self.gen_num,
+            )
         return self._mutation_strength
 
-    def _ship_factory(self) -> "NeuralNetwork":
+    @staticmethod
+    def _ship_factory(rng: Optional["np.random.Generator"] = None) -> "NeuralNetwork":
         """Builds a new random individual - a neural network that's the brain of a ship."""
         from ai.nn import DenseLayer, relu, softmax
 
         return NeuralNetwork(
-            DenseLayer(5, 12, activation=relu),
-            DenseLayer(12, 8, activation=relu),
-            DenseLayer(8, 4, activation=softmax),
+            DenseLayer(5, 12, activation=relu, rng=rng),
+            DenseLayer(12, 8, activation=relu, rng=rng),
+            DenseLayer(8, 4, activation=softmax, rng=rng),
         )
 
-    def calc_fitness(self, ship: "NeuralNetwork") -> float:
-        """Calculate the fitness of an individual."""
+    @staticmethod
+    def calc_fitness(
+        ship: "NeuralNetwork",
+        seed: int,
+        backend: str = "sprite",
+        precise_collisions: bool = False,
+        physics_step: float = PHYSICS_STEP,
+        budget: Optional[EvalBudget] = None,
+    ) -> float:
+        """Calculate the fitness of an individual on a game seeded with `seed`."""
+        result = GeneticGym.play(ship, seed, backend, precise_collisions, physics_step, budget)
+        return GeneticGym.fitness(result, budget)
+
+    @staticmethod
+    def play(
+        ship: "NeuralNetwork",
+        seed: int,
+        backend: str = "sprite",
+        precise_collisions: bool = False,
+        physics_step: float = PHYSICS_STEP,
+        budget: Optional[EvalBudget] = None,
+    ) -> SimResult:
+        """Plays the game seeded with `seed`, see `calc_fitness`."""
         from main import Game
+        from vector_world import VectorGame
+
+        if backend == "arena":
+            from ai.arena import SharedArena
+
+            return SharedArena([ship], seed, dt=physics_step, budget=budget).run()[0]
+        # the game only needs the chosen actions, the frozen network gives them faster
+        ship = ship.compile()
+        if backend == "vector":
+            return VectorGame(seed=seed).sim(ship, dt=physics_step, budget=budget)
+        game = Game(
+            headless=True,
+            seed=seed,
+            precise_collisions=precise_collisions,
+            physics_step=physics_step,
+        )
+        return game.sim(ship, budget=budget)
+
+    @staticmethod
+    def fitness(result: SimResult, budget: Optional[EvalBudget] = None) -> float:
+        """
+        Fitness of a played game - its score plus a tenth of a point per survived frame.
+        A ship stopped for making no progress isn't paid for the frames it wasted.
+        """
+        frames = result.frames
+        if result.reason is Termination.NO_PROGRESS and budget is not None:
+            frames = max(frames - (budget.stall_frames or 0), 0)
+        return result.score + frames / 10
+
+    @staticmethod
+    def calc_batch_fitness(
+        ships: list["NeuralNetwork"],
+        seeds: list[int],
+        physics_step: float = PHYSICS_STEP,
+        budget: Optional[EvalBudget] = None,
+    ) -> list[float]:
+        """Calculate the fitness of many individuals at once, their games run in lock-step."""
+        results = BatchedSim(ships, seeds, dt=physics_step, budget=budget).run()
+        return [GeneticGym.fitness(result, budget) for result in results]
 
-        game = Game()
-        i, score = game.sim(ship)
+    def eval_population(self) -> list[float]:
+        """Evaluates each individual of the current population, scores are in population order."""
+        if self.racing is not None:
+            self.last_race = self.racing.race(self, self.population)
+            return self.last_race.fitness.tolist()
+        if self.backend == "arena":
+            # a field is only shared by the individuals playing the same seed
+            return self.evaluate(self.population, self.eval_seeds(1) * len(self.population))
+        return self.evaluate(self.population, self.eval_seeds())
+
+    def evaluate(
+        self,
+        ships: list["NeuralNetwork"],
+        seeds: list[int],
+        budget: Optional[EvalBudget] = None,
+        prune: bool = True,
+    ) -> list[float]:
+        """
+        Fitness of every ship on the game with the seed at the same position, cached games
+        aren't played again. `budget` replaces the gym's own for these games, `prune`
+        turns the top-k pruning (`prune_top_k`) on.
+        """
+        budget = budget if budget is not None else self.budget
+        game = self.game_key(budget)
+        keys = [self.fitness_cache.key(ship, seed, game) for ship, seed in zip(ships, seeds)]
+        fitness_scores = [self.fitness_cache.get(key) for key in keys]
+
+        # individuals that appear more than once are only played once
+        missing: dict = {}
+        for i, (key, fitness) in enumerate(zip(keys, fitness_scores)):
+            if fitness is None:
+                missing.setdefault(key, i)
+        self.terminations = Counter()
+        if missing:
+            indices = list(missing.values())
+            known = [fitness for fitness in fitness_scores if fitness is not None]
+            results = self._evaluate(
+                [ships[i] for i in indices],
+                [seeds[i] for i in indices],
+                budget,
+                known if prune else None,
+            )
+            evaluated = [self.fitness(result, budget) for result in results]
+            for key, result, fitness in zip(missing, results, evaluated):
+                self.terminations[result.reason] += 1
+                # a wall-clock cut depends on the machine, a pruned one on the threshold
+                if result.reason not in (Termination.WALL_CLOCK, Termination.OUT_OF_REACH):
+                    self.fitness_cache.put(key, fitness)
+            by_key = dict(zip(missing, evaluated))
+            fitness_scores = [
+                by_key[key] if fitness is None else fitness
+                for key, fitness in zip(keys, fitness_scores)
+            ]
+
+        return fitness_scores  # type: ignore
+
+    def game_key(self, budget: Optional[EvalBudget]) -> str:
+        """The game part of the fitness cache keys of evaluations with `budget`."""
+        # `batched` plays the very same games as `vector`
+        if self.backend == "sprite":
+            game = "sprite/precise" if self.precise_collisions else "sprite"
+        elif self.backend == "arena":
+            # a ship's arena game depends on who else is in the arena, it's only the game
+            # it plays on its own when it's alone there - arena results never stand in for
+            # the others
+            game = "arena"
+        else:
+            game = "vector"
+        game = f"{game}@{self.physics_step}"
+        if budget is not None:
+            # the threshold changes all the time, the results it prunes aren't cached
+            game = f"{game}/{dataclasses.replace(budget, fitness_to_beat=None)}"
+        return game
+
+    def fitness_to_beat(self, known: list[float]) -> Optional[float]:
+        """The fitness of the `prune_top_k`-th best of `known`, if there are that many."""
+        if self.prune_top_k is None or len(known) < self.prune_top_k:
+            return None
+        return sorted(known)[-self.prune_top_k]
+
+    def _evaluate(
+        self,
+        ships: list["NeuralNetwork"],
+        seeds: list[int],
+        budget: Optional[EvalBudget],
+        known: Optional[list[float]],
+    ) -> list[SimResult]:
+        """
+        Plays the games of the individuals, serially or on the worker processes. `known`
+        are the fitness values of the generation so far, they set the pruning threshold,
+        None doesn't prune.
+        """
+        base_budget = budget
+        threshold = self.fitness_to_beat(known) if known is not None else None
+        if budget is not None and threshold is not None:
+            budget = dataclasses.replace(budget, fitness_to_beat=threshold)
+
+        if self.workers <= 1:
+            if self.backend == "batched":
+                return BatchedSim(ships, seeds, dt=self.physics_step, budget=budget).run()
+            if self.backend == "arena":
+                from ai.arena import play_arenas
+
+                return play_arenas(ships, seeds, dt=self.physics_step, budget=budget)
+            results = []
+            for ship, seed in zip(ships, seeds):
+                result = self.play(
+                    ship, seed, self.backend, self.precise_collisions, self.physics_step, budget
+                )
+                results.append(result)
+                # serially, every finished game can raise the bar for the next one
+                if base_budget is not None and known is not None and self.prune_top_k is not None:
+                    known = [*known, self.fitness(result, base_budget)]
+                    threshold = self.fitness_to_beat(known)
+                    budget = dataclasses.replace(base_budget, fitness_to_beat=threshold)
+            return results
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker
+            )
+        # only the genomes are sent over, the workers rebuild the networks with the layout
+        genomes = np.stack([ship.genome() for ship in ships])
+        if self.backend in ("batched", "arena"):
+            # one lock-step batch per worker
+            size = -(-len(genomes) // self.workers)
+            batches = self._pool.map(
+                _play_batch_worker if self.backend == "batched" else _play_arena_worker,
+                [genomes[i : i + size] for i in range(0, len(genomes), size)],
+                itertools.repeat(self.layout),
+                [seeds[i : i + size] for i in range(0, len(seeds), size)],
+                itertools.repeat(self.physics_step),
+                itertools.repeat(budget),
+            )
+            return [result for batch in batches for result in batch]
+
+        chunksize = max(1, len(genomes) // (self.workers * 4))
+        return list(
+            self._pool.map(
+                _play_worker,
+                genomes,
+                itertools.repeat(self.layout),
+                seeds,
+                itertools.repeat(self.backend),
+                itertools.repeat(self.precise_collisions),
+                itertools.repeat(self.physics_step),
+                itertools.repeat(budget),
+                chunksize=chunksize,
+            )
+        )
 
-        return score + i / 10
+    def eval_seeds(self, count: Optional[int] = None) -> list[int]:
+        """Game seeds for evaluating the current population, in population order."""
+        count = len(self.population) if count is None else count
+        if self.eval_seed is not None:
+            return [self.eval_seed] * count
+        return self.rng.integers(2**32, size=count).tolist()
 
-    def eval_population(self) -> list[float]:
-        """Evaluates each individual of the current population."""
-        return list(map(self.calc_fitness, self.population))
+    def close(self) -> None:
+        """Shuts down the evaluation worker processes, if any."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
 
     def get_mating_pool(
         self, fitness_scores: list[float], tournament_k: int = 3
     ) -> list["NeuralNetwork"]:
         """Selects a part of the population that's fit to breed."""
-        sorted_indices = np.argsort(fitness_scores)[::-1]
-        elites = [self.population[i] for i in sorted_indices[: self._ELITES_COUNT]]
-
-        # 'tournament' selection
-        selected = elites.copy()
-        while len(selected) < self.population_size // 2:
-            contenders = random.sample(range(self.population_size), tournament_k)
-            best = max(contenders, key=lambda idx: fitness_scores[idx])
-            if fitness_scores[best]:
-                selected.append(self.population[best])
-
-        return selected
+        return [self.population[i] for i in self.select(fitness_scores, tournament_k)]
+
+    def select(self, fitness_scores: list[float], tournament_k: int = 3) -> "np.ndarray":
+        """
+        Indices of the individuals fit to breed, half of the population - the elites first,
+        then the winners of 'tournaments' among `tournament_k` distinct random individuals.
+        Winners without any fitness don't breed, unless nobody has any fitness at all.
+        """
+        scores = np.asarray(fitness_scores, dtype=np.float64)
+        elites = np.argsort(scores, kind="stable")[::-1][: self._ELITES_COUNT]
+        wanted = self.population_size // 2 - len(elites)
+        if wanted <= 0:
+            return elites
+
+        winners: list["np.ndarray"] = []
+        found = 0
+        while found < wanted:
+            # k distinct contenders per tournament, the k smallest of random keys
+            keys = self.rng.random((wanted, self.population_size))
+            contenders = np.argpartition(keys, tournament_k - 1, axis=1)[:, :tournament_k]
+            best = contenders[np.arange(wanted), scores[contenders].argmax(axis=1)]
+            if scores.any():
+                best = best[scores[best] != 0]
+            winners.append(best)
+            found += len(best)
+
+        return np.concatenate([elites, *winners])[: self.population_size // 2]
 
     def crossover(
         self, parent1: "NeuralNetwork", parent2: "NeuralNetwork"
     ) -> "NeuralNetwork":
         """Crossover two individuals to create a new one."""
-        child_layers = []
-
-        for l1, l2 in zip(parent1.layers, parent2.layers):
-            mask = np.random.rand(*l1.weights.shape) < 0.5
-            weights = (
-                np.where(mask, l1.weights, l2.weights)
-                + np.random.randn(*l1.weights.shape) * 0.01
-            )
-            mask = np.random.rand(*l1.biases.shape) < 0.5
-            biases = (
-                np.where(mask, l1.biases, l2.biases)
-                + np.random.randn(*l1.biases.shape) * 0.01
-            )
-            new_layer = DenseLayer(
-                input_dim=l1.weights.shape[0],
-                output_dim=l1.weights.shape[1],
-                activation=l1.activation,
-                weights=weights.copy(),
-                biases=biases.copy(),
-            )
-            child_layers.append(new_layer)
+        genome = self.crossover_genomes(parent1.genome()[None], parent2.genome()[None])[0]
+        return NeuralNetwork.from_genome(genome, parent1.layout)
 
-        return NeuralNetwork(*child_layers)
+    def crossover_genomes(self, first: "np.ndarray", second: "np.ndarray") -> "np.ndarray":
+        """
+        Uniform crossover of the rows of two (N, genome length) arrays - every gene comes
+        from either parent with equal chance and gets a little noise.
+        """
+        mask = self.rng.random(first.shape) < 0.5
+        return np.where(mask, first, second) + self.rng.standard_normal(first.shape) * 0.01
 
     def mutate(self, nn: "NeuralNetwork"):
         """Mutates an individual to hopefully make it better or at least a bit different."""
-        for layer in nn.layers:
-            # mutate weights
-            mutation_mask = np.random.rand(*layer.weights.shape) < self.mutation_rate
-            layer.weights += (
-                mutation_mask
-                * np.random.randn(*layer.weights.shape)
-                * self.mutation_strength
-            )
+        genome = nn.genome()[None]
+        self.mutate_genomes(genome)
+        nn.set_genome(genome[0])
 
-            # mutate biases
-            mutation_mask_bias = (
-                np.random.rand(*layer.biases.shape) < self.mutation_rate
-            )
-            layer.biases += (
-                mutation_mask_bias
-                * np.random.randn(*layer.biases.shape)
-                * self.mutation_strength
-            )
+    def mutate_genomes(self, genomes: "np.ndarray") -> None:
+        """Masked Gaussian mutation of the rows of a (N, genome length) array, in place."""
+        mask = self.rng.random(genomes.shape) < self.mutation_rate
+        genomes += mask * self.rng.standard_normal(genomes.shape) * self.mutation_strength
 
     def next_generation(self) -> tuple[float, float]:
         """Creates the next population."""
+        # a generation that doesn't finish must leave the checkpointed state untouched
+        self._rng_state = self.rng.bit_generator.state
         fitness_scores = self.eval_population()
-        parents = self.get_mating_pool(fitness_scores)
-
-        new_population = parents[: self._ELITES_COUNT].copy()
-        # crossover the population until a fixed population size
-        while len(new_population) < self.population_size:
-            parent1, parent2 = random.sample(parents, 2)
-            child = self.crossover(parent1, parent2)
-            self.mutate(child)
-            new_population.append(child)
+        parents = self.select(fitness_scores)
+
+        # the elites carry on, every other individual is the child of two distinct parents
+        children = self.population_size - self._ELITES_COUNT
+        first = self.rng.integers(len(parents), size=children)
+        second = self.rng.integers(len(parents) - 1, size=children)
+        second += second >= first
+        offspring = self.crossover_genomes(
+            self.genomes[parents[first]], self.genomes[parents[second]]
+        )
+        self.mutate_genomes(offspring)
 
-        self.population = new_population
+        self.last_genomes, self.last_fitness = self.genomes, fitness_scores
+        self.set_genomes(np.concatenate([self.genomes[parents[: self._ELITES_COUNT]], offspring]))
         self.gen_num += 1
         self._mutation_rate = self._mutation_strength = None
-        return (max(fitness_scores), float(np.mean(fitness_scores)))
+        self.fitness_history.append((max(fitness_scores), float(np.mean(fitness_scores))))
+        self._rng_state = None
+        return self.fitness_history[-1]
+
+    def set_genomes(self, genomes: "np.ndarray") -> None:
+        """Replaces the population, the networks are views into the rows of `genomes`."""
+        self.genomes = genomes
+        self.population_size = len(genomes)
+        self.population = [NeuralNetwork.from_genome(genome, self.layout) for genome in genomes]
+
+    def checkpoint(self) -> "Checkpoint":
+        """A snapshot of the run that `restore` carries on from exactly."""
+        from ai.checkpoint import Checkpoint
+
+        return Checkpoint(
+            population=self.genomes,
+            layout=self.layout,
+            generation=self.gen_num,
+            rng_state=self._rng_state or self.rng.bit_generator.state,
+            mutation_schedule=dict(self.mutation_schedule),
+            fitness_history=np.array(self.fitness_history).reshape(-1, 2),
+            config={
+                "backend": self.backend,
+                "eval_seed": self.eval_seed,
+                "precise_collisions": self.precise_collisions,
+                "physics_step": self.physics_step,
+            },
+        )
+
+    def restore(self, checkpoint: "Checkpoint") -> None:
+        """Continues the run saved in `checkpoint`, the gym's settings are kept."""
+        self.layout = checkpoint.layout
+        self.set_genomes(np.array(checkpoint.population, dtype=np.float64))
+        self.gen_num = checkpoint.generation
+        self.rng.bit_generator.state = checkpoint.rng_state
+        self._rng_state = None
+        self.mutation_schedule = dict(checkpoint.mutation_schedule)
+        self._mutation_rate = self._mutation_strength = None
+        self.fitness_history = [tuple(row) for row in checkpoint.fitness_history.tolist()]
 
     def train(
         self,
         generations: int = 100,
         *,
+        until: Optional[int] = None,
         save_result: bool = False,
         display_champion: bool = True,
+        workers: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: int = 1,
+        resume: bool = False,
     ):
-        for i in range(generations):
-            max_fitness, avg_fitness = self.next_generation()
-            print(
-                f"gen = {self.gen_num}, max_fitness = {max_fitness}, avg_fitness = {avg_fitness}"
-            )
-
-        champion = self.population[0]
+        """
+        Trains `generations` more generations, or up to generation `until` if given - a run
+        that is resumed until the same generation ends the same however often it stopped.
+        With a `checkpoint_path` the run is saved every `checkpoint_every` generations and
+        when training stops for any reason, `resume` first carries on from the checkpoint
+        there, if it exists.
+        """
+        from ai.checkpoint import Checkpoint
+
+        if workers is not None:
+            self.workers = workers
+        if resume and checkpoint_path is not None and os.path.exists(checkpoint_path):
+            self.restore(Checkpoint.load(checkpoint_path))
+            print(f"resumed from {checkpoint_path} at gen = {self.gen_num}")
+        target = until if until is not None else self.gen_num + generations
+        if self.gen_num >= target:
+            print(f"nothing left to train, already at gen = {self.gen_num} of {target}")
+
+        try:
+            while self.gen_num < target:
+                max_fitness, avg_fitness = self.next_generation()
+                cache = self.fitness_cache
+                truncated = sum(n for reason, n in self.terminations.items() if reason.truncated)
+                print(
+                    f"gen = {self.gen_num}, max_fitness = {max_fitness}, avg_fitness = {avg_fitness}, "
+                    f"cache hits = {cache.hits}, misses = {cache.misses}, truncated = {truncated}"
+                )
+                if checkpoint_path is not None and self.gen_num % max(checkpoint_every, 1) == 0:
+                    self.checkpoint().save(checkpoint_path)
+        finally:
+            self.close()
+            self.fitness_cache.save()
+            if checkpoint_path is not None:
+                self.checkpoint().save(checkpoint_path)
 
         if save_result:
-            import pickle
-
-            with open(SAVE_PATH, "wb") as f:
-                pickle.dump(champion, f)
+            save_champion(self.checkpoint())
 
         if display_champion:
             from main import Game
 
             input("Done, press ENTER to start the simulation.")
-            game = Game()
+            game = Game(physics_step=self.physics_step)
             game.start(ship_ai=self.population[0])
 
 
+def save_champion(checkpoint: "Checkpoint") -> None:
+    """
+    Makes the checkpoint's champion (its first individual) the one `Game.load_ai` plays,
+    the run is stored at `CHECKPOINT_PATH` and the champion also pickled at `SAVE_PATH`.
+    """
+    import pickle
+
+    from ai.checkpoint import CHECKPOINT_PATH
+
+    checkpoint.save(CHECKPOINT_PATH)
+    # kept for older checkouts that only know the pickle
+    with open(SAVE_PATH, "wb") as f:
+        pickle.dump(checkpoint.champion, f)
+
+
+def _init_worker() -> None:
+    """Warms up an evaluation worker so the game modules are imported once per process."""
+    import main  # noqa: F401
+    import vector_world  # noqa: F401
+
+
+def _play_worker(
+    genome: "np.ndarray",
+    layout: list[tuple[int, int, str]],
+    seed: int,
+    backend: str,
+    precise_collisions: bool,
+    physics_step: float,
+    budget: Optional[EvalBudget],
+) -> SimResult:
+    """Rebuilds an individual from its genome and plays its game."""
+    ship = NeuralNetwork.from_genome(genome, layout)
+    return GeneticGym.play(ship, seed, backend, precise_collisions, physics_step, budget)
+
+
+def _play_batch_worker(
+    genomes: "np.ndarray",
+    layout: list[tuple[int, int, str]],
+    seeds: list[int],
+    physics_step: float,
+    budget: Optional[EvalBudget],
+) -> list[SimResult]:
+    """Rebuilds a batch of individuals from their genomes and plays their games in lock-step."""
+    from ai.batch_sim import BatchedSim
+
+    ships = [NeuralNetwork.from_genome(genome, layout) for genome in genomes]
+    return BatchedSim(ships, seeds, dt=physics_step, budget=budget).run()
+
+
+def _play_arena_worker(
+    genomes: "np.ndarray",
+    layout: list[tuple[int, int, str]],
+    seeds: list[int],
+    physics_step: float,
+    budget: Optional[EvalBudget],
+) -> list[SimResult]:
+    """Rebuilds a batch of individuals from their genomes and plays them in shared arenas."""
+    from ai.arena import play_arenas
+
+    ships = [NeuralNetwork.from_genome(genome, layout) for genome in genomes]
+    return play_arenas(ships, seeds, dt=physics_step, budget=budget)
+
+
 if __name__ == "__main__":
-    GeneticGym(population_size=100).train(generations=50, save_result=True)
+    from ai.checkpoint import CHECKPOINT_PATH
+
+    GeneticGym(population_size=100).train(
+        until=50, save_result=True, checkpoint_path=CHECKPOINT_PATH, resume=True
+    )
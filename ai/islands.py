@@ -0,0 +1,282 @@
+"""
+Island model - several `GeneticGym` sub-populations evolve side by side, each in its own
+process, and every few generations the best individuals of an island migrate to its
+neighbours. Islands drift apart between migrations, which keeps the population as a
+whole more diverse than one big population bred together.
+"""
+
+import multiprocessing
+import queue
+from typing import TYPE_CHECKING, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from ai.genetic_gym import GeneticGym, save_champion
+from ai.nn import NeuralNetwork
+from constants import PHYSICS_STEP
+
+if TYPE_CHECKING:
+    from ai.checkpoint import Checkpoint
+
+TOPOLOGIES = ("ring", "full")
+"""
+`ring` sends migrants on to the next island only, `full` to every other island. Any other
+topology is a mapping of each island to the islands it sends to.
+"""
+
+_POLL_SECONDS = 1.0
+"""How often the parent checks on the islands while it waits for them."""
+
+
+def destinations(
+    topology: Union[str, Mapping[int, Sequence[int]]], islands: int
+) -> list[list[int]]:
+    """The islands each island sends its migrants to."""
+    if topology == "ring":
+        return [[(i + 1) % islands] if islands > 1 else [] for i in range(islands)]
+    if topology == "full":
+        return [[j for j in range(islands) if j != i] for i in range(islands)]
+    if isinstance(topology, str):
+        raise ValueError(f"unknown topology {topology!r}, expected one of {TOPOLOGIES}")
+
+    targets = [sorted(set(topology.get(i, ()))) for i in range(islands)]
+    for i, island_targets in enumerate(targets):
+        if any(not 0 <= j < islands or j == i for j in island_targets):
+            raise ValueError(f"island {i} sends to {island_targets}, not to other islands")
+    return targets
+
+
+class IslandModel:
+    """
+    Trains `islands` gyms of `population_size` individuals each. Every `migration_interval`
+    generations each island sends copies of its `migrants` fittest individuals to the
+    islands `topology` names, they replace the island's newest offspring there.
+
+    Migration is synchronous - an island waits for the migrants it's due before it goes on,
+    so a run with a `seed` is reproducible however the processes get scheduled.
+    """
+
+    def __init__(
+        self,
+        islands: int = 4,
+        population_size: int = 25,
+        migration_interval: int = 5,
+        migrants: int = 2,
+        topology: Union[str, Mapping[int, Sequence[int]]] = "ring",
+        seed: Optional[int] = None,
+        **gym_kwargs,
+    ):
+        if islands < 1:
+            raise ValueError("an island model needs at least one island")
+        if not 0 <= migrants <= population_size - GeneticGym._ELITES_COUNT:
+            raise ValueError("migrants may only replace an island's offspring, not its elites")
+        self.islands = islands
+        self.population_size = population_size
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.topology = topology
+        self.destinations = destinations(topology, islands)
+        self.seed = seed
+        self.gym_kwargs = gym_kwargs
+        """
+        Settings every island's `GeneticGym` is created with (backend, budget...), a
+        `cache_path` gets the island's number appended so the islands don't share the file.
+        """
+        self.champion: Optional["NeuralNetwork"] = None
+        """The fittest individual any island has evaluated so far."""
+        self.champion_fitness = -np.inf
+        self.fitness_history: list[tuple[float, float]] = []
+        """(max fitness, average fitness) over all islands of every generation."""
+
+    def train(
+        self,
+        generations: int = 100,
+        *,
+        save_result: bool = False,
+        display_champion: bool = True,
+    ) -> "NeuralNetwork":
+        """
+        Evolves every island from scratch for `generations` generations and returns the
+        champion, `save_result` stores it the way `GeneticGym.train` does.
+        """
+        context = multiprocessing.get_context()
+        inboxes = [context.Queue() for _ in range(self.islands)]
+        reports = context.Queue()
+        seeds = np.random.SeedSequence(self.seed).spawn(self.islands)
+        processes = [
+            context.Process(
+                target=_run_island,
+                args=(
+                    island,
+                    generations,
+                    seeds[island],
+                    self.population_size,
+                    self.gym_kwargs,
+                    self.migration_interval,
+                    self.migrants,
+                    [inboxes[j] for j in self.destinations[island]],
+                    sum(island in targets for targets in self.destinations),
+                    inboxes[island],
+                    reports,
+                ),
+            )
+            for island in range(self.islands)
+        ]
+        for process in processes:
+            process.start()
+
+        generation_stats: dict[int, list] = {}
+        final: dict[int, "Checkpoint"] = {}
+        try:
+            while len(final) < self.islands:
+                message = self._receive(reports, processes)
+                if message[0] == "generation":
+                    _, island, gen_num, max_fitness, avg_fitness, best, layout, best_fitness = (
+                        message
+                    )
+                    if best_fitness > self.champion_fitness:
+                        self.champion_fitness = best_fitness
+                        self.champion = NeuralNetwork.from_genome(best, layout)
+                    stats = generation_stats.setdefault(gen_num, [])
+                    stats.append((max_fitness, avg_fitness))
+                    if len(stats) == self.islands:
+                        self._report(gen_num, generation_stats.pop(gen_num))
+                else:
+                    _, island, checkpoint = message
+                    final[island] = checkpoint
+            for process in processes:
+                process.join()
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        if save_result:
+            save_champion(self.checkpoint([final[i] for i in range(self.islands)]))
+
+        if display_champion and self.champion is not None:
+            from main import Game
+
+            input("Done, press ENTER to start the simulation.")
+            game = Game(physics_step=self.gym_kwargs.get("physics_step", PHYSICS_STEP))
+            game.start(ship_ai=self.champion)
+
+        return self.champion  # type: ignore
+
+    def checkpoint(self, islands: Sequence["Checkpoint"]) -> "Checkpoint":
+        """
+        All islands' final populations as one checkpoint with the champion in front, so
+        `Game.load_ai` plays it and `GeneticGym.restore` can carry on as one population of
+        `islands * population_size`. The champion takes the place of its copy in the
+        populations, or of the newest offspring of the last island if it died out.
+        """
+        from ai.checkpoint import Checkpoint
+
+        first = islands[0]
+        assert self.champion is not None
+        champion = self.champion.genome()
+        population = np.concatenate([island.population for island in islands])
+        copies = np.flatnonzero((population == champion).all(axis=1))
+        row = copies[0] if len(copies) else len(population) - 1
+        return Checkpoint(
+            population=np.concatenate([champion[None], np.delete(population, row, axis=0)]),
+            layout=first.layout,
+            generation=first.generation,
+            rng_state=first.rng_state,
+            mutation_schedule=first.mutation_schedule,
+            fitness_history=np.array(self.fitness_history).reshape(-1, 2),
+            config={
+                **first.config,
+                "islands": self.islands,
+                "migration_interval": self.migration_interval,
+                "migrants": self.migrants,
+                "topology": self.topology if isinstance(self.topology, str) else "custom",
+            },
+        )
+
+    def _report(self, gen_num: int, stats: list) -> None:
+        max_fitness = max(island_max for island_max, _ in stats)
+        avg_fitness = float(np.mean([island_avg for _, island_avg in stats]))
+        self.fitness_history.append((max_fitness, avg_fitness))
+        print(
+            f"gen = {gen_num}, max_fitness = {max_fitness}, avg_fitness = {avg_fitness}, "
+            f"champion = {self.champion_fitness}"
+        )
+
+    @staticmethod
+    def _receive(reports: "multiprocessing.Queue", processes: list) -> tuple:
+        """The next report of an island, fails if an island died instead of sending it."""
+        while True:
+            try:
+                return reports.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                for island, process in enumerate(processes):
+                    if process.exitcode not in (None, 0):
+                        raise RuntimeError(
+                            f"island {island} stopped with exit code {process.exitcode}"
+                        )
+
+
+def _run_island(
+    island: int,
+    generations: int,
+    seed: "np.random.SeedSequence",
+    population_size: int,
+    gym_kwargs: dict,
+    migration_interval: int,
+    migrants: int,
+    outboxes: list,
+    arrivals: int,
+    inbox: "multiprocessing.Queue",
+    reports: "multiprocessing.Queue",
+) -> None:
+    """Evolves one island, trading migrants through the queues and reporting every generation."""
+    if gym_kwargs.get("cache_path") is not None:
+        gym_kwargs = {**gym_kwargs, "cache_path": f"{gym_kwargs['cache_path']}.{island}"}
+    gym = GeneticGym(population_size, seed=seed, **gym_kwargs)  # type: ignore
+    # migrants of later migrations, from islands that got ahead of this one
+    early: list[tuple] = []
+    try:
+        while gym.gen_num < generations:
+            max_fitness, avg_fitness = gym.next_generation()
+            fitness = np.asarray(gym.last_fitness)
+            best = int(np.argmax(fitness))
+            reports.put(
+                (
+                    "generation",
+                    island,
+                    gym.gen_num,
+                    max_fitness,
+                    avg_fitness,
+                    gym.last_genomes[best],  # type: ignore
+                    gym.layout,
+                    float(fitness[best]),
+                )
+            )
+
+            if migrants and migration_interval > 0 and gym.gen_num % migration_interval == 0:
+                fittest = np.argsort(-fitness, kind="stable")[:migrants]
+                emigrants = gym.last_genomes[fittest]  # type: ignore
+                for outbox in outboxes:
+                    outbox.put((gym.gen_num, island, emigrants))
+                arrived = [message for message in early if message[0] == gym.gen_num]
+                early = [message for message in early if message[0] != gym.gen_num]
+                while len(arrived) < arrivals:
+                    message = inbox.get()
+                    (arrived if message[0] == gym.gen_num else early).append(message)
+                # sorted by sender, the arrival order mustn't change the population
+                arrived.sort(key=lambda message: message[1])
+                if arrived:
+                    immigrants = np.concatenate([genomes for *_, genomes in arrived])
+                    immigrants = immigrants[: population_size - GeneticGym._ELITES_COUNT]
+                    gym.genomes[len(gym.genomes) - len(immigrants) :] = immigrants
+        reports.put(("done", island, gym.checkpoint()))
+    finally:
+        gym.close()
+        gym.fitness_cache.save()
+
+
+if __name__ == "__main__":
+    IslandModel(islands=4, population_size=25, backend="vector").train(
+        generations=50, save_result=True
+    )
@@ -1,10 +1,11 @@
 """A simple neural network implementation."""
 
-from typing import TYPE_CHECKING, Callable, Optional, Union
+import threading
+from typing import TYPE_CHECKING, Callable, Optional, Sequence, Union
 
 import numpy as np
 
-from constants import SCREEN_HEIGHT, SCREEN_WIDTH
+from constants import SCREEN_DIAGONAL, SCREEN_HEIGHT, SCREEN_WIDTH
 
 if TYPE_CHECKING:
     import numpy.typing as npt
@@ -14,18 +15,41 @@ if TYPE_CHECKING:
     NDArray = npt.NDArray[np.float64]
 
 
-SCREEN_DIAGONAL = np.sqrt(SCREEN_HEIGHT**2 + SCREEN_WIDTH**2)
-
-
 def relu(x: "NDArray") -> "NDArray":
     """ReLU activation function - max(0, x)."""
     return np.maximum(0, x)
 
 
 def softmax(x: "NDArray") -> "NDArray":
-    """Softmax activation function - e ^ x_0 / sum(e ^ x_i)."""
-    exp_x = np.exp(x - np.max(x))
-    return exp_x / np.sum(exp_x)
+    """Softmax activation function - e ^ x_0 / sum(e ^ x_i), row-wise for batches."""
+    exp_x = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return exp_x / np.sum(exp_x, axis=-1, keepdims=True)
+
+
+def relu_(x: "NDArray") -> "NDArray":
+    """In place `relu`, overwrites `x`."""
+    return np.maximum(x, 0, out=x)
+
+
+def softmax_(x: "NDArray") -> "NDArray":
+    """In place `softmax`, overwrites `x`."""
+    x -= x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+
+IN_PLACE_ACTIVATIONS: dict[Callable, Callable] = {relu: relu_, softmax: softmax_}
+"""In place versions of the activations, used by `NeuralNetwork.predict`."""
+
+ACTIVATIONS: dict[str, Callable] = {"relu": relu, "softmax": softmax}
+"""Activations by the name they're stored under in checkpoints."""
+
+ARGMAX_PRESERVING: set[Callable] = {softmax}
+"""
+Output activations that never change which output is the largest, they're skipped when
+only the chosen action is needed.
+"""
 
 
 def he_scale(dim: int) -> "NDArray":
@@ -43,12 +67,12 @@ class DenseLayer:
         activation: Callable[["NDArray"], "NDArray"],
         weights: Optional["NDArray"] = None,
         biases: Optional["NDArray"] = None,
+        rng: Optional["np.random.Generator"] = None,
     ):
-        self.weights = (
-            weights
-            if weights is not None
-            else np.random.randn(input_dim, output_dim) * he_scale(input_dim)
-        )
+        if weights is None:
+            rng = rng or np.random.default_rng()
+            weights = rng.standard_normal((input_dim, output_dim)) * he_scale(input_dim)
+        self.weights = weights
         self.biases = biases if biases is not None else np.zeros(output_dim)
         self.activation = activation
 
@@ -60,18 +84,98 @@ class DenseLayer:
 class NeuralNetwork:
     def __init__(self, *layers: "DenseLayer"):
         self.layers = layers
+        self._buffers = threading.local()
+        """Scratch arrays of `predict`, per thread so a network can be shared between threads."""
 
     def predict(self, inputs: Union["NDArray", "GameState"]):
         """Calculate NN output."""
         # parse game state to inputs for the NN
         if not isinstance(inputs, np.ndarray):
             inputs = self.get_inputs(inputs)
+        if inputs.ndim != 1:
+            for layer in self.layers:
+                inputs = layer.forward(inputs)
+            return np.argmax(inputs, axis=-1)
 
-        for layer in self.layers:
-            inputs = layer.forward(inputs)
+        # a single row goes through the layers in preallocated arrays
+        buffers = self._layer_buffers()
+        for layer, out in zip(self.layers, buffers):
+            np.dot(inputs, layer.weights, out=out)
+            out += layer.biases
+            in_place = IN_PLACE_ACTIVATIONS.get(layer.activation)
+            if in_place is not None:
+                in_place(out)
+            else:
+                out[:] = layer.activation(out)
+            inputs = out
 
         return np.argmax(inputs)
 
+    def _layer_buffers(self) -> list["NDArray"]:
+        """
+        Output arrays of every layer for a single input row, allocated on first use in
+        each thread.
+        """
+        # unpickled networks don't have the attribute, see `__getstate__`
+        local = getattr(self, "_buffers", None)
+        if local is None:
+            local = self._buffers = threading.local()
+        buffers = getattr(local, "arrays", None)
+        if buffers is None:
+            buffers = local.arrays = [np.empty(layer.weights.shape[1]) for layer in self.layers]
+        return buffers
+
+    def __getstate__(self) -> dict:
+        # scratch space isn't worth pickling, and thread-local storage can't be
+        state = self.__dict__.copy()
+        state.pop("_buffers", None)
+        return state
+
+    @property
+    def layout(self) -> list[tuple[int, int, str]]:
+        """(input size, output size, activation name) of each layer, see `ACTIVATIONS`."""
+        names = {activation: name for name, activation in ACTIVATIONS.items()}
+        return [
+            (*layer.weights.shape, names[layer.activation]) for layer in self.layers  # type: ignore
+        ]
+
+    def genome(self) -> "NDArray":
+        """All weights and biases in one flat array, layer by layer, weights first."""
+        return np.concatenate(
+            [array.ravel() for layer in self.layers for array in (layer.weights, layer.biases)]
+        )
+
+    @classmethod
+    def from_genome(cls, genome: "NDArray", layout: list[tuple[int, int, str]]) -> "NeuralNetwork":
+        """
+        A network whose layers are views into `genome` (see `genome`), no weights are
+        copied - changes to the layers show in the genome and the other way around.
+        """
+        if len(genome) != genome_length(layout):
+            raise ValueError(f"a genome of {len(genome)} values doesn't fit the layout {layout}")
+        layers, start = [], 0
+        for input_dim, output_dim, activation in layout:
+            weights = genome[start : start + input_dim * output_dim].reshape(input_dim, output_dim)
+            start += input_dim * output_dim
+            biases = genome[start : start + output_dim]
+            start += output_dim
+            layers.append(
+                DenseLayer(input_dim, output_dim, ACTIVATIONS[activation], weights, biases)
+            )
+        return cls(*layers)
+
+    def set_genome(self, genome: "NDArray") -> None:
+        """Copies a flat genome (see `genome`) into the layers' existing arrays."""
+        start = 0
+        for layer in self.layers:
+            for array in (layer.weights, layer.biases):
+                array[...] = genome[start : start + array.size].reshape(array.shape)
+                start += array.size
+
+    def compile(self, dtype: "npt.DTypeLike" = np.float64) -> "CompiledNetwork":
+        """A frozen copy of the network for fast inference, see `CompiledNetwork`."""
+        return CompiledNetwork(self, dtype)
+
     @staticmethod
     def get_inputs(game_state: "GameState") -> "NDArray":
         """Gets the NN inputs from game state."""
@@ -84,3 +188,123 @@ class NeuralNetwork:
         inputs.append(game_state.asteroid_relative_velocity.y / SCREEN_HEIGHT)
 
         return np.array(inputs)
+
+
+def genome_length(layout: list[tuple[int, int, str]]) -> int:
+    """Number of weights and biases of a network with the given layout."""
+    return sum((input_dim + 1) * output_dim for input_dim, output_dim, _ in layout)
+
+
+class CompiledNetwork:
+    """
+    A trained network frozen for inference.
+
+    The weights are copied once into contiguous arrays of `dtype`, a single input row
+    runs through preallocated outputs with in-place activations, and an output activation
+    that doesn't change the argmax is left out, since `predict` only returns the action.
+    In float64 the actions are the same as `NeuralNetwork.predict`'s, float32 halves the
+    memory traffic and may differ on near ties. Later changes to the source network's
+    weights aren't seen, compile it again.
+    """
+
+    def __init__(self, network: "NeuralNetwork", dtype: "npt.DTypeLike" = np.float64):
+        self.dtype = np.dtype(dtype)
+        self.weights = [np.ascontiguousarray(layer.weights, self.dtype) for layer in network.layers]
+        self.biases = [np.ascontiguousarray(layer.biases, self.dtype) for layer in network.layers]
+        self.activations: list[Optional[Callable]] = [
+            layer.activation for layer in network.layers
+        ]
+        if self.activations[-1] in ARGMAX_PRESERVING:
+            self.activations[-1] = None
+
+        self._layers = [
+            (weights, biases, IN_PLACE_ACTIVATIONS.get(activation), activation)  # type: ignore
+            for weights, biases, activation in zip(self.weights, self.biases, self.activations)
+        ]
+        self._buffers = threading.local()
+        """Input and layer output arrays of `predict`, per thread like `NeuralNetwork`'s."""
+
+    def predict(self, inputs: Union["NDArray", "GameState"]):
+        """The chosen action for one input row, or an array of them for a batch of rows."""
+        if not isinstance(inputs, np.ndarray):
+            inputs = NeuralNetwork.get_inputs(inputs)
+        if inputs.ndim != 1:
+            return self.predict_batch(inputs)
+
+        input_buffer, outputs = self._scratch()
+        if inputs.dtype != self.dtype:
+            input_buffer[:] = inputs
+            inputs = input_buffer
+        for (weights, biases, in_place, activation), out in zip(self._layers, outputs):
+            np.dot(inputs, weights, out=out)
+            out += biases
+            if in_place is not None:
+                in_place(out)
+            elif activation is not None:
+                out[:] = activation(out)
+            inputs = out
+
+        return inputs.argmax()
+
+    def _scratch(self) -> tuple["NDArray", list["NDArray"]]:
+        """The calling thread's input array and layer outputs, allocated on first use."""
+        # unpickled networks don't have the attribute, see `__getstate__`
+        local = getattr(self, "_buffers", None)
+        if local is None:
+            local = self._buffers = threading.local()
+        scratch = getattr(local, "arrays", None)
+        if scratch is None:
+            scratch = local.arrays = (
+                np.empty(self.weights[0].shape[0], self.dtype),
+                [np.empty(weights.shape[1], self.dtype) for weights in self.weights],
+            )
+        return scratch
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("_buffers", None)
+        return state
+
+    def predict_batch(self, inputs: "NDArray") -> "NDArray":
+        """The chosen actions for a (N, inputs) batch, one matrix product per layer."""
+        values = np.asarray(inputs, self.dtype)
+        for weights, biases, activation in zip(self.weights, self.biases, self.activations):
+            values = values @ weights
+            values += biases
+            if activation is not None:
+                values = IN_PLACE_ACTIVATIONS.get(activation, activation)(values)
+
+        return values.argmax(axis=-1)
+
+
+class StackedNetworks:
+    """
+    Many networks of the same architecture evaluated together - the weights of each layer
+    are stacked along a new first axis so one batched forward pass serves them all.
+    """
+
+    def __init__(self, networks: Sequence["NeuralNetwork"]):
+        layers = list(zip(*(nn.layers for nn in networks)))
+        self.weights = [np.stack([layer.weights for layer in stack]) for stack in layers]
+        self.biases = [np.stack([layer.biases for layer in stack]) for stack in layers]
+        self.activations = [stack[0].activation for stack in layers]
+
+    def __len__(self) -> int:
+        return len(self.weights[0])
+
+    def select(self, indices: Sequence[int]) -> None:
+        """Keeps only the networks at `indices`, in that order."""
+        self.weights = [weights[indices] for weights in self.weights]
+        self.biases = [biases[indices] for biases in self.biases]
+
+    def predict(self, inputs: "NDArray") -> "NDArray":
+        """Calculate the output of every network, row `i` of `inputs` is fed to network `i`."""
+        activations = self.activations
+        if activations[-1] in ARGMAX_PRESERVING:
+            activations = activations[:-1] + [None]
+        for weights, biases, activation in zip(self.weights, self.biases, activations):
+            inputs = np.einsum("ni,nio->no", inputs, weights) + biases
+            if activation is not None:
+                inputs = activation(inputs)
+
+        return np.argmax(inputs, axis=-1)
@@ -0,0 +1,155 @@
+"""
+Successive halving - every individual plays a few games, only the best part of them moves
+on to more (and, with `Rung.max_frames`, longer) ones, so most games are played by the
+individuals that are in the running for selection.
+"""
+
+import dataclasses
+import math
+from collections import Counter
+from typing import TYPE_CHECKING, Optional, Sequence
+
+import numpy as np
+
+from budget import EvalBudget
+
+if TYPE_CHECKING:
+    from ai.genetic_gym import GeneticGym
+    from ai.nn import NDArray, NeuralNetwork
+
+
+@dataclasses.dataclass(frozen=True)
+class Rung:
+    """One round of a race - how many games each individual plays and how long they may be."""
+
+    episodes: int
+    max_frames: Optional[int] = None
+    """Frame limit of the games, None leaves it to the gym's budget."""
+
+
+DEFAULT_RUNGS = (Rung(2), Rung(4))
+"""
+Full games all the way - capping the early ones at a few hundred frames rates ships by
+how long they survive rather than how well they play, and ranked worse in the benchmark.
+"""
+
+
+@dataclasses.dataclass
+class RaceResult:
+    """Outcome of a race, every array has an entry per individual in population order."""
+
+    fitness: "NDArray"
+    """
+    What selection goes by - the mean fitness on the last rung an individual played,
+    lowered where needed so nobody ranks above an individual that got further.
+    """
+    mean: "NDArray"
+    """Mean fitness over the games of the last rung an individual played."""
+    stderr: "NDArray"
+    """Standard error of `mean`, NaN when it's from a single game."""
+    rung: "NDArray"
+    """Index of the last rung an individual played."""
+    episodes: "NDArray"
+    """Games an individual played over the whole race."""
+
+    def lower_bound(self, z: float = 1.96) -> "NDArray":
+        """Lower end of the confidence interval of `mean`, 95% by default."""
+        return self.mean - z * np.nan_to_num(self.stderr, nan=np.inf)
+
+    def upper_bound(self, z: float = 1.96) -> "NDArray":
+        """Upper end of the confidence interval of `mean`, 95% by default."""
+        return self.mean + z * np.nan_to_num(self.stderr, nan=np.inf)
+
+
+class SuccessiveHalving:
+    """
+    Evaluates a population over the `rungs` of a race. The individuals of a rung all play
+    the same seeds, so they're compared on equal terms, and the `keep` best fraction of
+    them (at least `min_survivors`) moves on to the next rung with fresh seeds.
+    """
+
+    def __init__(
+        self, rungs: Sequence[Rung] = DEFAULT_RUNGS, keep: float = 0.5, min_survivors: int = 2
+    ):
+        if not rungs:
+            raise ValueError("a race needs at least one rung")
+        if not 0 < keep <= 1:
+            raise ValueError("the kept fraction must be in (0, 1]")
+        self.rungs = tuple(rungs)
+        self.keep = keep
+        self.min_survivors = min_survivors
+
+    def race(self, gym: "GeneticGym", ships: Sequence["NeuralNetwork"]) -> RaceResult:
+        """Races the ships, their games are played (and cached) by the gym."""
+        count = len(ships)
+        mean = np.zeros(count)
+        stderr = np.full(count, np.nan)
+        rung_reached = np.zeros(count, dtype=int)
+        episodes = np.zeros(count, dtype=int)
+        terminations: Counter = Counter()
+
+        running = np.arange(count)
+        for r, rung in enumerate(self.rungs):
+            seeds = self._seeds(gym, r, rung.episodes)
+            fitness = gym.evaluate(
+                [ships[i] for i in running for _ in seeds],
+                seeds * len(running),
+                self._budget(gym.budget, rung),
+                prune=False,
+            )
+            terminations.update(gym.terminations)
+
+            table = np.reshape(fitness, (len(running), len(seeds)))
+            mean[running] = table.mean(axis=1)
+            if len(seeds) > 1:
+                stderr[running] = table.std(axis=1, ddof=1) / math.sqrt(len(seeds))
+            rung_reached[running] = r
+            episodes[running] += len(seeds)
+
+            if r == len(self.rungs) - 1:
+                break
+            survivors = max(math.ceil(len(running) * self.keep), self.min_survivors)
+            order = np.argsort(-mean[running], kind="stable")
+            running = running[order[:survivors]]
+
+        gym.terminations = terminations
+        return RaceResult(
+            fitness=self._ranked(mean, rung_reached),
+            mean=mean,
+            stderr=stderr,
+            rung=rung_reached,
+            episodes=episodes,
+        )
+
+    @staticmethod
+    def _seeds(gym: "GeneticGym", rung: int, episodes: int) -> list[int]:
+        """Seeds of a rung - fresh ones from the gym, or fixed ones if the gym fixes its seed."""
+        if gym.eval_seed is None:
+            return gym.eval_seeds(episodes)
+        return np.random.default_rng((gym.eval_seed, rung)).integers(2**32, size=episodes).tolist()
+
+    @staticmethod
+    def _budget(budget: Optional[EvalBudget], rung: Rung) -> Optional[EvalBudget]:
+        """The gym's budget with the rung's frame limit, whichever is tighter."""
+        if rung.max_frames is None:
+            return budget
+        budget = budget or EvalBudget()
+        max_frames = rung.max_frames
+        if budget.max_frames is not None:
+            max_frames = min(max_frames, budget.max_frames)
+        return dataclasses.replace(budget, max_frames=max_frames)
+
+    @staticmethod
+    def _ranked(mean: "NDArray", rung: "NDArray") -> "NDArray":
+        """
+        Caps the fitness of every individual at the lowest fitness of those that got
+        further, short games on an early rung can't outrank long games on a later one.
+        """
+        fitness = mean.copy()
+        floor = np.inf
+        for r in range(int(rung.max()), -1, -1):
+            reached = rung == r
+            fitness[reached] = np.minimum(mean[reached], floor)
+            if reached.any():
+                floor = min(floor, float(fitness[reached].min()))
+        return fitness
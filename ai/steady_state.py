@@ -0,0 +1,303 @@
+"""
+Steady-state evolution - there are no generations to wait for. Whenever a game finishes,
+its individual joins the population right away and the freed worker gets a new child,
+so a long game only holds up its own worker instead of the whole generation.
+"""
+
+import dataclasses
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Optional
+
+import numpy as np
+
+from ai.genetic_gym import GeneticGym, _init_worker, _play_worker, save_champion
+from ai.nn import NeuralNetwork
+from budget import EvalBudget, SimResult, Termination
+
+REPLACEMENTS = ("worst", "tournament")
+"""
+`worst` - a child takes the place of the population's worst individual if it's fitter.
+`tournament` - a child takes the place of the loser of a random tournament, always.
+"""
+
+
+@dataclasses.dataclass
+class SteadyStateStats:
+    """Throughput of a steady-state run."""
+
+    evaluations: int = 0
+    """Games played, individuals the fitness cache knew don't count."""
+    seconds: float = 0.0
+    """Wall-clock time of the run."""
+    busy_seconds: float = 0.0
+    """Wall-clock time the workers spent playing games, summed over the workers."""
+    workers: int = 1
+
+    @property
+    def evals_per_second(self) -> float:
+        return self.evaluations / self.seconds if self.seconds else 0.0
+
+    @property
+    def utilisation(self) -> float:
+        """Share of the workers' time spent playing games."""
+        return self.busy_seconds / (self.seconds * self.workers) if self.seconds else 0.0
+
+
+class SteadyState:
+    """
+    Evolves the population of `gym` one individual at a time, with the gym's operators,
+    rng and evaluation settings. The workers are kept `in_flight` games busy each, so a
+    new game is already waiting when one finishes.
+
+    Breeding happens while games are still running, so a child's parents are picked
+    from the population as it is then - the steady-state trade of a little staleness
+    for never waiting.
+
+    Individuals the gym's fitness cache knows are scored from it without a game, every
+    game played is added to it - the same way `GeneticGym.evaluate` does.
+    """
+
+    def __init__(
+        self,
+        gym: GeneticGym,
+        replacement: str = "worst",
+        tournament_k: int = 3,
+        in_flight: int = 2,
+    ):
+        if replacement not in REPLACEMENTS:
+            raise ValueError(f"unknown replacement {replacement!r}, expected one of {REPLACEMENTS}")
+        self.gym = gym
+        self.replacement = replacement
+        self.tournament_k = tournament_k
+        self.in_flight = in_flight
+        """Games queued per worker."""
+        self.fitness = np.full(gym.population_size, np.nan)
+        """Fitness of each individual of `gym.genomes`, NaN until its game is back."""
+        self._scored = gym.genomes
+        """The genomes `fitness` belongs to."""
+        self.stats = SteadyStateStats()
+        """Throughput of the last `run`."""
+        self.evaluations = 0
+        """Games played over all runs."""
+
+    def run(
+        self, evaluations: int, *, workers: Optional[int] = None, report_every: Optional[int] = None
+    ) -> SteadyStateStats:
+        """
+        Plays `evaluations` more games, the not yet evaluated individuals of the population
+        first. Progress is printed every `report_every` games, a population's worth by default.
+        """
+        gym = self.gym
+        if gym.population_size < 2:
+            raise ValueError("steady-state evolution needs a population of at least 2 to breed")
+        if gym.genomes is not self._scored:
+            # the gym got a new population since (restored or bred), none of it is scored
+            self.fitness = np.full(len(gym.genomes), np.nan)
+            self._scored = gym.genomes
+        if workers is not None:
+            gym.workers = workers
+        workers = max(gym.workers, 1)
+        report_every = report_every or gym.population_size
+        self.stats = SteadyStateStats(workers=workers)
+        gym.terminations = Counter()
+        # serially a game is played as soon as it's submitted, queueing more gains nothing
+        capacity = workers * self.in_flight if workers > 1 else 1
+        unevaluated = [int(i) for i in np.flatnonzero(np.isnan(self.fitness))]
+        submitted = 0
+        start = time.perf_counter()
+
+        pool = (
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+            if workers > 1
+            else None
+        )
+        game = gym.game_key(gym.budget)
+        pending: dict[Future, tuple[Optional[int], "np.ndarray", tuple]] = {}
+        try:
+            while self.stats.evaluations < evaluations:
+                while submitted < evaluations and len(pending) < capacity:
+                    if unevaluated:
+                        slot: Optional[int] = unevaluated.pop(0)
+                        genome = gym.genomes[slot]
+                    elif np.count_nonzero(~np.isnan(self.fitness)) >= 2:
+                        slot, genome = None, self.breed()
+                    else:
+                        # nothing to breed from until the first games are back
+                        break
+                    seed = gym.eval_seeds(1)[0]
+                    ship = NeuralNetwork.from_genome(genome, gym.layout)
+                    key = gym.fitness_cache.key(ship, seed, game)
+                    cached = gym.fitness_cache.get(key)
+                    if cached is not None:
+                        self._place(slot, genome, cached)
+                        continue
+                    pending[self._submit(pool, genome, seed)] = (slot, genome, key)
+                    submitted += 1
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    slot, genome, key = pending.pop(future)
+                    result, busy = future.result()
+                    self.stats.busy_seconds += busy
+                    self.stats.evaluations += 1
+                    self.evaluations += 1
+                    fitness = gym.fitness(result, gym.budget)
+                    gym.terminations[result.reason] += 1
+                    # a wall-clock cut depends on the machine, a pruned one on the threshold
+                    if result.reason not in (Termination.WALL_CLOCK, Termination.OUT_OF_REACH):
+                        gym.fitness_cache.put(key, fitness)
+                    self._place(slot, genome, fitness)
+                    self._advance()
+                    self.stats.seconds = time.perf_counter() - start
+                    if self.stats.evaluations % report_every == 0:
+                        self._report()
+        finally:
+            for future in pending:
+                future.cancel()
+            if pool is not None:
+                pool.shutdown()
+            self.stats.seconds = time.perf_counter() - start
+
+        self._sort()
+        return self.stats
+
+    def train(
+        self,
+        evaluations: int = 5000,
+        *,
+        save_result: bool = False,
+        display_champion: bool = True,
+        workers: Optional[int] = None,
+    ) -> SteadyStateStats:
+        """Like `GeneticGym.train`, for `evaluations` more games instead of generations."""
+        stats = self.run(evaluations, workers=workers)
+        print(
+            f"{stats.evaluations} evaluations in {stats.seconds:.1f}s, "
+            f"evals/s = {stats.evals_per_second:.1f}, utilisation = {stats.utilisation:.0%}"
+        )
+        if save_result:
+            save_champion(self.gym.checkpoint())
+
+        if display_champion:
+            from main import Game
+
+            input("Done, press ENTER to start the simulation.")
+            game = Game(physics_step=self.gym.physics_step)
+            game.start(ship_ai=self.gym.population[0])
+        return stats
+
+    def breed(self) -> "np.ndarray":
+        """A child of two distinct tournament winners among the evaluated individuals."""
+        gym = self.gym
+        first = self._tournament(largest=True)
+        second = self._tournament(largest=True, exclude=first)
+        child = gym.crossover_genomes(gym.genomes[first][None], gym.genomes[second][None])
+        gym.mutate_genomes(child)
+        return child[0]
+
+    def _place(self, slot: Optional[int], genome: "np.ndarray", fitness: float) -> None:
+        """Scores an individual of the population, or inserts a child."""
+        if slot is not None:
+            self.fitness[slot] = fitness
+        else:
+            self.insert(genome, fitness)
+
+    def insert(self, genome: "np.ndarray", fitness: float) -> None:
+        """Puts an evaluated child into the population, as `replacement` says."""
+        if self.replacement == "worst":
+            loser = int(np.nanargmin(self.fitness))
+            if fitness <= self.fitness[loser]:
+                return
+        else:
+            loser = self._tournament(largest=False)
+        # the networks are views into `genomes`, they see the new weights too
+        self.gym.genomes[loser] = genome
+        self.fitness[loser] = fitness
+
+    def _tournament(self, largest: bool, exclude: Optional[int] = None) -> int:
+        """Winner (or loser) of a tournament between `tournament_k` evaluated individuals."""
+        candidates = np.flatnonzero(~np.isnan(self.fitness))
+        if exclude is not None:
+            candidates = candidates[candidates != exclude]
+        size = min(self.tournament_k, len(candidates))
+        entrants = self.gym.rng.choice(candidates, size=size, replace=False)
+        scores = self.fitness[entrants]
+        return int(entrants[np.argmax(scores) if largest else np.argmin(scores)])
+
+    def _advance(self) -> None:
+        """
+        Counts a population's worth of games as a generation, for the mutation schedule
+        and the fitness history.
+        """
+        gym = self.gym
+        generation = self.evaluations // gym.population_size
+        while gym.gen_num < generation:
+            gym.gen_num += 1
+            gym._mutation_rate = gym._mutation_strength = None
+            gym.fitness_history.append(
+                (float(np.nanmax(self.fitness)), float(np.nanmean(self.fitness)))
+            )
+
+    def _submit(
+        self, pool: Optional[ProcessPoolExecutor], genome: "np.ndarray", seed: int
+    ) -> Future:
+        gym = self.gym
+        budget = self._budget()
+        # a single game plays the same on its own as in a lock-step batch
+        backend = "vector" if gym.backend == "batched" else gym.backend
+        args = (
+            genome,
+            gym.layout,
+            seed,
+            backend,
+            gym.precise_collisions,
+            gym.physics_step,
+            budget,
+        )
+        if pool is not None:
+            return pool.submit(_timed_play_worker, *args)
+        future: Future = Future()
+        future.set_result(_timed_play_worker(*args))
+        return future
+
+    def _budget(self) -> Optional[EvalBudget]:
+        """
+        The gym's budget - with `worst` replacement a child that can't beat the worst
+        individual is thrown away anyway, so its game stops once that's certain.
+        """
+        budget = self.gym.budget
+        if budget is None or self.replacement != "worst" or np.isnan(self.fitness).any():
+            return budget
+        return dataclasses.replace(budget, fitness_to_beat=float(self.fitness.min()))
+
+    def _sort(self) -> None:
+        """Orders the population fittest first, so the champion is `population[0]`."""
+        order = np.argsort(-np.nan_to_num(self.fitness, nan=-np.inf), kind="stable")
+        self.gym.set_genomes(self.gym.genomes[order])
+        self.fitness = self.fitness[order]
+        self._scored = self.gym.genomes
+        self.gym.last_genomes, self.gym.last_fitness = self.gym.genomes, self.fitness.tolist()
+
+    def _report(self) -> None:
+        stats = self.stats
+        print(
+            f"evals = {stats.evaluations}, max_fitness = {np.nanmax(self.fitness)}, "
+            f"avg_fitness = {np.nanmean(self.fitness)}, evals/s = {stats.evals_per_second:.1f}, "
+            f"utilisation = {stats.utilisation:.0%}"
+        )
+
+
+def _timed_play_worker(*args) -> tuple[SimResult, float]:
+    """Plays a game like `_play_worker`, along with the wall-clock time it took."""
+    start = time.perf_counter()
+    result = _play_worker(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    SteadyState(GeneticGym(population_size=100)).train(
+        evaluations=5000, save_result=True, workers=os.cpu_count()
+    )
@@ -1,7 +1,8 @@
-from typing import Optional
+from typing import TYPE_CHECKING, Iterable, Optional
 from circleshape import CircleShape
+from collisions import ConvexHull
+import numpy as np
 import pygame
-import random
 from constants import (
     ASTEROID_MAX_RADIUS,
     ASTEROID_MIN_RADIUS,
@@ -10,67 +11,128 @@ from constants import (
 )
 from debris import DebrisParticle
 from math import radians, sin, cos
+from utils import rotate_points
+
+if TYPE_CHECKING:
+    from world import World
+
+SHAPE_VERTICES = 16
+SHAPE_SPIKINESS = 0.3
+"""Largest share of the radius a vertex of the outline is pulled in by."""
 
 
 class Asteroid(CircleShape):
     """Asteroid class."""
 
-    def __init__(self, x: float, y: float, radius: float):
-        super().__init__(x=x, y=y, radius=radius)
+    group_names = ("updateables", "drawables", "asteroids")
+
+    OUTLINE_ANGLE_STEP = 1.0
+    """
+    Rotations are quantised to this many degrees for the outline, it's only recomputed
+    once the asteroid turns into the next step.
+    """
+    _ANGLE_STEPS = round(360 / OUTLINE_ANGLE_STEP)
+
+    def __init__(
+        self, x: float, y: float, radius: float, world: Optional["World"] = None
+    ):
+        super().__init__(x=x, y=y, radius=radius, world=world)
         self.health_points = self.radius
         self.shape_points = self.generate_shape_points()
         self.rotation_angle = 0
-        self.rotation_speed = random.uniform(-40, 40)
-
-    def generate_shape_points(self, spikiness=0.3, num_vertices=16):
-        """Generates edged shape to better represent an asteroid."""
+        self.rotation_speed = self.rng.uniform(-40, 40)
+        self._outline_step: Optional[int] = None
+        self._outline = self.shape_points
+        self._polygon: list = []
+        self._polygon_key: Optional[tuple] = None
+        self._hull: Optional[ConvexHull] = None
+
+    def generate_shape_points(
+        self, spikiness=SHAPE_SPIKINESS, num_vertices=SHAPE_VERTICES
+    ) -> np.ndarray:
+        """Generates edged shape to better represent an asteroid, (V, 2) points relative to its center."""
         angle_step = 360 / num_vertices
         points = []
 
         for i in range(num_vertices):
             angle_deg = i * angle_step
             angle_rad = radians(angle_deg)
-            reduction = random.uniform(0, spikiness * self.radius)
+            reduction = self.rng.uniform(0, spikiness * self.radius)
             rad = max(2, self.radius - reduction)
 
             x = rad * cos(angle_rad)
             y = rad * sin(angle_rad)
             points.append((x, y))
 
-        return points
+        return np.array(points)
 
     def draw(self, screen: "pygame.Surface") -> None:
         """Draws asteroid."""
+        if self._polygon_key == (self.position.x, self.position.y, self.rotation_angle):  # type: ignore
+            polygon = self._polygon
+        else:
+            polygon = self.get_rotated_points().tolist()
+        pygame.draw.polygon(screen, "white", polygon, width=2)
+
+    def get_rotated_points(self) -> np.ndarray:
+        """The asteroid's outline - (V, 2) rotated points in screen coordinates."""
+        step = round(self.rotation_angle / self.OUTLINE_ANGLE_STEP) % self._ANGLE_STEPS
+        if self._outline_step != step:
+            self._outline = rotate_points(
+                self.shape_points[np.newaxis], np.array([step * self.OUTLINE_ANGLE_STEP])
+            )[0]
+            self._outline_step = step
+        return self._outline + (self.position.x, self.position.y)
+
+    @staticmethod
+    def prepare_outlines(asteroids: Iterable["Asteroid"]) -> None:
+        """
+        Rotates the outlines of all asteroids that turned since they were last drawn and
+        moves them into place, in one vectorised operation per vertex count. Called once
+        per frame before drawing, so `draw` only hands the polygons to pygame.
+        """
+        by_vertices: dict[int, list["Asteroid"]] = {}
+        for asteroid in asteroids:
+            by_vertices.setdefault(len(asteroid.shape_points), []).append(asteroid)
+
+        for group in by_vertices.values():
+            keys = [(a.position.x, a.position.y, a.rotation_angle) for a in group]  # type: ignore
+            state = np.array(keys)
+            steps = np.round(state[:, 2] / Asteroid.OUTLINE_ANGLE_STEP).astype(int)
+            steps %= Asteroid._ANGLE_STEPS
+            cached = np.array([a._outline_step for a in group], dtype=float)
+            stale = np.flatnonzero(steps != cached).tolist()
+            if stale:
+                shapes = np.stack([group[i].shape_points for i in stale])
+                outlines = rotate_points(shapes, steps[stale] * Asteroid.OUTLINE_ANGLE_STEP)
+                for i, outline, step in zip(stale, outlines, steps[stale].tolist()):
+                    group[i]._outline, group[i]._outline_step = outline, step
+
+            polygons = np.stack([a._outline for a in group])
+            polygons += state[:, np.newaxis, :2]
+            for asteroid, key, polygon in zip(group, keys, polygons.tolist()):
+                asteroid._polygon, asteroid._polygon_key = polygon, key
+
+    @property
+    def hull(self) -> ConvexHull:
+        """Convex hull of the unrotated shape, computed on first use."""
+        if self._hull is None:
+            self._hull = ConvexHull(self.shape_points)
+        return self._hull
+
+    def overlaps(self, obj: "CircleShape") -> bool:
+        """
+        Precise test of a round object against the asteroid's rotated hull, only worth
+        calling when the bounding circles already collide.
+        """
         angle_rad = radians(self.rotation_angle)
-        cos_a = cos(angle_rad)
-        sin_a = sin(angle_rad)
-
-        rotated = []
-        for point in self.shape_points:
-            dx, dy = point
-            rx = dx * cos_a - dy * sin_a
-            ry = dx * sin_a + dy * cos_a
-            rotated.append((self.position.x + rx, self.position.y + ry))  # type: ignore
-
-        pygame.draw.polygon(screen, "white", rotated, width=2)
-
-    def get_rotated_points(self):
-        """Calculate rotating points."""
-        rotated = []
-        angle_rad = radians(self.rotation_angle)
-        cos_a = cos(angle_rad)
-        sin_a = sin(angle_rad)
-
-        for point in self.shape_points:
-            dx = point[0] - self.position.x  # type: ignore
-            dy = point[1] - self.position.y  # type: ignore
-
-            rx = dx * cos_a - dy * sin_a
-            ry = dx * sin_a + dy * cos_a
-
-            rotated.append((self.position.x + rx, self.position.y + ry))  # type: ignore
-
-        return rotated
+        cos_a, sin_a = cos(angle_rad), sin(angle_rad)
+        dx = obj.position.x - self.position.x  # type: ignore
+        dy = obj.position.y - self.position.y  # type: ignore
+        # rotate the object into the asteroid's frame rather than the hull into the world
+        return self.hull.overlaps_circle(
+            dx * cos_a + dy * sin_a, -dx * sin_a + dy * cos_a, obj.radius
+        )
 
     def update(self, dt: int) -> None:
         """Called every frame."""
@@ -91,24 +153,23 @@ class Asteroid(CircleShape):
         """Splits asteroid if its not the smallest, otherwise kills it."""
         self.health_points -= damage
 
-        if hasattr(self, "containers"):
-            updateables, drawables, _ = self.containers  # type: ignore
-            self.generate_debris_effects(drawables, updateables)
+        if self.world is not None and self.world.visual_effects:
+            self.generate_debris_effects()
 
         if self.health_points <= 0:
             self.kill()
             if self.radius <= ASTEROID_MIN_RADIUS:
                 return self.get_points_for_kill()
             else:
-                v1 = self.velocity.rotate(random.uniform(20, 50))  # type: ignore
-                v2 = self.velocity.rotate(random.uniform(-20, -50))  # type: ignore
+                v1 = self.velocity.rotate(self.rng.uniform(20, 50))  # type: ignore
+                v2 = self.velocity.rotate(self.rng.uniform(-20, -50))  # type: ignore
                 new_rad = self.radius - ASTEROID_MIN_RADIUS
                 smaller_asteroid_one = Asteroid(
-                    x=self.position.x, y=self.position.y, radius=new_rad  # type: ignore
+                    x=self.position.x, y=self.position.y, radius=new_rad, world=self.world  # type: ignore
                 )
                 smaller_asteroid_one.velocity = v1 * 1.2
                 smaller_asteroid_two = Asteroid(
-                    x=self.position.x, y=self.position.y, radius=new_rad  # type: ignore
+                    x=self.position.x, y=self.position.y, radius=new_rad, world=self.world  # type: ignore
                 )
                 smaller_asteroid_two.velocity = v2 * 1.2
                 return self.get_points_for_kill() - self.radius / 2
@@ -118,20 +179,21 @@ class Asteroid(CircleShape):
         """Returns how many points this asteroid is worth."""
         return self.radius * 1.5
 
-    def generate_debris_effects(self, drawables, updateables) -> None:
+    def generate_debris_effects(self) -> None:
         """Generates effect when being shot."""
-        num_particles = random.randint(2, 4)
+        num_particles = self.fx_rng.randint(2, 4)
         for _ in range(num_particles):
-            angle = random.uniform(0, 360)
-            speed = random.uniform(50, 150)
+            angle = self.fx_rng.uniform(0, 360)
+            speed = self.fx_rng.uniform(50, 150)
             vel = (
                 self.velocity.rotate(angle) + pygame.Vector2(1, 0).rotate(angle) * speed  # type: ignore
             )
-            particle = DebrisParticle(
-                position=self.position, velocity=vel, radius=self.radius * 0.2
+            DebrisParticle.spawn(
+                position=self.position,
+                velocity=vel,
+                radius=self.radius * 0.2,
+                world=self.world,
             )
-            updateables.add(particle)
-            drawables.add(particle)
 
     def resolve_collision(self, obj) -> Optional[float]:
         """Resolves collision of asteroid with other objects in the field."""
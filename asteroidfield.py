@@ -1,14 +1,17 @@
-import random
+from typing import TYPE_CHECKING
 
 import pygame
 
 from asteroid import Asteroid
 from constants import *
 
+if TYPE_CHECKING:
+    from world import World
+
 
 class AsteroidField(pygame.sprite.Sprite):
 
-    containers: tuple["pygame.sprite.Group", ...]
+    group_names = ("updateables",)
 
     edges = [
         [
@@ -33,12 +36,13 @@ class AsteroidField(pygame.sprite.Sprite):
         ],
     ]
 
-    def __init__(self):
-        super().__init__(*self.containers)
+    def __init__(self, world: "World"):
+        super().__init__(*world.groups_for(self))
+        self.world = world
         self.spawn_timer = 0.0
 
     def spawn(self, radius, position, velocity):
-        asteroid = Asteroid(position.x, position.y, radius)
+        asteroid = Asteroid(position.x, position.y, radius, world=self.world)
         asteroid.velocity = velocity
 
     def update(self, dt):
@@ -47,10 +51,11 @@ class AsteroidField(pygame.sprite.Sprite):
             self.spawn_timer = 0
 
             # spawn a new asteroid at a random edge
-            edge = random.choice(self.edges)
-            speed = random.randint(40, 100)
+            rng = self.world.rng
+            edge = rng.choice(self.edges)
+            speed = rng.randint(40, 100)
             velocity = edge[0] * speed
-            velocity = velocity.rotate(random.randint(-30, 30))
-            position = edge[1](random.uniform(0, 1))
-            kind = random.randint(1, ASTEROID_KINDS)
+            velocity = velocity.rotate(rng.randint(-30, 30))
+            position = edge[1](rng.uniform(0, 1))
+            kind = rng.randint(1, ASTEROID_KINDS)
             self.spawn(ASTEROID_MIN_RADIUS * kind, position, velocity)
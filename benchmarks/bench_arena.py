@@ -0,0 +1,58 @@
+"""
+Games per second of a population playing the same seed - one `VectorGame` after the
+other, all of them in lock-step (`BatchedSim`) and all of them in one shared asteroid
+field (`ai.arena`), along with how much the arena's fitness differs from the others'.
+
+Run from the repo root: `python -m benchmarks.bench_arena`
+"""
+
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from ai.arena import SharedArena
+from ai.batch_sim import BatchedSim
+from ai.genetic_gym import GeneticGym
+from budget import SimResult
+
+POPULATION_SIZES = (10, 50, 200)
+SEEDS = range(3)
+
+
+def fitness(results: list[SimResult]) -> np.ndarray:
+    return np.array([GeneticGym.fitness(result) for result in results])
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'ships':>6} {'vector':>10} {'batched':>10} {'arena':>10} {'same':>6} {'corr':>6}")
+    for size in POPULATION_SIZES:
+        ships = [GeneticGym._ship_factory(rng) for _ in range(size)]
+        seconds = {"vector": 0.0, "batched": 0.0, "arena": 0.0}
+        same, correlation = [], []
+        for seed in SEEDS:
+            start = time.process_time()
+            vector = [GeneticGym.play(ship, seed, "vector") for ship in ships]
+            seconds["vector"] += time.process_time() - start
+
+            start = time.process_time()
+            BatchedSim(ships, [seed] * size).run()
+            seconds["batched"] += time.process_time() - start
+
+            start = time.process_time()
+            arena = SharedArena(ships, seed).run()
+            seconds["arena"] += time.process_time() - start
+
+            same.append(np.mean([a == v for a, v in zip(arena, vector)]))
+            correlation.append(np.corrcoef(fitness(arena), fitness(vector))[0, 1])
+
+        games = size * len(SEEDS)
+        rates = "".join(f" {games / seconds[name]:>8.1f}/s" for name in seconds)
+        print(f"{size:>6}{rates} {np.mean(same):>6.0%} {np.mean(correlation):>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
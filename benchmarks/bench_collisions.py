@@ -0,0 +1,108 @@
+"""
+Frame time of `Game._update_sprites` against asteroid count for each broad phase, and
+the overhead of the precise (hull) narrow phase on frames and on whole AI games.
+
+Run from the repo root: `python -m benchmarks.bench_collisions`
+"""
+
+import functools
+import os
+import random
+import time
+from typing import Callable
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from ai.genetic_gym import GeneticGym
+from asteroid import Asteroid
+from benchmarks.bench_world import _CountingShip
+from collisions import BruteForce, SpatialHash
+from constants import ASTEROID_KINDS, ASTEROID_MIN_RADIUS, SCREEN_HEIGHT, SCREEN_WIDTH
+from main import Game
+from shot import Shot
+
+ASTEROID_COUNTS = (10, 25, 50, 100, 200, 400)
+SHOT_COUNT = 20
+SHIPS = 20
+FRAMES = 30
+DT = 0.05
+
+
+def populated_game(
+    game_factory: Callable[..., "Game"], asteroids: int, shots: int, seed: int
+):
+    """Builds a game with a synthetic, randomly populated field."""
+    rng = random.Random(seed)
+    game = game_factory(seed=seed)
+    for _ in range(asteroids):
+        asteroid = Asteroid(
+            x=rng.uniform(0, SCREEN_WIDTH),
+            y=rng.uniform(0, SCREEN_HEIGHT),
+            radius=ASTEROID_MIN_RADIUS * rng.randint(1, ASTEROID_KINDS),
+            world=game.world,
+        )
+        asteroid.velocity.from_polar((rng.uniform(40, 100), rng.uniform(0, 360)))
+    for _ in range(shots):
+        shot = Shot(
+            x=rng.uniform(0, SCREEN_WIDTH),
+            y=rng.uniform(0, SCREEN_HEIGHT),
+            damage=17,
+            world=game.world,
+        )
+        shot.velocity.from_polar((500, rng.uniform(0, 360)))
+    return game
+
+
+def snapshot(game: "Game") -> tuple:
+    """Everything the collision step can change, used to compare broad phases."""
+    return (
+        tuple((a.position.x, a.position.y, a.velocity.x, a.velocity.y) for a in game.asteroids),
+        len(game.shots),
+        game.player.score,
+        game.player.lives,
+    )
+
+
+def run(game_factory: Callable[..., "Game"], asteroids: int, seed: int = 0) -> tuple[float, tuple]:
+    """Returns the mean frame time in ms and the final world snapshot."""
+    game = populated_game(game_factory, asteroids, SHOT_COUNT, seed)
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        game._update_sprites(dt=DT, visual_effects=False)
+    elapsed = time.perf_counter() - start
+    return elapsed / FRAMES * 1000, snapshot(game)
+
+
+def main():
+    print(f"{'asteroids':>9} {'brute force ms':>15} {'spatial hash ms':>16} {'speedup':>8}")
+    for count in ASTEROID_COUNTS:
+        brute_ms, brute_state = run(functools.partial(Game, broad_phase=BruteForce), count)
+        hash_ms, hash_state = run(functools.partial(Game, broad_phase=SpatialHash), count)
+        assert brute_state == hash_state, f"broad phases disagree for {count} asteroids"
+        print(f"{count:>9} {brute_ms:>15.3f} {hash_ms:>16.3f} {brute_ms / hash_ms:>7.1f}x")
+
+    print(f"\n{'asteroids':>9} {'circles ms':>15} {'hulls ms':>16} {'overhead':>8}")
+    for count in ASTEROID_COUNTS:
+        circle_ms, _ = run(Game, count)
+        hull_ms, _ = run(functools.partial(Game, precise_collisions=True), count)
+        print(f"{count:>9} {circle_ms:>15.3f} {hull_ms:>16.3f} {hull_ms / circle_ms - 1:>8.1%}")
+
+    circles, hulls = sim_fps(precise_collisions=False), sim_fps(precise_collisions=True)
+    print(f"\nheadless AI games: {circles:.0f} fps with circles, {hulls:.0f} fps with hulls")
+
+
+def sim_fps(precise_collisions: bool, seed: int = 0) -> float:
+    """Simulated frames per second of headless AI games, as played during training."""
+    rng = np.random.default_rng(seed)
+    ships = [_CountingShip(GeneticGym._ship_factory(rng)) for _ in range(SHIPS)]
+    start = time.perf_counter()
+    for game_seed, ship in enumerate(ships, start=seed):
+        game = Game(headless=True, seed=game_seed, precise_collisions=precise_collisions)
+        game.sim(ship, dt=DT)
+    return sum(ship.calls for ship in ships) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Inference speed of a ship's network - `NeuralNetwork.predict` against the compiled
+network (`NeuralNetwork.compile`) in float64 and float32, for single input rows as the
+game feeds them and for whole batches.
+
+Run from the repo root: `python -m benchmarks.bench_nn`
+"""
+
+import time
+from typing import Callable
+
+import numpy as np
+
+from ai.genetic_gym import GeneticGym
+
+ROWS = 2000
+BATCH_SIZES = (1, 16, 256, 4096)
+REPEATS = 5
+
+
+def _best(measure: Callable[[], float]) -> float:
+    return min(measure() for _ in range(REPEATS))
+
+
+def single_us(predict: Callable, inputs: np.ndarray) -> float:
+    """Mean latency of one prediction, row by row."""
+
+    def measure() -> float:
+        start = time.perf_counter()
+        for row in inputs:
+            predict(row)
+        return (time.perf_counter() - start) / len(inputs) * 1e6
+
+    return _best(measure)
+
+
+def batch_rows_per_s(predict: Callable, inputs: np.ndarray, batch_size: int) -> float:
+    """Rows predicted per second in batches of `batch_size`."""
+    batches = [inputs[i : i + batch_size] for i in range(0, len(inputs), batch_size)]
+
+    def measure() -> float:
+        start = time.perf_counter()
+        for batch in batches:
+            predict(batch)
+        return time.perf_counter() - start
+
+    return len(inputs) / _best(measure)
+
+
+def main():
+    ship = GeneticGym._ship_factory(np.random.default_rng(0))
+    rng = np.random.default_rng(1)
+    inputs = rng.uniform(-1, 1, (max(ROWS, *BATCH_SIZES), 5))
+    variants = {
+        "predict": ship.predict,
+        "compiled f64": ship.compile().predict,
+        "compiled f32": ship.compile(np.float32).predict,
+    }
+
+    reference = ship.predict(inputs)
+    for name, predict in variants.items():
+        agreement = float(np.mean(predict(inputs) == reference))
+        print(f"{name:>14}: {agreement:.2%} of the actions agree with `predict`")
+
+    print(f"\n{'':>14} {'us/row':>8}" + "".join(f" {f'batch {n}':>12}" for n in BATCH_SIZES))
+    for name, predict in variants.items():
+        single = single_us(predict, inputs[:ROWS])
+        rates = [batch_rows_per_s(predict, inputs, n) for n in BATCH_SIZES]
+        print(f"{name:>14} {single:>8.2f}" + "".join(f" {rate:>10.0f}/s" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
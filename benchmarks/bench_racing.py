@@ -0,0 +1,83 @@
+"""
+Selection quality per CPU-second of one game per individual, a fixed number of games per
+individual and successive halving (`ai.racing`). The reference is every individual's
+mean fitness over many games. Quality is the reference fitness of the mating pool that
+`GeneticGym.select` picks going by an evaluation, relative to the pool it picks going by
+the reference itself, averaged over a few random populations.
+
+Run from the repo root: `python -m benchmarks.bench_racing`
+"""
+
+import os
+import time
+from typing import Callable
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from ai.genetic_gym import GeneticGym
+from ai.racing import SuccessiveHalving
+
+POPULATION_SIZE = 24
+POPULATIONS = 4
+SELECTIONS = 50
+REFERENCE_GAMES = 16
+FIXED_GAMES = 4
+
+
+def pool_fitness(gym: GeneticGym, scores: np.ndarray, reference: np.ndarray) -> float:
+    """Mean reference fitness of the mating pools selected by `scores`, over many draws."""
+    gym.rng = np.random.default_rng(0)
+    return float(
+        np.mean([reference[gym.select(scores.tolist())].mean() for _ in range(SELECTIONS)])
+    )
+
+
+def quality(gym: GeneticGym, scores: np.ndarray, reference: np.ndarray) -> float:
+    """How good the mating pool picked by `scores` is, 1 for the best possible one."""
+    return pool_fitness(gym, scores, reference) / pool_fitness(gym, reference, reference)
+
+
+def timed(evaluate: Callable[[], np.ndarray]) -> tuple[np.ndarray, float]:
+    start = time.process_time()
+    scores = evaluate()
+    return scores, time.process_time() - start
+
+
+def main():
+    methods = {
+        "one game": lambda gym: np.array(gym.evaluate(gym.population, gym.eval_seeds())),
+        f"{FIXED_GAMES} games": lambda gym: np.mean(
+            [
+                gym.evaluate(gym.population, [seed] * len(gym.population))
+                for seed in gym.eval_seeds(FIXED_GAMES)
+            ],
+            axis=0,
+        ),
+        "racing": lambda gym: SuccessiveHalving().race(gym, gym.population).fitness,
+    }
+    measured: dict[str, list] = {name: [] for name in methods}
+
+    for population in range(POPULATIONS):
+        gym = GeneticGym(POPULATION_SIZE, backend="vector", seed=population, cache_size=0)
+        reference = np.mean(
+            [
+                gym.evaluate(gym.population, [seed] * len(gym.population))
+                for seed in range(10_000, 10_000 + REFERENCE_GAMES)
+            ],
+            axis=0,
+        )
+        for name, evaluate in methods.items():
+            gym.rng = np.random.default_rng(population)
+            scores, seconds = timed(lambda: evaluate(gym))
+            measured[name].append((quality(gym, scores, reference), seconds))
+
+    print(f"{'':>10} {'cpu s':>7} {'quality':>8}")
+    for name, results in measured.items():
+        value, seconds = np.mean(results, axis=0)
+        print(f"{name:>10} {seconds:>7.2f} {value:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Throughput of generational training (`GeneticGym.next_generation`) against steady-state
+evolution (`ai.steady_state`) for the same number of games - evaluations per second and
+worker utilisation, the share of the workers' time that went into playing.
+
+On a single core extra workers only take turns, the gap shows with several cores.
+
+Run from the repo root: `python -m benchmarks.bench_steady_state`
+"""
+
+import os
+import resource
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from ai.genetic_gym import GeneticGym
+from ai.steady_state import SteadyState
+from budget import EvalBudget
+
+POPULATION_SIZE = 30
+GENERATIONS = 4
+BUDGET = EvalBudget(max_frames=3000)
+
+
+def cpu_seconds(workers: int) -> float:
+    """CPU time of this process, or of the finished worker processes when there are any."""
+    if workers <= 1:
+        return time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def generational(workers: int) -> tuple[float, float]:
+    gym = GeneticGym(POPULATION_SIZE, workers, "vector", seed=0, cache_size=0, budget=BUDGET)
+    cpu, start = cpu_seconds(workers), time.perf_counter()
+    for _ in range(GENERATIONS):
+        gym.next_generation()
+    gym.close()
+    seconds = time.perf_counter() - start
+    return GENERATIONS * POPULATION_SIZE / seconds, (cpu_seconds(workers) - cpu) / (
+        seconds * workers
+    )
+
+
+def steady_state(workers: int) -> tuple[float, float]:
+    gym = GeneticGym(POPULATION_SIZE, workers, "vector", seed=0, cache_size=0, budget=BUDGET)
+    stats = SteadyState(gym).run(GENERATIONS * POPULATION_SIZE, report_every=10**9)
+    return stats.evals_per_second, stats.utilisation
+
+
+def main():
+    print(f"{'':>14} {'workers':>8} {'evals/s':>8} {'utilisation':>12}")
+    for workers in sorted({1, os.cpu_count() or 1, 4}):
+        for name, measure in (("generational", generational), ("steady-state", steady_state)):
+            rate, utilisation = measure(workers)
+            print(f"{name:>14} {workers:>8} {rate:>8.1f} {utilisation:>12.0%}")
+
+
+if __name__ == "__main__":
+    main()
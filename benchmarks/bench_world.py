@@ -0,0 +1,112 @@
+"""
+Simulated frames per second of the sprite world (`Game`) against the array world
+(`VectorGame`): the world update alone on fields of growing size, full AI games, and
+whole populations evaluated game by game against in lock-step (`BatchedSim`).
+
+Run from the repo root: `python -m benchmarks.bench_world`
+"""
+
+import functools
+import os
+import random
+import time
+from typing import Callable
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from ai.genetic_gym import GeneticGym
+from asteroid import Asteroid
+from constants import ASTEROID_KINDS, ASTEROID_MIN_RADIUS, SCREEN_HEIGHT, SCREEN_WIDTH
+from main import Game
+from vector_world import VectorGame
+
+ASTEROID_COUNTS = (0, 25, 50, 100, 200)
+WORLD_FRAMES = 500
+SHIPS = 20
+DT = 0.05
+
+
+class _CountingShip:
+    """Counts the decisions a network makes, which is the number of simulated frames."""
+
+    def __init__(self, ship):
+        self.ship = ship
+        self.calls = 0
+
+    def predict(self, inputs):
+        self.calls += 1
+        return self.ship.predict(inputs)
+
+
+def populated(game_class: type, asteroids: int, seed: int):
+    """A game with a synthetic, randomly populated field."""
+    rng = random.Random(seed)
+    game = game_class(seed=seed)
+    for _ in range(asteroids):
+        position = pygame.Vector2(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT))
+        velocity = pygame.Vector2()
+        velocity.from_polar((rng.uniform(40, 100), rng.uniform(0, 360)))
+        radius = ASTEROID_MIN_RADIUS * rng.randint(1, ASTEROID_KINDS)
+        if isinstance(game, VectorGame):
+            game.spawn(radius, position, velocity)
+        else:
+            asteroid = Asteroid(x=position.x, y=position.y, radius=radius, world=game.world)
+            asteroid.velocity = velocity
+    return game
+
+
+def world_fps(game_class: type, asteroids: int, seed: int = 0) -> float:
+    """Frames per second of the world update alone."""
+    game = populated(game_class, asteroids, seed)
+    step = game.step if isinstance(game, VectorGame) else game._update_sprites
+    start = time.perf_counter()
+    for _ in range(WORLD_FRAMES):
+        step(dt=DT)
+    return WORLD_FRAMES / (time.perf_counter() - start)
+
+
+def sim_fps(game_class: Callable, seed: int = 0) -> float:
+    """Frames per second of full AI games, including the network's decisions."""
+    rng = np.random.default_rng(seed)
+    ships = [_CountingShip(GeneticGym._ship_factory(rng)) for _ in range(SHIPS)]
+    start = time.perf_counter()
+    for game_seed, ship in enumerate(ships, start=seed):
+        game_class(seed=game_seed).sim(ship, dt=DT)
+    return sum(ship.calls for ship in ships) / (time.perf_counter() - start)
+
+
+def population_rate(batched: bool, seed: int = 0) -> float:
+    """Individuals evaluated per second, one `VectorGame` at a time or all in lock-step."""
+    rng = np.random.default_rng(seed)
+    ships = [GeneticGym._ship_factory(rng) for _ in range(SHIPS)]
+    seeds = list(range(seed, seed + SHIPS))
+    start = time.perf_counter()
+    if batched:
+        GeneticGym.calc_batch_fitness(ships, seeds)
+    else:
+        for ship, ship_seed in zip(ships, seeds):
+            GeneticGym.calc_fitness(ship, ship_seed, backend="vector")
+    return SHIPS / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{'':>14} {'sprite fps':>11} {'vector fps':>11} {'speedup':>8}")
+    for count in ASTEROID_COUNTS:
+        sprite, vector = world_fps(Game, count), world_fps(VectorGame, count)
+        print(f"{f'world, {count:>3}':>14} {sprite:>11.0f} {vector:>11.0f} {vector / sprite:>7.1f}x")
+    sprite, vector = sim_fps(Game), sim_fps(VectorGame)
+    print(f"{'AI games':>14} {sprite:>11.0f} {vector:>11.0f} {vector / sprite:>7.1f}x")
+    headless = sim_fps(functools.partial(Game, headless=True))
+    print(f"{'AI, headless':>14} {headless:>11.0f} {vector:>11.0f} {vector / headless:>7.1f}x")
+    single, batched = population_rate(batched=False), population_rate(batched=True)
+    print(
+        f"population: {single:.1f} ships/s one by one, {batched:.1f} ships/s in lock-step,"
+        f" speedup {batched / single:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
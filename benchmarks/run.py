@@ -0,0 +1,209 @@
+"""
+The benchmark suite - simulation throughput, collision scaling, NN inference latency and
+batch throughput (plain and compiled networks) and GA generation time, all at fixed seeds.
+Results are stored as JSON so runs can be compared, metrics that got worse by more than
+the threshold are flagged as regressions.
+
+Run from the repo root:
+    python -m benchmarks.run                    # run, store as latest, compare to baseline
+    python -m benchmarks.run --save-baseline    # run and make the result the new baseline
+    python -m benchmarks.run --compare other.json --threshold 0.05
+
+The exit code is 1 when there's a regression, so the suite can gate a change.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Optional
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from ai.genetic_gym import GeneticGym
+from benchmarks.bench_collisions import populated_game
+from benchmarks.bench_world import _CountingShip
+from main import Game
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+LATEST_PATH = os.path.join(RESULTS_DIR, "latest.json")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "baseline.json")
+
+THRESHOLD = 0.10
+"""Relative change of a metric, in its worse direction, that counts as a regression."""
+
+REPEATS = 5
+"""Each measurement is repeated and the best run is kept, it's the least noisy estimate."""
+
+SIM_SEEDS = range(10)
+WORLD_SIZES = ((25, 0), (50, 20), (100, 20), (200, 20), (400, 40))
+"""(asteroids, shots) of the synthetic worlds for the `_update_sprites` scaling."""
+WORLD_FRAMES = 30
+PREDICT_CALLS = 2000
+PREDICT_BATCH = 4096
+PREDICT_BATCHES = 20
+POPULATION_SIZE = 30
+
+
+def best_of(measure: Callable[[], float], higher_is_better: bool) -> float:
+    results = [measure() for _ in range(REPEATS)]
+    return max(results) if higher_is_better else min(results)
+
+
+def sim_steps_per_second() -> float:
+    """Headless `Game.sim` steps per second over games at fixed seeds."""
+    rng = np.random.default_rng(0)
+    ships = [_CountingShip(GeneticGym._ship_factory(rng)) for _ in SIM_SEEDS]
+    start = time.perf_counter()
+    for seed, ship in zip(SIM_SEEDS, ships):
+        Game(headless=True, seed=seed).sim(ship)
+    return sum(ship.calls for ship in ships) / (time.perf_counter() - start)
+
+
+def update_sprites_ms(asteroids: int, shots: int) -> float:
+    """Mean `_update_sprites` time on a synthetic world."""
+    game = populated_game(Game, asteroids, shots, seed=0)
+    start = time.perf_counter()
+    for _ in range(WORLD_FRAMES):
+        game._update_sprites(dt=game.physics_step, visual_effects=False)
+    return (time.perf_counter() - start) / WORLD_FRAMES * 1000
+
+
+def predict_us(compiled: bool = False) -> float:
+    """Latency of a single `NeuralNetwork.predict` on realistic inputs."""
+    ship = GeneticGym._ship_factory(np.random.default_rng(0))
+    predict = ship.compile().predict if compiled else ship.predict
+    inputs = np.random.default_rng(1).uniform(-1, 1, (PREDICT_CALLS, 5))
+    start = time.perf_counter()
+    for row in inputs:
+        predict(row)
+    return (time.perf_counter() - start) / PREDICT_CALLS * 1e6
+
+
+def batch_predict_rows_per_s(compiled: bool = False) -> float:
+    """Rows per second of a network predicting whole batches."""
+    ship = GeneticGym._ship_factory(np.random.default_rng(0))
+    predict = ship.compile().predict if compiled else ship.predict
+    inputs = np.random.default_rng(1).uniform(-1, 1, (PREDICT_BATCH, 5))
+    start = time.perf_counter()
+    for _ in range(PREDICT_BATCHES):
+        predict(inputs)
+    return PREDICT_BATCH * PREDICT_BATCHES / (time.perf_counter() - start)
+
+
+def next_generation_s() -> float:
+    """Wall time of one full `GeneticGym.next_generation`, evaluation included."""
+    gym = GeneticGym(POPULATION_SIZE, seed=0, cache_size=0)
+    start = time.perf_counter()
+    gym.next_generation()
+    return time.perf_counter() - start
+
+
+def run_suite() -> dict[str, dict]:
+    """Runs every benchmark, returns the metrics by name."""
+    metrics = {}
+
+    def record(name: str, measure: Callable[[], float], unit: str, higher_is_better: bool):
+        value = best_of(measure, higher_is_better)
+        metrics[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+        print(f"{name:<32} {value:>12.3f} {unit}")
+
+    record("sim.steps_per_s", sim_steps_per_second, "steps/s", True)
+    for asteroids, shots in WORLD_SIZES:
+        record(
+            f"update_sprites.{asteroids}a_{shots}s",
+            lambda: update_sprites_ms(asteroids, shots),
+            "ms",
+            False,
+        )
+    record("nn.predict", predict_us, "us", False)
+    record("nn.predict.compiled", lambda: predict_us(compiled=True), "us", False)
+    record("nn.batch", batch_predict_rows_per_s, "rows/s", True)
+    record("nn.batch.compiled", lambda: batch_predict_rows_per_s(compiled=True), "rows/s", True)
+    record("ga.next_generation", next_generation_s, "s", False)
+    return metrics
+
+
+def compare(
+    metrics: dict[str, dict], baseline: dict[str, dict], threshold: float = THRESHOLD
+) -> list[str]:
+    """Prints the change of every metric against the baseline, returns the regressed ones."""
+    regressions = []
+    print(f"\n{'metric':<32} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name, metric in metrics.items():
+        old = baseline.get(name)
+        if old is None or not old["value"]:
+            print(f"{name:<32} {'-':>12} {metric['value']:>12.3f} {'new':>8}")
+            continue
+        change = metric["value"] / old["value"] - 1
+        worse = -change if metric["higher_is_better"] else change
+        flag = ""
+        if worse > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<32} {old['value']:>12.3f} {metric['value']:>12.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def save(path: str, metrics: dict[str, dict]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"meta": _meta(), "metrics": metrics}, f, indent=2)
+
+
+def load(path: str) -> Optional[dict[str, dict]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)["metrics"]
+
+
+def _meta() -> dict:
+    """Where and when the results were measured, to tell apart runs that aren't comparable."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--compare", default=BASELINE_PATH, help="results to compare against")
+    parser.add_argument("--output", default=LATEST_PATH, help="where to store the results")
+    parser.add_argument("--save-baseline", action="store_true", help="make this run the baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    metrics = run_suite()
+    save(args.output, metrics)
+    if args.save_baseline:
+        save(BASELINE_PATH, metrics)
+        return 0
+
+    baseline = load(args.compare)
+    if baseline is None:
+        print(f"\nno results to compare against at {args.compare}, see --save-baseline")
+        return 0
+    regressions = compare(metrics, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Limits on how long a simulated game may run, so evaluating a ship takes bounded time."""
+
+import dataclasses
+import enum
+import math
+import time
+from typing import NamedTuple, Optional
+
+from constants import (
+    ASTEROID_MAX_RADIUS,
+    PLAYER_SHOOT_COOLDOWN,
+    PLAYER_SHOOT_SPEED,
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+)
+
+STALL_DISTANCE = 50
+"""How far the ship has to get from where it last made progress for moving to count."""
+
+MAX_HIT_POINTS = ASTEROID_MAX_RADIUS * 1.5
+"""Most points a single shot can earn, see `Asteroid.get_points_for_kill`."""
+
+MAX_SCORE_RATE = MAX_HIT_POINTS / PLAYER_SHOOT_COOLDOWN
+"""Points per second no ship can beat - every shot hitting the biggest asteroid."""
+
+_SHOT_FLIGHT_TIME = math.hypot(SCREEN_WIDTH, SCREEN_HEIGHT) / PLAYER_SHOOT_SPEED
+"""Longest a shot stays on screen, shots fired before the cut-off can still hit."""
+
+
+class Termination(str, enum.Enum):
+    """Why a simulated game ended."""
+
+    DIED = "died"
+    QUIT = "quit"
+    MAX_FRAMES = "max_frames"
+    WALL_CLOCK = "wall_clock"
+    NO_PROGRESS = "no_progress"
+    OUT_OF_REACH = "out_of_reach"
+    """The ship can't reach `EvalBudget.fitness_to_beat` anymore."""
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the game was cut short by a budget, the player may still be alive."""
+        return self not in (Termination.DIED, Termination.QUIT)
+
+
+class SimResult(NamedTuple):
+    """Outcome of a simulated game."""
+
+    frames: int
+    score: float
+    reason: Termination = Termination.DIED
+
+
+@dataclasses.dataclass(frozen=True)
+class EvalBudget:
+    """
+    Limits of a simulated game, every one of them is off when it's None. A game that hits
+    a limit ends right away, `SimResult.reason` tells which one.
+    """
+
+    max_frames: Optional[int] = None
+    max_seconds: Optional[float] = None
+    """Wall-clock time - unlike the other limits it depends on the machine's speed."""
+    stall_frames: Optional[int] = None
+    """
+    Frames in a row the ship may go without scoring or getting `stall_distance` away
+    from where it last made progress, ships spinning in place are stopped by this.
+    """
+    stall_distance: float = STALL_DISTANCE
+    fitness_to_beat: Optional[float] = None
+    """
+    Stops a game once even its best possible outcome can't reach this fitness - the
+    fitness of the last place in the top-k, say. Needs `max_frames` to bound the outcome.
+    """
+    frame_fitness: float = 0.1
+    """Fitness of a survived frame, as `GeneticGym.calc_fitness` counts it."""
+    max_score_rate: float = MAX_SCORE_RATE
+    """
+    Points per second assumed possible for the rest of a game, the default can't prune a
+    ship that would get there. Lower values prune sooner, at the risk of a wrong call.
+    """
+
+    def tracker(self, physics_step: float) -> "BudgetTracker":
+        """Starts keeping track of a game, create it right before the first frame."""
+        return BudgetTracker(self, physics_step)
+
+
+class BudgetTracker:
+    """Checks the limits of an `EvalBudget` for one game, frame by frame."""
+
+    __slots__ = (
+        "budget",
+        "physics_step",
+        "deadline",
+        "progress_frame",
+        "progress_score",
+        "progress_position",
+    )
+
+    def __init__(self, budget: EvalBudget, physics_step: float):
+        self.budget = budget
+        self.physics_step = physics_step
+        self.deadline = (
+            time.perf_counter() + budget.max_seconds if budget.max_seconds is not None else None
+        )
+        self.progress_frame = 0
+        self.progress_score = 0.0
+        self.progress_position: Optional[tuple[float, float]] = None
+
+    def check(self, frame: int, score: float, x: float, y: float) -> Optional[Termination]:
+        """Why the game has to stop before playing `frame`, None while it may go on."""
+        budget = self.budget
+        if budget.max_frames is not None and frame >= budget.max_frames:
+            return Termination.MAX_FRAMES
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return Termination.WALL_CLOCK
+
+        if budget.stall_frames is not None:
+            position = self.progress_position
+            if (
+                position is None
+                or score > self.progress_score
+                or math.hypot(x - position[0], y - position[1]) >= budget.stall_distance
+            ):
+                self.progress_frame = frame
+                self.progress_score = score
+                self.progress_position = (x, y)
+            elif frame - self.progress_frame >= budget.stall_frames:
+                return Termination.NO_PROGRESS
+
+        if budget.fitness_to_beat is not None and budget.max_frames is not None:
+            # shots still in flight can hit too, one more than the cooldown allows in case
+            # the gun is ready right now
+            remaining = (budget.max_frames - frame) * self.physics_step + _SHOT_FLIGHT_TIME
+            best_score = score + MAX_HIT_POINTS + remaining * budget.max_score_rate
+            best = best_score + budget.max_frames * budget.frame_fitness
+            if best < budget.fitness_to_beat:
+                return Termination.OUT_OF_REACH
+
+        return None
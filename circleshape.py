@@ -1,21 +1,39 @@
+import random
+from typing import TYPE_CHECKING, Optional
+
 import pygame
 
+if TYPE_CHECKING:
+    from world import World
+
 
 class CircleShape(pygame.sprite.Sprite):
     """Base class for game objects."""
 
-    containers: tuple["pygame.sprite.Group", ...]
+    group_names: tuple[str, ...] = ()
+    """Groups of the `World` the object joins."""
 
-    def __init__(self, *groups, x, y, radius):
-        if hasattr(self, "containers"):
-            super().__init__(*self.containers, *groups)
+    def __init__(self, *groups, x, y, radius, world: Optional["World"] = None):
+        if world is not None:
+            super().__init__(*world.groups_for(self), *groups)
         else:
             super().__init__(*groups)
 
+        self.world = world
         self.position = pygame.Vector2(x, y)
         self.velocity = pygame.Vector2(0, 0)
         self.radius = radius
 
+    @property
+    def rng(self) -> "random.Random":
+        """Gameplay randomness of the world, the global `random` for objects without one."""
+        return self.world.rng if self.world is not None else random  # type: ignore
+
+    @property
+    def fx_rng(self) -> "random.Random":
+        """Cosmetic randomness of the world, the global `random` for objects without one."""
+        return self.world.fx_rng if self.world is not None else random  # type: ignore
+
     def draw(self, screen: "pygame.Surface") -> None:
         """Sub-classes must override"""
         pass
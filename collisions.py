@@ -0,0 +1,317 @@
+"""
+Collision detection - the broad phase finds pairs of objects that might be colliding,
+the optional precise narrow phase tests circles against convex hulls.
+"""
+
+import math
+from typing import TYPE_CHECKING, Optional, Sequence
+
+import numpy as np
+
+from constants import ASTEROID_MAX_RADIUS
+
+if TYPE_CHECKING:
+    from circleshape import CircleShape
+
+
+_LINEAR_SCAN_SIZE = 32
+"""Up to this many objects, nearest neighbours are found faster without the grid."""
+
+
+class BroadPhase:
+    """
+    Base class for broad phase strategies.
+
+    A broad phase indexes a list of objects and then answers which of them are close
+    enough to another object to be worth a precise (narrow phase) check.
+    """
+
+    def build(self, objects: Sequence["CircleShape"]) -> None:
+        """Indexes the objects, sub-classes must override."""
+        raise NotImplementedError
+
+    def near(self, obj: "CircleShape") -> list[int]:
+        """Returns sorted indices of the indexed objects that might collide with `obj`."""
+        raise NotImplementedError
+
+    def move(self, index: int, obj: "CircleShape") -> bool:
+        """Re-indexes a moved object, returns whether its set of neighbours changed."""
+        return False
+
+    def is_near(self, obj_one: "CircleShape", obj_two: "CircleShape") -> bool:
+        """Whether two objects (indexed or not) might collide."""
+        return True
+
+
+class BruteForce(BroadPhase):
+    """Every object is a candidate for every other object - O(n^2) pairs."""
+
+    def __init__(self):
+        self._count = 0
+
+    def build(self, objects: Sequence["CircleShape"]) -> None:
+        self._count = len(objects)
+
+    def near(self, obj: "CircleShape") -> list[int]:
+        return list(range(self._count))
+
+
+class SpatialHash(BroadPhase):
+    """
+    Uniform grid - objects are bucketed by the cell their center lies in and only
+    the 3x3 block of cells around an object is searched.
+
+    The cell must be at least as large as the biggest possible collision distance
+    (the sum of two radii), otherwise colliding objects could sit two cells apart.
+    """
+
+    def __init__(self, cell_size: float = ASTEROID_MAX_RADIUS * 2):
+        self.cell_size = cell_size
+        self._cells: dict[tuple[int, int], list[int]] = {}
+        self._object_cells: list[tuple[int, int]] = []
+        self._objects: Sequence["CircleShape"] = ()
+        self._bounds = (0, 0, 0, 0)
+        """Smallest and largest occupied cell coordinates - min x, min y, max x, max y."""
+
+    def _cell(self, obj: "CircleShape") -> tuple[int, int]:
+        return (
+            math.floor(obj.position.x / self.cell_size),
+            math.floor(obj.position.y / self.cell_size),
+        )
+
+    def build(self, objects: Sequence["CircleShape"]) -> None:
+        self._cells = {}
+        self._object_cells = []
+        self._objects = objects
+        for i, obj in enumerate(objects):
+            cell = self._cell(obj)
+            self._cells.setdefault(cell, []).append(i)
+            self._object_cells.append(cell)
+        if self._cells:
+            xs, ys = zip(*self._cells)
+            self._bounds = (min(xs), min(ys), max(xs), max(ys))
+
+    def near(self, obj: "CircleShape") -> list[int]:
+        cx, cy = self._cell(obj)
+        found = []
+        for x in (cx - 1, cx, cx + 1):
+            for y in (cy - 1, cy, cy + 1):
+                cell = self._cells.get((x, y))
+                if cell:
+                    found.extend(cell)
+        found.sort()
+        return found
+
+    def move(self, index: int, obj: "CircleShape") -> bool:
+        old_cell, new_cell = self._object_cells[index], self._cell(obj)
+        if old_cell == new_cell:
+            return False
+        self._cells[old_cell].remove(index)
+        self._cells.setdefault(new_cell, []).append(index)
+        self._object_cells[index] = new_cell
+        min_x, min_y, max_x, max_y = self._bounds
+        self._bounds = (
+            min(min_x, new_cell[0]),
+            min(min_y, new_cell[1]),
+            max(max_x, new_cell[0]),
+            max(max_y, new_cell[1]),
+        )
+        return True
+
+    def is_near(self, obj_one: "CircleShape", obj_two: "CircleShape") -> bool:
+        (x1, y1), (x2, y2) = self._cell(obj_one), self._cell(obj_two)
+        return abs(x1 - x2) <= 1 and abs(y1 - y2) <= 1
+
+    def k_nearest(self, x: float, y: float, k: int) -> list[tuple[int, float]]:
+        """
+        Indices of the `k` objects closest to (x, y) and their center distances, nearest
+        first, ties go to the lower index. Searches rings of cells outwards and stops as
+        soon as no unsearched cell can hold anything closer.
+        """
+        if not self._objects or k <= 0:
+            return []
+        if len(self._objects) <= _LINEAR_SCAN_SIZE:
+            found = [
+                (math.hypot(obj.position.x - x, obj.position.y - y), i)
+                for i, obj in enumerate(self._objects)
+            ]
+            found.sort()
+            return [(i, distance) for distance, i in found[:k]]
+
+        cx, cy = math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+        # the farthest ring that can contain an object at all
+        min_x, min_y, max_x, max_y = self._bounds
+        last_ring = max(cx - min_x, max_x - cx, cy - min_y, max_y - cy, 0)
+        found: list[tuple[float, int]] = []
+        for ring in range(last_ring + 1):
+            if 8 * ring > len(self._cells):
+                # sparse grid - cheaper to visit the remaining occupied cells than the rings
+                cells = [
+                    cell
+                    for cell in self._cells
+                    if max(abs(cell[0] - cx), abs(cell[1] - cy)) >= ring
+                ]
+            else:
+                cells = _ring(cx, cy, ring)
+            for cell in cells:
+                for i in self._cells.get(cell, ()):
+                    position = self._objects[i].position
+                    found.append((math.hypot(position.x - x, position.y - y), i))
+            if 8 * ring > len(self._cells):
+                break
+            # anything in the next ring is at least `ring` cells away
+            if len(found) >= k and sorted(found)[k - 1][0] < ring * self.cell_size:
+                break
+        found.sort()
+        return [(i, distance) for distance, i in found[:k]]
+
+    def within(self, x: float, y: float, radius: float) -> list[tuple[int, float]]:
+        """Indices of the objects centered within `radius` of (x, y) and their distances, nearest first."""
+        if len(self._objects) <= _LINEAR_SCAN_SIZE:
+            found = [
+                (math.hypot(obj.position.x - x, obj.position.y - y), i)
+                for i, obj in enumerate(self._objects)
+            ]
+            found.sort()
+            return [(i, distance) for distance, i in found if distance <= radius]
+
+        reach = math.ceil(radius / self.cell_size)
+        cx, cy = math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+        found = []
+        for cell_x in range(cx - reach, cx + reach + 1):
+            for cell_y in range(cy - reach, cy + reach + 1):
+                for i in self._cells.get((cell_x, cell_y), ()):
+                    position = self._objects[i].position
+                    distance = math.hypot(position.x - x, position.y - y)
+                    if distance <= radius:
+                        found.append((distance, i))
+        found.sort()
+        return [(i, distance) for distance, i in found]
+
+
+class NeighbourIndex(SpatialHash):
+    """
+    Spatial hash for nearest neighbour queries that only buckets the objects once a query
+    needs the grid - small sets are scanned linearly, so building is free for them.
+    """
+
+    def build(self, objects: Sequence["CircleShape"]) -> None:
+        self._objects = objects
+        self._bucketed = False
+
+    def share(self, index: BroadPhase, objects: Sequence["CircleShape"]) -> None:
+        """
+        Indexes `objects` with the buckets `index` already has of them, when it's a
+        spatial hash with the same cells - there's nothing left to build then.
+        """
+        if (
+            isinstance(index, SpatialHash)
+            and index.cell_size == self.cell_size
+            and index._objects is objects
+        ):
+            self._objects = objects
+            self._cells, self._object_cells, self._bounds = (
+                index._cells,
+                index._object_cells,
+                index._bounds,
+            )
+            self._bucketed = True
+        else:
+            self.build(objects)
+
+    def _bucket(self) -> None:
+        if not self._bucketed:
+            super().build(self._objects)
+            self._bucketed = True
+
+    def k_nearest(self, x: float, y: float, k: int) -> list[tuple[int, float]]:
+        if len(self._objects) > _LINEAR_SCAN_SIZE:
+            self._bucket()
+        return super().k_nearest(x, y, k)
+
+    def nearest(self, x: float, y: float) -> Optional[tuple[int, float]]:
+        """Index and distance of the object closest to (x, y), without building any lists."""
+        if len(self._objects) > _LINEAR_SCAN_SIZE:
+            found = self.k_nearest(x, y, 1)
+            return found[0] if found else None
+
+        nearest, nearest_distance = None, math.inf
+        for i, obj in enumerate(self._objects):
+            distance = math.hypot(obj.position.x - x, obj.position.y - y)
+            if distance < nearest_distance:
+                nearest, nearest_distance = i, distance
+        return None if nearest is None else (nearest, nearest_distance)
+
+    def within(self, x: float, y: float, radius: float) -> list[tuple[int, float]]:
+        if len(self._objects) > _LINEAR_SCAN_SIZE:
+            self._bucket()
+        return super().within(x, y, radius)
+
+
+def _ring(cx: int, cy: int, ring: int):
+    """Cells on the square ring `ring` cells around (cx, cy)."""
+    if ring == 0:
+        yield (cx, cy)
+        return
+    for x in range(cx - ring, cx + ring + 1):
+        yield (x, cy - ring)
+        yield (x, cy + ring)
+    for y in range(cy - ring + 1, cy + ring):
+        yield (cx - ring, y)
+        yield (cx + ring, y)
+
+
+class ConvexHull:
+    """
+    Convex hull of a shape in its own (unrotated) coordinates, with everything needed for
+    circle tests precomputed - objects are tested in the shape's frame, so the hull
+    never has to be rotated.
+    """
+
+    def __init__(self, points: np.ndarray):
+        self.points = _hull(points)
+        self.edges = np.roll(self.points, -1, axis=0) - self.points
+        self.lengths = np.einsum("ij,ij->i", self.edges, self.edges)
+        # hull vertices are counter-clockwise, outward normals point to the right of the edges
+        normals = np.stack((self.edges[:, 1], -self.edges[:, 0]), axis=1)
+        self.normals = normals / np.sqrt(self.lengths)[:, np.newaxis]
+        self.offsets = np.einsum("ij,ij->i", self.normals, self.points)
+
+    def overlaps_circle(self, x: float, y: float, radius: float) -> bool:
+        """Whether a circle centered at (x, y) in the hull's coordinates touches the hull."""
+        center = np.array((x, y))
+        distances = self.normals @ center - self.offsets
+        if distances.max() <= 0:
+            # inside the hull
+            return True
+        if distances.max() > radius:
+            # separated by one of the edges
+            return False
+
+        # close to a corner, find the closest point of the outline
+        to_center = center - self.points
+        t = np.clip(np.einsum("ij,ij->i", to_center, self.edges) / self.lengths, 0, 1)
+        closest = to_center - t[:, np.newaxis] * self.edges
+        return bool(np.einsum("ij,ij->i", closest, closest).min() <= radius * radius)
+
+
+def _hull(points: np.ndarray) -> np.ndarray:
+    """Andrew's monotone chain - counter-clockwise hull vertices, without collinear ones."""
+    ordered = sorted(map(tuple, np.asarray(points, dtype=float).tolist()))
+    if len(ordered) < 3:
+        return np.array(ordered)
+
+    def cross(o, a, b) -> float:
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower: list = []
+    for point in ordered:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], point) <= 0:
+            lower.pop()
+        lower.append(point)
+    upper: list = []
+    for point in reversed(ordered):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], point) <= 0:
+            upper.pop()
+        upper.append(point)
+    return np.array(lower[:-1] + upper[:-1])
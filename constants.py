@@ -1,5 +1,8 @@
+import math
+
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
+SCREEN_DIAGONAL = math.hypot(SCREEN_WIDTH, SCREEN_HEIGHT)
 
 ASTEROID_MIN_RADIUS = 20
 ASTEROID_KINDS = 3
@@ -13,3 +16,4 @@ PLAYER_SHOOT_SPEED = 500
 PLAYER_SHOOT_COOLDOWN = 0.3
 PRIMARY_WEOPON_DAMAGE = 17
 PLAYER_LIVES = 3
+PHYSICS_STEP = 0.05
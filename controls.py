@@ -0,0 +1,47 @@
+"""Input sources the player's ship can be controlled by."""
+
+from typing import Collection, Iterable
+
+import pygame
+
+CONTROL_KEYS = (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s, pygame.K_SPACE)
+"""Keys the player's ship reacts to."""
+
+
+class PressedKeys(frozenset):
+    """A set of pressed keys that can be indexed like `pygame.key.get_pressed()`."""
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self
+
+
+NO_KEYS = PressedKeys()
+
+
+class InputSource:
+    """Base class for input sources, polled once per frame by the player."""
+
+    def poll(self):
+        """Returns the pressed keys, indexable by `pygame.K_*` constants."""
+        return NO_KEYS
+
+
+class KeyboardInput(InputSource):
+    """The real keyboard, needs pygame to be initialised."""
+
+    def poll(self):
+        return pygame.key.get_pressed()
+
+
+class NoInput(InputSource):
+    """Nothing is ever pressed - used when an AI flies the ship in a headless game."""
+
+
+class RecordedInput(InputSource):
+    """Replays recorded frames of pressed keys, after the last frame nothing is pressed."""
+
+    def __init__(self, frames: Iterable[Collection[int]]):
+        self._frames = iter([PressedKeys(keys) for keys in frames])
+
+    def poll(self):
+        return next(self._frames, NO_KEYS)
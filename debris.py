@@ -1,29 +1,45 @@
+from typing import TYPE_CHECKING, Optional
+
 import pygame
 from pygame.math import Vector2
 
+from effects import debris_surface
+from pool import Pooled
+
+if TYPE_CHECKING:
+    from world import World
+
+
+class DebrisParticle(Pooled):
+
+    group_names = ("updateables", "drawables")
 
-class DebrisParticle(pygame.sprite.Sprite):
     def __init__(
-        self, position: Vector2, velocity: Vector2, radius: float, duration: float = 0.4
+        self,
+        position: Vector2,
+        velocity: Vector2,
+        radius: float,
+        duration: float = 0.4,
+        world: Optional["World"] = None,
     ):
-        super().__init__()
-        self.position = Vector2(position)
-        self.velocity = Vector2(velocity)
+        super().__init__(*(world.groups_for(self) if world is not None else ()))
+        self.position = Vector2()
+        self.velocity = Vector2()
+        self.reset(position, velocity, radius, duration)
+
+    def reset(
+        self, position: Vector2, velocity: Vector2, radius: float, duration: float = 0.4
+    ) -> None:
+        self.position.update(position)
+        self.velocity.update(velocity)
         self.radius = radius
         self.duration = duration
         self.elapsed = 0
 
         progress = self.elapsed / self.duration
         alpha = max(255 * (1 - progress), 0)
-        self.surface = pygame.Surface(
-            (self.radius * 2, self.radius * 2), pygame.SRCALPHA
-        )
-        pygame.draw.circle(
-            self.surface,
-            (200, 200, 200, int(alpha)),
-            (self.radius, self.radius),
-            int(self.radius),
-        )
+        # shared with every other particle of the same size, never draw into it
+        self.surface = debris_surface(self.radius, int(alpha))
 
     def update(self, dt: float):
         self.elapsed += dt
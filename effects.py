@@ -0,0 +1,114 @@
+"""Pre-rendered surfaces of the visual effects, shared by all debris and explosions."""
+
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import pygame
+
+EXPLOSION_FRAMES = 24
+"""Distinct animation frames an explosion is pre-rendered in, over its whole duration."""
+
+EXPLOSION_GROWTH = 1.5
+"""How much an explosion grows over its duration, relative to its initial size."""
+
+_RADIUS_STEP = 0.5
+"""Radii are quantised to half pixels, finer differences don't show."""
+
+
+class SurfaceCache:
+    """
+    Least recently used cache of rendered surfaces.
+
+    Effects of the same size look the same, so each one is drawn once and then only
+    blitted. The cache is bounded, rarely used surfaces are evicted first.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._surfaces: OrderedDict[Hashable, pygame.Surface] = OrderedDict()
+
+    def get(self, key: Hashable, render: Callable[[], pygame.Surface]) -> pygame.Surface:
+        """Returns the surface stored under `key`, rendering it on a miss."""
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self._surfaces[key] = render()
+        while len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+
+EFFECTS_CACHE = SurfaceCache()
+
+
+def _quantise(radius: float) -> float:
+    return round(radius / _RADIUS_STEP) * _RADIUS_STEP
+
+
+def debris_surface(radius: float, alpha: int = 255) -> pygame.Surface:
+    """A filled, grey circle of a debris particle."""
+    radius = _quantise(radius)
+
+    def render() -> pygame.Surface:
+        surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surface, (200, 200, 200, alpha), (radius, radius), int(radius))
+        return surface
+
+    return EFFECTS_CACHE.get(("debris", radius, alpha), render)
+
+
+def explosion_size(radius: float) -> int:
+    """Side of an explosion's surface at the start of its animation."""
+    return int((_quantise(radius) * 2) * 2.5)
+
+
+def explosion_frame(radius: float, progress: float) -> pygame.Surface:
+    """
+    The ring of an explosion `progress` (0 to 1) into its animation - scaled up and
+    faded out, the progress is quantised to one of `EXPLOSION_FRAMES` frames.
+    """
+    radius = _quantise(radius)
+    frame = min(max(round(progress * (EXPLOSION_FRAMES - 1)), 0), EXPLOSION_FRAMES - 1)
+
+    def render() -> pygame.Surface:
+        frame_progress = frame / (EXPLOSION_FRAMES - 1)
+        base = _explosion_base(radius)
+        scaled_size = int(base.get_width() * (1 + frame_progress * EXPLOSION_GROWTH))
+        surface = pygame.transform.smoothscale(base, (scaled_size, scaled_size))
+        surface.set_alpha(int(max(255 * (1 - frame_progress), 0)))
+        return surface
+
+    return EFFECTS_CACHE.get(("explosion", radius, frame), render)
+
+
+def _explosion_base(radius: float) -> pygame.Surface:
+    """The unscaled, opaque ring every frame of an explosion is scaled from."""
+
+    def render() -> pygame.Surface:
+        size = explosion_size(radius)
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(
+            surface, (255, 255, 255, 255), (size // 2, size // 2), int(radius), width=2
+        )
+        return surface
+
+    return EFFECTS_CACHE.get(("explosion base", radius), render)
+
+
+def prebake_explosions(radii) -> None:
+    """Renders every animation frame of explosions of the given radii ahead of time."""
+    for radius in radii:
+        for frame in range(EXPLOSION_FRAMES):
+            explosion_frame(radius, frame / (EXPLOSION_FRAMES - 1))
@@ -1,26 +1,36 @@
+from typing import TYPE_CHECKING, Optional
+
 import pygame
 from pygame.math import Vector2
 
+from effects import explosion_frame, explosion_size
+from pool import Pooled
+
+if TYPE_CHECKING:
+    from world import World
+
+
+class Explosion(Pooled):
 
-class Explosion(pygame.sprite.Sprite):
-    def __init__(self, position: Vector2, radius: float, duration: float = 0.3):
-        super().__init__()
-        self.position = Vector2(position)
+    group_names = ("updateables", "drawables")
+
+    def __init__(
+        self,
+        position: Vector2,
+        radius: float,
+        duration: float = 0.3,
+        world: Optional["World"] = None,
+    ):
+        super().__init__(*(world.groups_for(self) if world is not None else ()))
+        self.position = Vector2()
+        self.reset(position, radius, duration)
+
+    def reset(self, position: Vector2, radius: float, duration: float = 0.3) -> None:
+        self.position.update(position)
         self.radius = radius
         self.duration = duration
         self.elapsed = 0
-
-        size = int((radius * 2) * 2.5)
-        self.base_surface = pygame.Surface((size, size), pygame.SRCALPHA)
-        pygame.draw.circle(
-            self.base_surface,
-            (255, 255, 255, 255),
-            (size // 2, size // 2),
-            int(radius),
-            width=2,
-        )
-
-        self.size = size
+        self.size = explosion_size(radius)
 
     def update(self, dt: float):
         self.elapsed += dt
@@ -28,14 +38,8 @@ class Explosion(pygame.sprite.Sprite):
             self.kill()
 
     def draw(self, screen: pygame.Surface):
-        progress = self.elapsed / self.duration
-        alpha = max(255 * (1 - progress), 0)
-        scale = 1 + progress * 1.5
-        scaled_size = int(self.size * scale)
-
-        surface = pygame.transform.smoothscale(
-            self.base_surface, (scaled_size, scaled_size)
-        )
-        surface.set_alpha(int(alpha))
+        # pre-rendered and shared by all explosions of the same size
+        surface = explosion_frame(self.radius, self.elapsed / self.duration)
+        scaled_size = surface.get_width()
 
         screen.blit(surface, self.position - Vector2(scaled_size / 2, scaled_size / 2))
@@ -6,13 +6,35 @@ from typing import TYPE_CHECKING, Optional
 
 import pygame
 
+from constants import SCREEN_DIAGONAL, SCREEN_HEIGHT, SCREEN_WIDTH
+from controls import CONTROL_KEYS
+
+THREAT_COUNT = 3
+"""How many of the closest asteroids a `GameState` describes."""
+
 if TYPE_CHECKING:
+    import numpy as np
+
     from asteroid import Asteroid
     from circleshape import CircleShape
     from main import Game
     from player import Player
 
 
+@dataclasses.dataclass
+class Threat:
+    """An asteroid close to the ship, as seen from the ship."""
+
+    distance: float
+    """Distance from the ship to the asteroid's center."""
+
+    bearing: float
+    """Angle between the ship's heading and the asteroid, 0 to 360."""
+
+    relative_velocity: "pygame.Vector2"
+    """Asteroid's velocity relative to the ship. (asteroid's vector - ship's vector)"""
+
+
 @dataclasses.dataclass
 class GameState:
     """Describes game state at a givent moment in a way the ship AI can understand."""
@@ -32,17 +54,71 @@ class GameState:
     pressed_keys: list[int]
     """Keys pressed by the player, e.g. `pygame.K_w` == 119."""
 
+    threats: list[Threat] = dataclasses.field(default_factory=list)
+    """The closest asteroids, nearest first - the first one is the one described above."""
 
-def get_game_state(game: "Game") -> Optional["GameState"]:
+
+def get_game_state(game: "Game", threat_count: int = THREAT_COUNT) -> Optional["GameState"]:
     ship = game.player
     if not game.asteroids:
         return
 
-    asteroid, dist = get_nearest_asteroid(ship=ship, asteroids=game.asteroids.sprites())
-    ship_angle = round(ship.rotation, 3)
-    asteroid_relative_velocity = asteroid.velocity - ship.velocity
-    asteroid_relative_velocity.x = round(asteroid_relative_velocity.x, 3)
-    asteroid_relative_velocity.y = round(asteroid_relative_velocity.y, 3)
+    asteroids, index = game.asteroid_neighbours()
+    nearest = index.k_nearest(ship.position.x, ship.position.y, max(threat_count, 1))
+    # nearest first by exact distance, ties to the asteroid that comes first - the same
+    # asteroid `write_nn_inputs` and `VectorGame.get_inputs` take as the nearest
+    threats = [get_threat(ship, asteroids[i], distance) for i, distance in nearest]
+    nearest_threat = threats[0]
+
+    return GameState(
+        ship_angle=round(ship.rotation, 3),
+        asteroid_dist=nearest_threat.distance,
+        asteroid_angle=nearest_threat.bearing,
+        asteroid_relative_velocity=nearest_threat.relative_velocity,
+        pressed_keys=get_pressed_keys(ship.pressed_keys),
+        threats=threats[:threat_count],
+    )
+
+
+NN_INPUTS = 5
+"""Number of features `write_nn_inputs` writes."""
+
+
+def write_nn_inputs(game: "Game", out: "np.ndarray") -> bool:
+    """
+    Writes the NN inputs straight into `out`, returns False when there's no asteroid.
+
+    The values are the same as `NeuralNetwork.get_inputs(get_game_state(game))`, but no
+    `GameState`, vectors or lists are built, so a decision allocates next to nothing.
+    """
+    if not game.asteroids:
+        return False
+    asteroids, index = game.asteroid_neighbours()
+    ship = game.player
+    x, y = ship.position.x, ship.position.y
+    nearest = index.nearest(x, y)
+    if nearest is None:
+        return False
+    i, distance = nearest
+    asteroid = asteroids[i]
+
+    dx = x - asteroid.position.x
+    dy = y - asteroid.position.y
+    angle_difference = (math.degrees(math.atan2(dy, dx)) - ship.rotation) % 360
+
+    out[0] = (round(ship.rotation, 3) - 180) / 180
+    out[1] = round(distance, 3) / SCREEN_DIAGONAL
+    out[2] = (angle_difference - 180) / 180
+    out[3] = round(asteroid.velocity.x - ship.velocity.x, 3) / SCREEN_WIDTH
+    out[4] = round(asteroid.velocity.y - ship.velocity.y, 3) / SCREEN_HEIGHT
+    return True
+
+
+def get_threat(ship: "Player", asteroid: "Asteroid", distance: float) -> Threat:
+    """Describes an asteroid as seen from the ship."""
+    relative_velocity = asteroid.velocity - ship.velocity
+    relative_velocity.x = round(relative_velocity.x, 3)
+    relative_velocity.y = round(relative_velocity.y, 3)
 
     # get the angle between the ship and the asteroid
     dx = ship.position.x - asteroid.position.x
@@ -50,12 +126,10 @@ def get_game_state(game: "Game") -> Optional["GameState"]:
     angle_to_target = math.degrees(math.atan2(dy, dx))
     angle_difference = (angle_to_target - ship.rotation) % 360
 
-    return GameState(
-        ship_angle=ship_angle,
-        asteroid_dist=dist,
-        asteroid_angle=angle_difference,
-        asteroid_relative_velocity=asteroid_relative_velocity,
-        pressed_keys=get_pressed_keys(),
+    return Threat(
+        distance=round(distance, 3),
+        bearing=angle_difference,
+        relative_velocity=relative_velocity,
     )
 
 
@@ -78,8 +152,6 @@ def get_nearest_asteroid(
     return _min_asteroid, _min_dist
 
 
-def get_pressed_keys() -> list[int]:
-    """Returns the currently pressed keys."""
-    valid_keys = [pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s, pygame.K_SPACE]
-    pressed_keys = pygame.key.get_pressed()
-    return [key for key in valid_keys if pressed_keys[key]]
+def get_pressed_keys(pressed_keys) -> list[int]:
+    """Returns which of the control keys are pressed, as polled by the player."""
+    return [key for key in CONTROL_KEYS if pressed_keys[key]]
@@ -1,99 +1,201 @@
 import itertools
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 
+import numpy as np
 import pygame
 
 from asteroid import Asteroid
 from asteroidfield import AsteroidField
+from budget import EvalBudget, SimResult, Termination
+from collisions import BroadPhase, NeighbourIndex, SpatialHash
 from constants import *
+from controls import InputSource, NoInput
+from effects import prebake_explosions
 from explosion import Explosion
+from game_state import NN_INPUTS, write_nn_inputs
 from player import Player
-from shot import Shot
+from profiling import Profiler
+from timestep import FixedTimestep, Interpolation
 from utils import init_text, is_colliding
+from world import World
 
 if TYPE_CHECKING:
     from ai.nn import NeuralNetwork
+    from circleshape import CircleShape
 
 
 class Game:
-    def __init__(self):
-        pygame.init()
+    def __init__(
+        self,
+        broad_phase: Callable[[], "BroadPhase"] = SpatialHash,
+        headless: bool = False,
+        controls: Optional["InputSource"] = None,
+        seed: Optional[int] = None,
+        pool_caps: Optional[dict[type, int]] = None,
+        precise_collisions: bool = False,
+        physics_step: float = PHYSICS_STEP,
+        profiler: Optional[Profiler] = None,
+    ):
+        # a headless game never touches the SDL subsystems and has no visual effects,
+        # the ship is flown by an AI or by recorded `controls`
+        self.headless = headless
+        if not headless:
+            pygame.init()
+
+        # Collision broad phase indexes:
+        self.asteroid_index = broad_phase()
+        self.shot_index = broad_phase()
+        # Nearest neighbour queries for the AI, rebuilt at most once per step:
+        self._neighbour_index = NeighbourIndex()
+        self._nn_inputs = np.zeros(NN_INPUTS)
+        self._neighbours: Optional[list[Asteroid]] = None
+        # Asteroid hulls instead of circles for hits on the player and by shots:
+        self.precise_collisions = precise_collisions
+        # Seconds of game time per update, the same whether played, shown or simulated:
+        self.physics_step = physics_step
+        # Timing of the loop's phases, off unless enabled or toggled with F3:
+        self.profiler = profiler or Profiler()
 
         # Groups:
-        self.updateables = pygame.sprite.Group()
-        self.drawables = pygame.sprite.Group()
-        self.asteroids = pygame.sprite.Group()
-        self.shots = pygame.sprite.Group()
-
-        Player.containers = (self.updateables, self.drawables)
-        AsteroidField.containers = (self.updateables,)
-        Asteroid.containers = (self.updateables, self.drawables, self.asteroids)
-        Shot.containers = (self.updateables, self.drawables, self.shots)
-
-        self.player = Player(x=SCREEN_WIDTH / 2, y=SCREEN_HEIGHT / 2)
-        AsteroidField()
+        self.world = World(seed=seed, visual_effects=not headless, pool_caps=pool_caps)
+        self.updateables = self.world.updateables
+        self.drawables = self.world.drawables
+        self.asteroids = self.world.asteroids
+        self.shots = self.world.shots
+
+        self.player = Player(
+            x=SCREEN_WIDTH / 2,
+            y=SCREEN_HEIGHT / 2,
+            world=self.world,
+            controls=controls or (NoInput() if headless else None),
+        )
+        AsteroidField(world=self.world)
 
     def start(self, ship_ai: Optional["NeuralNetwork"] = None):
         """Starts the game."""
+        pygame.init()
         init_text()
 
-        dt, clock = 0, pygame.time.Clock()
+        clock = pygame.time.Clock()
         screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # every asteroid size can explode, render the animations before the first frame
+        prebake_explosions(ASTEROID_MIN_RADIUS * kind for kind in range(1, ASTEROID_KINDS + 1))
+
+        # the physics runs in fixed steps, rendering at the display rate in between
+        timestep = FixedTimestep(self.physics_step)
+        interpolation = Interpolation()
+        clock.tick(60)
+
+        profiler = self.profiler
 
         # Game loop:
         while True:
-            if any(event.type == pygame.QUIT for event in pygame.event.get()):
-                return
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.overlay = not profiler.overlay
+                    profiler.enabled = profiler.enabled or profiler.overlay
+
+            elapsed = clock.tick(60) / 1000
+            profiler.begin_frame()
+            with profiler.span("physics"):
+                for _ in range(timestep.advance(elapsed)):
+                    if not self.player.alive():
+                        break
+                    interpolation.remember(self.drawables)
+                    self.step(ship_ai)
+
             if not self.player.alive():
                 print("Game over!")
                 print(f"Score: {self.player.score}")
                 print(f"Accuracy: {self.player.accuracy:.1f}%")
                 return
 
-            if ship_ai:
-                self.ai_move(ship_ai, dt=dt)
-
-            screen.fill("black")
-            self._update_sprites(dt=dt, visual_effects=True)
-            for drawable in self.drawables:
-                drawable.draw(screen=screen)
+            with profiler.span("draw"):
+                screen.fill("black")
+                with interpolation.blended(self.drawables, timestep.alpha):
+                    Asteroid.prepare_outlines(self.asteroids)
+                    for drawable in self.drawables:
+                        drawable.draw(screen=screen)
+                profiler.draw_overlay(screen)
 
             pygame.display.set_caption(f"FPS: {clock.get_fps():.1f}")
-            pygame.display.flip()
-            dt = clock.tick(60) / 1000
-
-    def sim(self, ship_ai: "NeuralNetwork", dt: float = 0.05) -> tuple[int, float]:
-        """Starts a simulation of the game - headless and sped up."""
+            with profiler.span("flip"):
+                pygame.display.flip()
+            self._end_profiler_frame()
+
+    def step(
+        self, ship_ai: Optional["NeuralNetwork"] = None, dt: Optional[float] = None
+    ) -> Optional[int]:
+        """
+        Advances the game by one physics step, the AI (if any) decides first. Returns the
+        AI's action. `dt` overrides the game's `physics_step` for this step.
+        """
+        dt = self.physics_step if dt is None else dt
+        action = self.ai_move(ship_ai, dt=dt) if ship_ai else None
+        self._update_sprites(dt=dt, visual_effects=not self.headless)
+        return action
+
+    def sim(
+        self,
+        ship_ai: "NeuralNetwork",
+        dt: Optional[float] = None,
+        budget: Optional[EvalBudget] = None,
+    ) -> SimResult:
+        """
+        Starts a simulation of the game - headless and sped up, one physics step per frame.
+        `dt` overrides the game's `physics_step` for this game, `budget` limits how long
+        the game may run. Returns the frames played, the score and why the game ended.
+        """
+        dt = self.physics_step if dt is None else dt
         from collections import Counter
 
         taken_actions = Counter()
+        tracker = budget.tracker(dt) if budget is not None else None
 
         # Game loop:
         for i in itertools.count():
-            if not self.player.alive() or any(
+            reason = None
+            if not self.player.alive():
+                reason = Termination.DIED
+            elif not self.headless and any(
                 event.type == pygame.QUIT for event in pygame.event.get()
             ):
+                reason = Termination.QUIT
+            elif tracker is not None:
+                position = self.player.position
+                reason = tracker.check(i, self.player.score, position.x, position.y)
+            if reason is not None:
                 # punish the ships that are not using all outputs
                 if len(taken_actions) < 4:
-                    return 0, 0
-                return i, self.player.score
+                    return SimResult(0, 0, reason)
+                return SimResult(i, self.player.score, reason)
 
-            action = self.ai_move(ship_ai, dt=dt)
-            taken_actions[action] += 1
-            self._update_sprites(dt=dt)
+            self.profiler.begin_frame()
+            taken_actions[self.step(ship_ai, dt=dt)] += 1
+            self._end_profiler_frame()
 
         raise RuntimeError("needed for typehint")
 
+    def _end_profiler_frame(self) -> None:
+        if self.profiler.enabled:
+            self.profiler.end_frame(
+                asteroids=len(self.asteroids),
+                shots=len(self.shots),
+                sprites=len(self.updateables),
+            )
+
     def ai_move(self, ship_ai: "NeuralNetwork", dt: float) -> Optional[int]:
         """The AI makes a move based on current game state."""
-        from game_state import get_game_state
+        if self.asteroids:
+            with self.profiler.span("game_state"):
+                # written into the same buffer every step, no state objects are built
+                if not write_nn_inputs(self, self._nn_inputs):
+                    return
 
-        if self.asteroids.sprites():
-            game_state = get_game_state(self)
-            if not game_state:
-                return
-
-            ai_action = int(ship_ai.predict(game_state))  # 0, 1, 2, 3
+            with self.profiler.span("predict"):
+                ai_action = int(ship_ai.predict(self._nn_inputs))  # 0, 1, 2, 3
 
             if ai_action == 0:
                 self.player.move(dt=dt)
@@ -106,43 +208,100 @@ class Game:
 
             return ai_action
 
-    def _update_sprites(self, dt: float, visual_effects: bool = True):
-        self.updateables.update(dt=dt)
+    def _hits(self, asteroid: "Asteroid", obj: "CircleShape") -> bool:
+        """Whether an asteroid hits the player or a shot, circles first then the hull."""
+        return is_colliding(asteroid, obj) and (
+            not self.precise_collisions or asteroid.overlaps(obj)
+        )
 
-        for i, asteroid in enumerate(self.asteroids):
-            if is_colliding(asteroid, self.player):
+    def _update_sprites(self, dt: float, visual_effects: bool = True):
+        with self.profiler.span("update"):
+            self.updateables.update(dt=dt)
+
+        with self.profiler.span("collisions"):
+            self._collide(visual_effects)
+
+    def asteroid_neighbours(self) -> tuple[list["Asteroid"], NeighbourIndex]:
+        """
+        The asteroids and a spatial index of them for k-nearest and within-radius queries,
+        built on the first query after a step.
+        """
+        if self._neighbours is None or len(self._neighbours) != len(self.asteroids):
+            self._neighbours = self.asteroids.sprites()
+            self._neighbour_index.build(self._neighbours)
+        return self._neighbours, self._neighbour_index
+
+    def _collide(self, visual_effects: bool) -> None:
+        """Resolves the collisions of asteroids with each other, the player and shots."""
+        # broad phase - the asteroid index follows asteroids pushed apart below, so
+        # the narrow phase sees the same pairs for any broad phase strategy
+        asteroids, shots = self.asteroids.sprites(), self.shots.sprites()
+        self.asteroid_index.build(asteroids)
+        self.shot_index.build(shots)
+        destroyed = False
+
+        for i, asteroid in enumerate(asteroids):
+            if self.asteroid_index.is_near(asteroid, self.player) and self._hits(
+                asteroid, self.player
+            ):
                 points = asteroid.resolve_collision(obj=self.player) or 0
+                destroyed = destroyed or not asteroid.alive()
                 if visual_effects:
-                    explosion = Explosion(
-                        position=asteroid.position, radius=asteroid.radius
+                    Explosion.spawn(
+                        position=asteroid.position,
+                        radius=asteroid.radius,
+                        world=self.world,
                     )
-                    self.updateables.add(explosion)
-                    self.drawables.add(explosion)
                 self.player.respawn(points_lost=points)
-            for j in range(i + 1, len(self.asteroids)):
-                other = self.asteroids.sprites()[j]
+            candidates = [j for j in self.asteroid_index.near(asteroid) if j > i]
+            while candidates:
+                j = candidates.pop(0)
+                other = asteroids[j]
                 if is_colliding(asteroid, other):
                     asteroid.resolve_collision(other)
-            for shot in self.shots:
-                if is_colliding(asteroid, shot):
+                    self.asteroid_index.move(j, other)
+                    if self.asteroid_index.move(i, asteroid):
+                        # pushed into another cell - its neighbours changed
+                        candidates = [
+                            k for k in self.asteroid_index.near(asteroid) if k > j
+                        ]
+            for k in self.shot_index.near(asteroid):
+                shot = shots[k]
+                if shot.alive() and self._hits(asteroid, shot):
                     self.player.shots_hit += 1
                     self.player.score += asteroid.split(damage=shot.damage)
-                    if not asteroid.alive() and visual_effects:
-                        explosion = Explosion(
-                            position=asteroid.position, radius=asteroid.radius
-                        )
-                        self.updateables.add(explosion)
-                        self.drawables.add(explosion)
+                    if not asteroid.alive():
+                        destroyed = True
+                        if visual_effects:
+                            Explosion.spawn(
+                                position=asteroid.position,
+                                radius=asteroid.radius,
+                                world=self.world,
+                            )
                     shot.kill()
 
+        # with no asteroid destroyed or split, the broad phase's list and buckets are
+        # still up to date for the AI's neighbour queries
+        self._neighbours = None if destroyed else asteroids
+        if not destroyed:
+            self._neighbour_index.share(self.asteroid_index, asteroids)
+
     def load_ai(self):
-        """Loads an AI into the game and starts it."""
-        import pickle
+        """Loads the trained AI into the game and starts it."""
+        import os
+
+        from ai.checkpoint import CHECKPOINT_PATH, load_champion
+
+        if os.path.exists(CHECKPOINT_PATH):
+            ship_ai = load_champion(CHECKPOINT_PATH)
+        else:
+            # champions saved before there were checkpoints
+            import pickle
 
-        from ai.genetic_gym import SAVE_PATH
+            from ai.genetic_gym import SAVE_PATH
 
-        with open(SAVE_PATH, "rb") as f:
-            ship_ai = pickle.load(f)
+            with open(SAVE_PATH, "rb") as f:
+                ship_ai = pickle.load(f)
 
         self.start(ship_ai=ship_ai)
 
@@ -1,6 +1,9 @@
+from typing import TYPE_CHECKING, Optional
+
 import pygame
 
 from circleshape import CircleShape
+from controls import NO_KEYS, InputSource, KeyboardInput
 from constants import (
     PLAYER_LIVES,
     PLAYER_RADIUS,
@@ -14,12 +17,26 @@ from constants import (
 )
 from shot import Shot
 
+if TYPE_CHECKING:
+    from world import World
+
 
 class Player(CircleShape):
     """Player class."""
 
-    def __init__(self, x: float, y: float):
-        super().__init__(x=x, y=y, radius=PLAYER_RADIUS)
+    group_names = ("updateables", "drawables")
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        world: Optional["World"] = None,
+        controls: Optional["InputSource"] = None,
+    ):
+        super().__init__(x=x, y=y, radius=PLAYER_RADIUS, world=world)
+        self.controls = controls or KeyboardInput()
+        self.pressed_keys = NO_KEYS
+        """Keys pressed in the last frame."""
         self.lives = PLAYER_LIVES
         self.rotation = 0
         self.shot_timer = 0
@@ -55,7 +72,7 @@ class Player(CircleShape):
     def update(self, dt: float) -> None:
         """Called every frame to track keypresses for actions."""
         self.shot_timer -= dt
-        keys = pygame.key.get_pressed()
+        keys = self.pressed_keys = self.controls.poll()
 
         if keys[pygame.K_a]:
             self.rotate(dt=dt * -1)
@@ -93,7 +110,9 @@ class Player(CircleShape):
         """Shoots gun."""
         if self.shot_timer > 0:
             return False
-        shot = Shot(self.position.x, self.position.y, damage=PRIMARY_WEOPON_DAMAGE)  # type: ignore
+        shot = Shot.spawn(
+            x=self.position.x, y=self.position.y, damage=PRIMARY_WEOPON_DAMAGE, world=self.world  # type: ignore
+        )
         shot.velocity = pygame.Vector2(0, 1).rotate(self.rotation) * PLAYER_SHOOT_SPEED
         self.shot_timer = PLAYER_SHOOT_COOLDOWN
         self.shots_fired += 1
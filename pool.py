@@ -0,0 +1,106 @@
+"""Recycling of short-lived sprites - shots, debris and explosions."""
+
+from typing import TYPE_CHECKING, Generic, Optional, TypeVar
+
+import pygame
+
+if TYPE_CHECKING:
+    from world import World
+
+POOL_CAP = 128
+"""Default number of dead objects a pool keeps around for reuse."""
+
+T = TypeVar("T", bound="Pooled")
+
+
+class Pool(Generic[T]):
+    """
+    Free list of killed objects of one class.
+
+    Killing a pooled object hands it back here, spawning one takes it off the free list
+    and re-initialises it in place instead of building a new sprite. At most `cap`
+    objects are kept, the rest are left to the garbage collector.
+    """
+
+    def __init__(self, cls: type[T], cap: int = POOL_CAP):
+        self.cls = cls
+        self.cap = cap
+        self.hits = 0
+        """Spawns served from the free list."""
+        self.misses = 0
+        """Spawns that had to build a new object."""
+        self.dropped = 0
+        """Killed objects that didn't fit into the free list."""
+        self._free: list[T] = []
+
+    def acquire(self, world: "World", **kwargs) -> T:
+        """A live object initialised with `kwargs`, recycled if possible."""
+        if self._free:
+            obj = self._free.pop()
+            obj.spawns += 1
+            obj.reset(**kwargs)
+            obj.add(*world.groups_for(obj))
+            self.hits += 1
+            return obj
+
+        obj = self.cls(**kwargs, world=world)
+        obj.pool = self
+        self.misses += 1
+        return obj
+
+    def release(self, obj: T) -> None:
+        """Takes back a killed object."""
+        if len(self._free) < self.cap:
+            self._free.append(obj)
+        else:
+            self.dropped += 1
+
+    @property
+    def hit_rate(self) -> float:
+        spawns = self.hits + self.misses
+        return self.hits / spawns if spawns else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "dropped": self.dropped,
+            "free": len(self._free),
+            "hit_rate": self.hit_rate,
+        }
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+
+class Pooled(pygame.sprite.Sprite):
+    """
+    Mixin of sprites that can be recycled, they must be created with `spawn` and
+    implement `reset` with the same keyword arguments as their `__init__`.
+    """
+
+    pool: Optional[Pool] = None
+    """Pool the object returns to when killed, None for objects created directly."""
+    spawns = 0
+    """
+    How often the object was recycled - state remembered about the object is stale once
+    this changes, it's a different object now.
+    """
+
+    @classmethod
+    def spawn(cls: type[T], world: Optional["World"] = None, **kwargs) -> T:
+        """Creates an object in the world, reusing a killed one when there's any."""
+        if world is None:
+            return cls(**kwargs)
+        return world.pool(cls).acquire(world, **kwargs)
+
+    def reset(self, **kwargs) -> None:
+        """Re-initialises a recycled object, sub-classes must override."""
+        raise NotImplementedError
+
+    def kill(self) -> None:
+        was_alive = self.alive()
+        super().kill()
+        # a dead object can be killed again, it must not land on the free list twice
+        if was_alive and self.pool is not None:
+            self.pool.release(self)
@@ -0,0 +1,120 @@
+"""Per-frame timing of the game loop's phases, with percentiles, an overlay and exports."""
+
+import csv
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import ContextManager, Optional
+
+import numpy as np
+import pygame
+
+PERCENTILES = (50, 95, 99)
+
+_NO_SPAN = nullcontext()
+
+
+class Profiler:
+    """
+    Collects named timing spans and entity counts for every frame.
+
+    The last `window` frames feed the rolling percentiles, every frame is kept for the
+    export (up to `max_frames`). A disabled profiler hands out a shared no-op span and
+    records nothing, so instrumented code costs next to nothing when it's off.
+    """
+
+    def __init__(self, enabled: bool = False, window: int = 300, max_frames: int = 100_000):
+        self.enabled = enabled
+        self.overlay = False
+        """Whether `draw_overlay` draws anything, toggled with F3 in the game."""
+        self.window = window
+        self.max_frames = max_frames
+        self.frames: list[dict] = []
+        """Exportable records - frame number, span durations in ms and entity counts."""
+        self._recent: dict[str, deque] = {}
+        self._frame: dict = {}
+        self._font: Optional[pygame.font.Font] = None
+
+    def span(self, name: str) -> ContextManager:
+        """Times the enclosed block under `name`, spans of the same name in a frame add up."""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name)
+
+    def begin_frame(self) -> None:
+        if self.enabled:
+            self._frame = {"frame": len(self.frames)}
+
+    def end_frame(self, **counts: int) -> None:
+        """Closes the frame, `counts` are the number of entities worth tracking."""
+        if not self.enabled or not self._frame:
+            return
+        self._frame.update(counts)
+        for name, value in self._frame.items():
+            if name != "frame":
+                self._recent.setdefault(name, deque(maxlen=self.window)).append(value)
+        if len(self.frames) < self.max_frames:
+            self.frames.append(self._frame)
+        self._frame = {}
+
+    def _add(self, name: str, ms: float) -> None:
+        self._frame[name] = self._frame.get(name, 0.0) + ms
+
+    def percentiles(self, name: str) -> tuple[float, ...]:
+        """Rolling p50/p95/p99 of a span (ms) or a count over the last `window` frames."""
+        values = self._recent.get(name)
+        if not values:
+            return tuple(0.0 for _ in PERCENTILES)
+        return tuple(np.percentile(values, PERCENTILES).tolist())
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Rolling percentiles of everything recorded, by name."""
+        return {
+            name: dict(zip((f"p{p}" for p in PERCENTILES), self.percentiles(name)))
+            for name in self._recent
+        }
+
+    def export(self, path: str) -> None:
+        """Writes every recorded frame as CSV or JSON, depending on the file extension."""
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"frames": self.frames, "summary": self.summary()}, f, indent=2)
+            return
+
+        columns: dict[str, None] = {}
+        for frame in self.frames:
+            columns.update(dict.fromkeys(frame))
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(columns))
+            writer.writeheader()
+            writer.writerows(self.frames)
+
+    def draw_overlay(self, screen: "pygame.Surface") -> None:
+        """Draws the rolling percentiles in the top left corner, if the overlay is on."""
+        if not self.overlay:
+            return
+        if self._font is None:
+            pygame.font.init()
+            self._font = pygame.font.Font(None, 18)
+
+        lines = [f"{'':<12}{'p50':>8}{'p95':>8}{'p99':>8}"]
+        for name in self._recent:
+            p50, p95, p99 = self.percentiles(name)
+            lines.append(f"{name:<12}{p50:>8.2f}{p95:>8.2f}{p99:>8.2f}")
+        for i, line in enumerate(lines):
+            screen.blit(self._font.render(line, True, "green"), (8, 8 + i * 16))
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: Profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.profiler._add(self.name, (time.perf_counter() - self.start) * 1000)
@@ -1,13 +1,28 @@
+from typing import TYPE_CHECKING, Optional
+
 import pygame
 
 from circleshape import CircleShape
 from constants import SCREEN_HEIGHT, SCREEN_WIDTH, SHOT_RADIUS
+from pool import Pooled
+
+if TYPE_CHECKING:
+    from world import World
+
 
+class Shot(Pooled, CircleShape):
 
-class Shot(CircleShape):
+    group_names = ("updateables", "drawables", "shots")
+
+    def __init__(
+        self, x: float, y: float, damage: float, world: Optional["World"] = None
+    ):
+        super().__init__(x=x, y=y, radius=SHOT_RADIUS, world=world)
+        self.damage = damage
 
-    def __init__(self, x: float, y: float, damage: float):
-        super().__init__(x=x, y=y, radius=SHOT_RADIUS)
+    def reset(self, x: float, y: float, damage: float) -> None:
+        self.position.update(x, y)
+        self.velocity.update(0, 0)
         self.damage = damage
 
     def draw(self, screen: "pygame.Surface") -> None:
@@ -0,0 +1,8 @@
+"""Shared setup of the tests - run them from the repo root with `python -m pytest`."""
+
+import os
+import sys
+
+# the game modules live at the repo root, the games run without a display
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
@@ -0,0 +1,118 @@
+import math
+import random
+
+import numpy as np
+import pygame
+
+import asteroid as asteroid_module
+from asteroid import Asteroid
+from circleshape import CircleShape
+from collisions import ConvexHull
+from constants import ASTEROID_KINDS, ASTEROID_MIN_RADIUS, SCREEN_HEIGHT, SCREEN_WIDTH
+from utils import is_colliding
+from world import World
+
+
+def random_asteroids(count: int, seed: int) -> list[Asteroid]:
+    rng = random.Random(seed)
+    world = World(seed=seed, visual_effects=False)
+    asteroids = []
+    for _ in range(count):
+        asteroid = Asteroid(
+            x=rng.uniform(0, SCREEN_WIDTH),
+            y=rng.uniform(0, SCREEN_HEIGHT),
+            radius=ASTEROID_MIN_RADIUS * rng.randint(1, ASTEROID_KINDS),
+            world=world,
+        )
+        asteroid.velocity.from_polar((rng.uniform(40, 100), rng.uniform(0, 360)))
+        asteroids.append(asteroid)
+    return asteroids
+
+
+def exact_outline(asteroid: Asteroid) -> np.ndarray:
+    return np.array(
+        [
+            asteroid.position + pygame.Vector2(*point).rotate(asteroid.rotation_angle)
+            for point in asteroid.shape_points.tolist()
+        ]
+    )
+
+
+def test_prepared_outlines_follow_the_asteroids(monkeypatch):
+    drawn = []
+    monkeypatch.setattr(pygame.draw, "polygon", lambda *args, **kwargs: drawn.append(args[2]))
+    asteroids = random_asteroids(30, 0)
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    for _ in range(100):
+        for asteroid in asteroids:
+            asteroid.update(dt=0.05)
+        Asteroid.prepare_outlines(asteroids)
+        drawn.clear()
+        for asteroid in asteroids:
+            asteroid.draw(screen)
+        for asteroid, polygon in zip(asteroids, drawn):
+            # off by at most half a rotation step
+            error = asteroid.radius * math.radians(Asteroid.OUTLINE_ANGLE_STEP / 2)
+            assert np.allclose(polygon, exact_outline(asteroid), atol=error + 1e-9)
+
+    # an asteroid moved after the outlines were prepared isn't drawn where it was
+    asteroid = asteroids[0]
+    asteroid.position += (10, 0)
+    drawn.clear()
+    asteroid.draw(screen)
+    assert np.allclose(drawn[0], asteroid.get_rotated_points())
+
+
+def test_outlines_are_only_rotated_into_the_next_step(monkeypatch):
+    rotations = []
+    rotate_points = asteroid_module.rotate_points
+    monkeypatch.setattr(
+        asteroid_module,
+        "rotate_points",
+        lambda points, angles: rotations.append(len(points)) or rotate_points(points, angles),
+    )
+    asteroid = random_asteroids(1, 1)[0]
+
+    for angle in (10.2, 10.4, 10.6, 10.6, 370.6):
+        asteroid.rotation_angle = angle
+        Asteroid.prepare_outlines([asteroid])
+    assert rotations == [1, 1]
+
+
+def circle_touches_polygon(polygon: np.ndarray, center: np.ndarray, radius: float) -> bool:
+    """Linear reference - inside every edge of the convex polygon, or near one of them."""
+    edges = np.roll(polygon, -1, axis=0) - polygon
+    to_center = center - polygon
+    if (edges[:, 0] * to_center[:, 1] - edges[:, 1] * to_center[:, 0] >= 0).all():
+        return True
+    along = np.einsum("ij,ij->i", to_center, edges) / np.einsum("ij,ij->i", edges, edges)
+    closest = to_center - np.clip(along, 0, 1)[:, None] * edges
+    return bool(np.linalg.norm(closest, axis=1).min() <= radius)
+
+
+def test_hull_holds_the_whole_shape():
+    for asteroid in random_asteroids(20, 2):
+        hull = ConvexHull(asteroid.shape_points)
+        assert {tuple(point) for point in hull.points} <= set(map(tuple, asteroid.shape_points))
+        for point in asteroid.shape_points:
+            assert circle_touches_polygon(hull.points, point, 1e-9)
+
+
+def test_hull_overlaps_like_a_linear_scan():
+    rng = np.random.default_rng(3)
+    hits = near_misses = 0
+    for asteroid in random_asteroids(20, 4):
+        asteroid.rotation_angle = rng.uniform(0, 360)
+        polygon = ConvexHull(exact_outline(asteroid)).points
+        for _ in range(200):
+            x, y = asteroid.position + rng.uniform(-1.2, 1.2, size=2) * asteroid.radius
+            obj = CircleShape(x=x, y=y, radius=rng.uniform(1, 5))
+            expected = circle_touches_polygon(polygon, np.array(obj.position), obj.radius)
+            assert asteroid.overlaps(obj) == expected
+            hits += expected
+            near_misses += is_colliding(asteroid, obj) and not expected
+            # the hull never reaches past the bounding circle
+            assert is_colliding(asteroid, obj) or not expected
+
+    assert hits and near_misses
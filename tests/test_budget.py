@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from ai.batch_sim import BatchedSim
+from ai.genetic_gym import GeneticGym
+from budget import MAX_HIT_POINTS, EvalBudget, SimResult, Termination
+from constants import PHYSICS_STEP
+from vector_world import VectorGame
+
+
+@pytest.fixture(scope="module")
+def ships():
+    rng = np.random.default_rng(0)
+    return [GeneticGym._ship_factory(rng) for _ in range(8)]
+
+
+def test_max_frames():
+    tracker = EvalBudget(max_frames=10).tracker(PHYSICS_STEP)
+    assert tracker.check(9, 0, 0, 0) is None
+    assert tracker.check(10, 0, 0, 0) is Termination.MAX_FRAMES
+
+
+def test_wall_clock():
+    tracker = EvalBudget(max_seconds=0).tracker(PHYSICS_STEP)
+    assert tracker.check(0, 0, 0, 0) is Termination.WALL_CLOCK
+
+
+def test_no_progress_unless_scoring_or_moving():
+    tracker = EvalBudget(stall_frames=5, stall_distance=10).tracker(PHYSICS_STEP)
+    assert tracker.check(0, 0, 0, 0) is None
+    assert tracker.check(4, 0, 9, 0) is None
+    # scoring or getting far enough away restarts the count
+    assert tracker.check(5, 1, 9, 0) is None
+    assert tracker.check(9, 1, 19, 0) is None
+    assert tracker.check(13, 1, 19, 5) is None
+    assert tracker.check(14, 1, 19, 5) is Termination.NO_PROGRESS
+
+
+def test_out_of_reach():
+    budget = EvalBudget(max_frames=100, fitness_to_beat=1e9)
+    assert budget.tracker(PHYSICS_STEP).check(0, 0, 0, 0) is Termination.OUT_OF_REACH
+    # a score that can still be caught up with is never pruned
+    reachable = EvalBudget(max_frames=100, fitness_to_beat=MAX_HIT_POINTS)
+    assert reachable.tracker(PHYSICS_STEP).check(99, 0, 0, 0) is None
+
+
+def test_truncated():
+    assert not Termination.DIED.truncated
+    assert not Termination.QUIT.truncated
+    assert all(
+        reason.truncated
+        for reason in (
+            Termination.MAX_FRAMES,
+            Termination.WALL_CLOCK,
+            Termination.NO_PROGRESS,
+            Termination.OUT_OF_REACH,
+        )
+    )
+
+
+def test_stalled_ships_are_not_paid_for_wasted_frames():
+    budget = EvalBudget(stall_frames=30)
+    result = SimResult(100, 5, Termination.NO_PROGRESS)
+    assert GeneticGym.fitness(result, budget) == 5 + 70 / 10
+    assert GeneticGym.fitness(result._replace(reason=Termination.MAX_FRAMES), budget) == 15
+
+
+@pytest.mark.parametrize(
+    "budget, reasons",
+    [
+        (None, {Termination.DIED}),
+        (EvalBudget(max_frames=50), {Termination.MAX_FRAMES}),
+        (EvalBudget(stall_frames=20, stall_distance=1e6), {Termination.NO_PROGRESS}),
+        (EvalBudget(max_frames=200, fitness_to_beat=1e9), {Termination.OUT_OF_REACH}),
+        (EvalBudget(max_seconds=0), {Termination.WALL_CLOCK}),
+    ],
+)
+def test_batched_games_end_like_single_games(ships, budget, reasons):
+    seeds = list(range(len(ships)))
+    batched = BatchedSim(ships, seeds, budget=budget).run()
+    single = [VectorGame(seed=seed).sim(ship, budget=budget) for ship, seed in zip(ships, seeds)]
+    if budget is None or budget.max_seconds is None:
+        assert batched == single
+    assert {result.reason for result in batched} <= reasons | {Termination.DIED}
+    assert {result.reason for result in batched} & reasons
@@ -0,0 +1,64 @@
+from typing import Optional
+
+import numpy as np
+import pytest
+
+from ai.checkpoint import Checkpoint
+from ai.genetic_gym import GeneticGym
+
+
+def gym(seed: int, eval_seed: Optional[int] = None) -> GeneticGym:
+    return GeneticGym(8, backend="vector", seed=seed, eval_seed=eval_seed, cache_size=0)
+
+
+def test_checkpoint_round_trips(tmp_path):
+    original = gym(0, eval_seed=5)
+    original.next_generation()
+    path = tmp_path / "run.npz"
+    original.checkpoint().save(str(path))
+
+    restored = gym(1, eval_seed=5)
+    restored.restore(Checkpoint.load(str(path)))
+    assert restored.gen_num == original.gen_num
+    assert np.array_equal(restored.genomes, original.genomes)
+    assert restored.eval_seed == original.eval_seed
+    assert restored.fitness_history == original.fitness_history
+
+
+@pytest.mark.parametrize("interrupt_at", [2, 3])
+def test_resumed_run_matches_uninterrupted_run(tmp_path, monkeypatch, interrupt_at):
+    uninterrupted = gym(3)
+    uninterrupted.train(4, display_champion=False)
+
+    path = str(tmp_path / "run.npz")
+    interrupted = gym(3)
+    evaluate = interrupted._evaluate
+    calls = []
+
+    def stop_at_generation(*args):
+        calls.append(None)
+        if len(calls) == interrupt_at:
+            raise KeyboardInterrupt
+        return evaluate(*args)
+
+    monkeypatch.setattr(interrupted, "_evaluate", stop_at_generation)
+    with pytest.raises(KeyboardInterrupt):
+        interrupted.train(4, display_champion=False, checkpoint_path=path, checkpoint_every=10)
+
+    # a gym with other settings of its own still carries on the saved run
+    resumed = gym(1)
+    resumed.train(until=4, display_champion=False, checkpoint_path=path, resume=True)
+    assert resumed.gen_num == 4
+    assert resumed.fitness_history == uninterrupted.fitness_history
+    assert np.array_equal(resumed.genomes, uninterrupted.genomes)
+
+
+def test_generations_count_from_the_current_generation(capsys):
+    trained = gym(0)
+    trained.train(2, display_champion=False)
+    trained.train(1, display_champion=False)
+    assert trained.gen_num == 3
+
+    trained.train(until=3, display_champion=False)
+    assert trained.gen_num == 3
+    assert "nothing left to train" in capsys.readouterr().out
@@ -0,0 +1,155 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from ai.genetic_gym import GeneticGym
+from circleshape import CircleShape
+from collisions import BruteForce, NeighbourIndex, SpatialHash
+from constants import ASTEROID_MAX_RADIUS, PLAYER_LIVES, SCREEN_HEIGHT, SCREEN_WIDTH
+from main import Game
+
+
+def random_circles(count: int, seed: int) -> list[CircleShape]:
+    rng = random.Random(seed)
+    return [
+        CircleShape(
+            x=rng.uniform(-100, SCREEN_WIDTH + 100),
+            y=rng.uniform(-100, SCREEN_HEIGHT + 100),
+            radius=rng.uniform(5, ASTEROID_MAX_RADIUS),
+        )
+        for _ in range(count)
+    ]
+
+
+def touching(one: CircleShape, two: CircleShape) -> bool:
+    return one.position.distance_to(two.position) <= one.radius + two.radius
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_spatial_hash_finds_every_collision(seed):
+    objects = random_circles(200, seed)
+    others = random_circles(50, seed + 100)
+    index = SpatialHash()
+    index.build(objects)
+
+    for other in others:
+        near = index.near(other)
+        assert near == sorted(near)
+        expected = [i for i, obj in enumerate(objects) if touching(obj, other)]
+        assert set(expected) <= set(near)
+        for i in expected:
+            assert index.is_near(objects[i], other)
+
+
+def test_spatial_hash_move_keeps_the_index_exact():
+    objects = random_circles(100, 0)
+    index = SpatialHash()
+    index.build(objects)
+    rng = random.Random(1)
+    for i, obj in enumerate(objects):
+        obj.position.update(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT))
+        index.move(i, obj)
+
+    rebuilt = SpatialHash()
+    rebuilt.build(objects)
+    for obj in random_circles(30, 2):
+        assert index.near(obj) == rebuilt.near(obj)
+
+
+def test_brute_force_is_a_candidate_for_everything():
+    objects = random_circles(20, 0)
+    index = BruteForce()
+    index.build(objects)
+    assert index.near(objects[0]) == list(range(20))
+
+
+def by_distance(objects: list[CircleShape], x: float, y: float) -> list[tuple[int, float]]:
+    """Linear scan reference - every object and its distance, nearest first, then by index."""
+    found = [
+        (math.hypot(obj.position.x - x, obj.position.y - y), i) for i, obj in enumerate(objects)
+    ]
+    return [(i, distance) for distance, i in sorted(found)]
+
+
+def grid_circles(count: int, seed: int, cell_size: float) -> list[CircleShape]:
+    """Circles on cell corners and edges, many of them at the same distances."""
+    rng = random.Random(seed)
+    return [
+        CircleShape(
+            x=rng.randint(-2, 12) * cell_size / rng.choice((1, 2)),
+            y=rng.randint(-2, 8) * cell_size / rng.choice((1, 2)),
+            radius=5,
+        )
+        for _ in range(count)
+    ]
+
+
+FIELDS = {
+    # rings of cells until the k-th neighbour is found
+    "dense": lambda seed: random_circles(300, seed),
+    # few occupied cells far apart, the occupied cells are visited instead of rings
+    "sparse": lambda seed: [
+        CircleShape(x=random.Random(seed + i).uniform(-5000, 5000), y=50 * i, radius=5)
+        for i in range(40)
+    ],
+    "cell edges": lambda seed: grid_circles(100, seed, SpatialHash().cell_size),
+    "linear scan": lambda seed: random_circles(20, seed),
+}
+
+
+@pytest.mark.parametrize("field", FIELDS)
+@pytest.mark.parametrize("seed", range(3))
+def test_nearest_neighbours_match_a_linear_scan(field, seed):
+    objects = FIELDS[field](seed)
+    cell_size = SpatialHash().cell_size
+    rng = random.Random(seed)
+    queries = [(rng.uniform(-200, 1500), rng.uniform(-200, 900)) for _ in range(20)]
+    queries += [
+        (rng.randint(-1, 10) * cell_size, rng.randint(-1, 6) * cell_size) for _ in range(20)
+    ]
+
+    for index in (SpatialHash(), NeighbourIndex()):
+        index.build(objects)
+        for x, y in queries:
+            expected = by_distance(objects, x, y)
+            for k in (1, 3, 10, len(objects) + 5):
+                assert index.k_nearest(x, y, k) == expected[:k]
+            for radius in (0, cell_size / 2, cell_size, 3.5 * cell_size):
+                assert index.within(x, y, radius) == [
+                    (i, distance) for i, distance in expected if distance <= radius
+                ]
+            if isinstance(index, NeighbourIndex):
+                assert index.nearest(x, y) == expected[0]
+
+
+def snapshot(game: Game) -> tuple:
+    """Everything a collision can change - asteroids, shots, score and lives."""
+    return (
+        [
+            (*asteroid.position, *asteroid.velocity, asteroid.health_points)
+            for asteroid in game.asteroids
+        ],
+        [(*shot.position, *shot.velocity) for shot in game.shots],
+        game.player.score,
+        game.player.lives,
+    )
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_broad_phases_play_identical_games(seed):
+    ship = GeneticGym._ship_factory(np.random.default_rng(7))
+    games = [
+        Game(broad_phase=broad_phase, headless=True, seed=seed)
+        for broad_phase in (BruteForce, SpatialHash)
+    ]
+    for _ in range(450):
+        for game in games:
+            game.step(ship)
+        assert snapshot(games[0]) == snapshot(games[1])
+
+    # the ship shot asteroids down and crashed, so every kind of collision was resolved
+    player = games[0].player
+    assert player.score > 0
+    assert player.lives < PLAYER_LIVES
@@ -0,0 +1,45 @@
+import pygame
+from pygame.math import Vector2
+
+from debris import DebrisParticle
+from effects import EFFECTS_CACHE, EXPLOSION_FRAMES, SurfaceCache
+from explosion import Explosion
+
+
+def test_cache_evicts_the_least_recently_used():
+    cache = SurfaceCache(max_size=2)
+    surfaces = {key: pygame.Surface((1, 1)) for key in "abc"}
+    for key in "abac":
+        assert cache.get(key, lambda: surfaces[key]) is surfaces[key]
+    assert (cache.hits, cache.misses, len(cache)) == (1, 3, 2)
+
+    # "b" was used least recently, it's rendered again
+    rendered = []
+    cache.get("b", lambda: rendered.append("b") or surfaces["b"])
+    cache.get("c", lambda: rendered.append("c") or surfaces["c"])
+    assert rendered == ["b"]
+
+
+def test_debris_of_the_same_size_shares_a_surface():
+    EFFECTS_CACHE.clear()
+    particles = [DebrisParticle(Vector2(), Vector2(), radius) for radius in (3.1, 2.9, 3.0)]
+    assert particles[0].surface is particles[1].surface is particles[2].surface
+    assert len(EFFECTS_CACHE) == 1
+
+    surface = particles[0].surface
+    assert surface.get_size() == (6, 6)
+    assert surface.get_at((3, 3)) == (200, 200, 200, 255)
+
+
+def test_explosions_draw_pre_rendered_frames():
+    EFFECTS_CACHE.clear()
+    screen = pygame.Surface((200, 200))
+    explosions = [Explosion(Vector2(100, 100), radius=20) for _ in range(3)]
+    for _ in range(100):
+        for explosion in explosions:
+            explosion.draw(screen)
+            explosion.update(dt=explosion.duration / 99)
+
+    # one ring every frame is scaled from, and the frames themselves
+    assert len(EFFECTS_CACHE) == EXPLOSION_FRAMES + 1
+    assert screen.get_at((100, 80)) != (0, 0, 0, 255)
@@ -0,0 +1,52 @@
+import random
+
+import numpy as np
+import pytest
+
+from ai.genetic_gym import GeneticGym
+from ai.nn import NeuralNetwork
+from asteroid import Asteroid
+from constants import SCREEN_HEIGHT, SCREEN_WIDTH
+from game_state import NN_INPUTS, get_game_state, write_nn_inputs
+from main import Game
+
+
+def assert_same_inputs(game: Game) -> None:
+    written = np.zeros(NN_INPUTS)
+    assert write_nn_inputs(game, written)
+    assert np.array_equal(written, NeuralNetwork.get_inputs(get_game_state(game)))
+
+
+@pytest.mark.parametrize("crowded", [False, True])
+def test_written_inputs_match_the_game_state(crowded):
+    ship = GeneticGym._ship_factory(np.random.default_rng(7))
+    game = Game(headless=True, seed=2)
+    if crowded:
+        # more asteroids than are scanned linearly, the grid is searched
+        rng = random.Random(2)
+        for _ in range(60):
+            # away from the ship, which starts in the middle
+            x = rng.choice((rng.uniform(0, 400), rng.uniform(SCREEN_WIDTH - 400, SCREEN_WIDTH)))
+            y = rng.uniform(0, SCREEN_HEIGHT)
+            asteroid = Asteroid(x=x, y=y, radius=20, world=game.world)
+            asteroid.velocity.from_polar((rng.uniform(20, 40), rng.uniform(0, 360)))
+
+    frames = 0
+    while game.player.alive() and frames < 400:
+        if game.asteroids:
+            assert_same_inputs(game)
+        game.step(ship)
+        frames += 1
+    assert frames > 100
+
+
+@pytest.mark.parametrize("offset", [0, 0.0002])
+def test_ties_go_to_the_same_asteroid(offset):
+    game = Game(headless=True, seed=0)
+    game.asteroids.empty()
+    ship = game.player.position
+    # the same distance, or one that rounds to the same distance, from the ship
+    for x, y in ((ship.x + 100 + offset, ship.y), (ship.x, ship.y - 100), (ship.x - 100, ship.y)):
+        asteroid = Asteroid(x=x, y=y, radius=20, world=game.world)
+        asteroid.velocity.update(x - ship.x, 0)
+    assert_same_inputs(game)
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from ai.checkpoint import Checkpoint
+from ai.genetic_gym import GeneticGym
+from ai.nn import DenseLayer, NeuralNetwork, relu, softmax
+
+
+@pytest.fixture(scope="module")
+def ships() -> list[NeuralNetwork]:
+    rng = np.random.default_rng(0)
+    return [GeneticGym._ship_factory(rng) for _ in range(6)]
+
+
+@pytest.mark.parametrize("backend", ["sprite", "vector", "batched"])
+def test_serial_and_pool_evaluation_agree(ships, backend):
+    seeds = list(range(len(ships)))
+    fitness = []
+    for workers in (1, 2):
+        gym = GeneticGym(2, workers=workers, backend=backend, seed=0, cache_size=0)
+        try:
+            fitness.append(gym.evaluate(ships, seeds))
+        finally:
+            gym.close()
+    assert fitness[0] == fitness[1]
+
+
+def test_pool_workers_use_the_gyms_layout():
+    rng = np.random.default_rng(1)
+    ships = [
+        NeuralNetwork(
+            DenseLayer(5, 6, activation=relu, rng=rng),
+            DenseLayer(6, 4, activation=softmax, rng=rng),
+        )
+        for _ in range(4)
+    ]
+    checkpoint = Checkpoint(
+        population=np.stack([ship.genome() for ship in ships]),
+        layout=ships[0].layout,
+        generation=0,
+        rng_state=np.random.default_rng(2).bit_generator.state,
+        mutation_schedule=GeneticGym(2).mutation_schedule,
+        fitness_history=np.zeros((0, 2)),
+    )
+    seeds = [7] * len(ships)
+    fitness = []
+    for workers in (1, 2):
+        gym = GeneticGym(2, workers=workers, backend="vector", cache_size=0)
+        gym.restore(checkpoint)
+        try:
+            fitness.append(gym.evaluate(gym.population, seeds))
+        finally:
+            gym.close()
+    assert fitness[0] == fitness[1]
+
+
+def test_generations_are_bred_as_genome_rows():
+    gym = GeneticGym(8, backend="vector", seed=4, eval_seed=2)
+    gym.next_generation()
+    # the networks are views into the rows
+    gym.genomes[3] += 1.0
+    assert np.array_equal(gym.population[3].genome(), gym.genomes[3])
+
+    gym.next_generation()
+    # the elites' rows carry on unchanged, best first
+    best = np.argsort(gym.last_fitness)[::-1][: GeneticGym._ELITES_COUNT]
+    assert np.array_equal(gym.genomes[: GeneticGym._ELITES_COUNT], gym.last_genomes[best])
+    assert gym.genomes.shape == gym.last_genomes.shape
+
+
+def test_fresh_seeds_every_generation_by_default():
+    gym = GeneticGym(6, backend="vector", seed=3)
+    assert gym.eval_seed is None
+    assert gym.eval_seeds() != gym.eval_seeds()
+
+
+def test_elites_hit_the_cache_with_a_fixed_seed():
+    gym = GeneticGym(6, backend="vector", seed=3, eval_seed=11)
+    assert gym.eval_seeds() == [11] * 6
+    gym.next_generation()
+    gym.next_generation()
+    assert gym.fitness_cache.hits >= GeneticGym._ELITES_COUNT
+
+
+def test_arena_fitness_is_never_taken_for_vector_fitness(ships):
+    arena = GeneticGym(2, backend="arena", seed=0)
+    vector = GeneticGym(2, backend="vector", seed=0)
+    vector.fitness_cache = arena.fitness_cache
+    seeds = [5] * len(ships)
+
+    arena.evaluate(ships, seeds)
+    vector.evaluate(ships, seeds)
+    assert arena.fitness_cache.hits == 0
+    assert len(arena.fitness_cache) == 2 * len(ships)
@@ -0,0 +1,80 @@
+import queue
+
+import numpy as np
+import pytest
+
+from ai.genetic_gym import GeneticGym
+from ai.islands import IslandModel, _run_island, destinations
+from ai.nn import NeuralNetwork
+from budget import EvalBudget
+
+BUDGET = EvalBudget(max_frames=200)
+
+
+def test_destinations_of_the_topologies():
+    assert destinations("ring", 3) == [[1], [2], [0]]
+    assert destinations("full", 3) == [[1, 2], [0, 2], [0, 1]]
+    assert destinations({0: [2, 1, 2]}, 3) == [[1, 2], [], []]
+    with pytest.raises(ValueError):
+        destinations({0: [0]}, 3)
+
+
+def test_migrants_replace_the_newest_offspring():
+    inbox, outbox, reports = queue.Queue(), queue.Queue(), queue.Queue()
+    rng = np.random.default_rng(0)
+    immigrants = rng.standard_normal((2, len(GeneticGym._ship_factory(rng).genome())))
+    # one ahead of its time, it's only taken in at the migration it was sent for
+    inbox.put((2, 1, immigrants[1:]))
+    inbox.put((1, 1, immigrants[:1]))
+    kwargs = {"backend": "vector", "budget": BUDGET}
+    _run_island(0, 2, np.random.SeedSequence(0), 6, kwargs, 1, 1, [outbox], 1, inbox, reports)
+
+    messages = [reports.get_nowait() for _ in range(3)]
+    assert [message[0] for message in messages] == ["generation", "generation", "done"]
+    # every migration sends the best individual of the generation
+    for (_, _, gen_num, *_, best, _, _) in messages[:2]:
+        sent_gen, island, emigrants = outbox.get_nowait()
+        assert (sent_gen, island) == (gen_num, 0)
+        assert np.array_equal(emigrants[0], best)
+    final = messages[-1][2].population
+    assert len(final) == 6
+    assert np.array_equal(final[-1], immigrants[1])
+
+
+@pytest.mark.parametrize("survived", [True, False])
+def test_checkpoint_holds_every_island_once(survived):
+    model = IslandModel(islands=3, population_size=5, seed=0, backend="vector")
+    islands = [GeneticGym(5, seed=i, backend="vector").checkpoint() for i in range(3)]
+    if survived:
+        champion = islands[1].population[3]
+    else:
+        champion = np.random.default_rng(0).standard_normal(len(islands[0].population[0]))
+    model.champion = NeuralNetwork.from_genome(champion.copy(), islands[0].layout)
+
+    population = model.checkpoint(islands).population
+    assert population.shape == (15, len(champion))
+    assert np.array_equal(population[0], champion)
+    everyone = np.concatenate([island.population for island in islands])
+    if survived:
+        assert sorted(map(tuple, population)) == sorted(map(tuple, everyone))
+    else:
+        # in place of the last island's newest offspring
+        assert np.array_equal(population[1:], everyone[:-1])
+
+
+def test_islands_train_to_one_checkpoint(monkeypatch):
+    saved = []
+    monkeypatch.setattr("ai.islands.save_champion", saved.append)
+    model = IslandModel(
+        islands=2,
+        population_size=4,
+        migration_interval=1,
+        migrants=1,
+        seed=0,
+        backend="vector",
+        budget=BUDGET,
+    )
+    champion = model.train(2, save_result=True, display_champion=False)
+    assert len(model.fitness_history) == 2
+    assert saved[0].population.shape[0] == 8
+    assert np.array_equal(saved[0].population[0], champion.genome())
@@ -0,0 +1,69 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from ai.genetic_gym import GeneticGym
+from ai.nn import CompiledNetwork, NeuralNetwork, genome_length
+from game_state import NN_INPUTS
+from main import Game
+
+
+def test_compiled_networks_can_be_shared_between_threads():
+    rng = np.random.default_rng(0)
+    compiled = CompiledNetwork(GeneticGym._ship_factory(rng))
+    # float32 rows are copied into the input buffer first
+    rows = rng.uniform(-1, 1, size=(4000, NN_INPUTS)).astype(np.float32)
+    expected = [int(compiled.predict(row)) for row in rows]
+
+    def predict_all(chunk):
+        return [int(compiled.predict(row)) for row in chunk]
+
+    with ThreadPoolExecutor(8) as pool:
+        chunks = list(pool.map(predict_all, np.array_split(rows, 8)))
+    assert [action for chunk in chunks for action in chunk] == expected
+
+    # the buffers aren't pickled, an unpickled network makes its own
+    restored = pickle.loads(pickle.dumps(compiled))
+    assert [int(restored.predict(row)) for row in rows] == expected
+
+
+def test_compiled_networks_choose_the_same_actions():
+    rng = np.random.default_rng(1)
+    rows = rng.uniform(-1, 1, size=(1000, NN_INPUTS))
+    for _ in range(10):
+        network = GeneticGym._ship_factory(rng)
+        expected = network.predict(rows)
+        compiled = CompiledNetwork(network)
+        assert np.array_equal(compiled.predict(rows), expected)
+        assert [compiled.predict(row) for row in rows] == [network.predict(row) for row in rows]
+        # single precision may only differ on near ties
+        assert np.mean(CompiledNetwork(network, np.float32).predict(rows) == expected) > 0.99
+
+    network = GeneticGym._ship_factory(np.random.default_rng(8))
+    result = Game(headless=True, seed=0).sim(CompiledNetwork(network))
+    assert result == Game(headless=True, seed=0).sim(network)
+    assert result.frames > 0
+
+
+def test_networks_are_views_into_their_genome():
+    rng = np.random.default_rng(2)
+    network = GeneticGym._ship_factory(rng)
+    genome = network.genome()
+    assert len(genome) == genome_length(network.layout)
+
+    rows = rng.uniform(-1, 1, size=(200, NN_INPUTS))
+    rebuilt = NeuralNetwork.from_genome(genome, network.layout)
+    assert np.array_equal(rebuilt.predict(rows), network.predict(rows))
+
+    # the layers see changes to the genome, and the other way around
+    genome[:] = rng.standard_normal(len(genome))
+    assert np.array_equal(rebuilt.genome(), genome)
+    rebuilt.layers[-1].biases[0] = 7.0
+    assert 7.0 in genome
+
+    network.set_genome(genome)
+    assert np.array_equal(network.predict(rows), rebuilt.predict(rows))
+    with pytest.raises(ValueError):
+        NeuralNetwork.from_genome(genome[:-1], network.layout)
@@ -0,0 +1,56 @@
+import csv
+import json
+import time
+
+import numpy as np
+
+from ai.genetic_gym import GeneticGym
+from budget import EvalBudget
+from main import Game
+from profiling import Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    profiler.begin_frame()
+    with profiler.span("update"):
+        pass
+    profiler.end_frame(asteroids=3)
+    assert profiler.frames == [] and profiler.summary() == {}
+
+
+def test_spans_of_a_frame_add_up_and_percentiles_roll():
+    profiler = Profiler(enabled=True, window=4)
+    for frame in range(6):
+        profiler.begin_frame()
+        for _ in range(2):
+            with profiler.span("update"):
+                time.sleep(0.001)
+        profiler.end_frame(asteroids=frame)
+        assert profiler.frames[frame]["update"] >= 2.0
+
+    assert profiler.frames[5]["asteroids"] == 5
+    # only the last four frames count
+    assert profiler.percentiles("asteroids")[0] == 3.5
+    assert set(profiler.summary()) == {"update", "asteroids"}
+
+
+def test_profiled_games_export_every_frame(tmp_path):
+    ship = GeneticGym._ship_factory(np.random.default_rng(8))
+    profiler = Profiler(enabled=True)
+    result = Game(headless=True, seed=0, profiler=profiler).sim(
+        ship, budget=EvalBudget(max_frames=200)
+    )
+    assert result.frames == len(profiler.frames) == 200
+
+    profiler.export(str(tmp_path / "frames.csv"))
+    with open(tmp_path / "frames.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 200
+    assert {"frame", "update", "collisions", "predict", "asteroids", "shots"} <= set(rows[0])
+
+    profiler.export(str(tmp_path / "frames.json"))
+    with open(tmp_path / "frames.json") as f:
+        exported = json.load(f)
+    assert exported["frames"] == profiler.frames
+    assert exported["summary"] == profiler.summary()
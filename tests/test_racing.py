@@ -0,0 +1,61 @@
+from collections import Counter
+from types import SimpleNamespace
+
+import numpy as np
+
+from ai.genetic_gym import GeneticGym
+from ai.racing import Rung, SuccessiveHalving
+from budget import EvalBudget
+
+
+class ScoredGym:
+    """Stands in for a `GeneticGym`, a ship scores its quality plus less than 1 of seed noise."""
+
+    def __init__(self, seed: int):
+        self.rng = np.random.default_rng(seed)
+        self.eval_seed = None
+        self.budget = None
+        self.terminations: Counter = Counter()
+        self.games = 0
+
+    def eval_seeds(self, count: int) -> list[int]:
+        return self.rng.integers(2**32, size=count).tolist()
+
+    def evaluate(self, ships, seeds, budget=None, prune=True) -> list[float]:
+        self.games += len(ships)
+        return [ship.quality + seed % 1000 / 1000 for ship, seed in zip(ships, seeds)]
+
+
+def test_the_best_ships_win_the_race():
+    rng = np.random.default_rng(0)
+    qualities = rng.permutation(32) * 2.0
+    ships = [SimpleNamespace(quality=quality) for quality in qualities]
+    gym = ScoredGym(0)
+    racing = SuccessiveHalving(rungs=(Rung(1), Rung(2), Rung(4), Rung(8)), min_survivors=3)
+    result = racing.race(gym, ships)
+
+    # 32 -> 16 -> 8 -> 4 ships, the four best are the ones that play the last rung
+    best = np.argsort(-qualities)
+    assert set(np.flatnonzero(result.rung == 3)) == set(best[:4])
+    assert list(np.argsort(-result.fitness)[:4]) == list(best[:4])
+    assert gym.games == 32 * 1 + 16 * 2 + 8 * 4 + 4 * 8 < 32 * 15
+    assert list(result.episodes[best[:4]]) == [15] * 4
+
+
+def test_survivors_are_the_top_of_every_rung():
+    gym = GeneticGym(8, backend="vector", seed=3, eval_seed=4, budget=EvalBudget(max_frames=300))
+    racing = SuccessiveHalving()
+    result = racing.race(gym, gym.population)
+
+    # every individual on the first rung's seeds, the best half on the second rung's
+    first, last = (
+        SuccessiveHalving._seeds(gym, r, rung.episodes) for r, rung in enumerate(racing.rungs)
+    )
+    means = [np.mean(gym.evaluate([ship] * len(first), first)) for ship in gym.population]
+    finalists = np.argsort(-np.array(means), kind="stable")[:4]
+    assert set(np.flatnonzero(result.rung == 1)) == set(finalists)
+    finals = {i: np.mean(gym.evaluate([gym.population[i]] * len(last), last)) for i in finalists}
+    top = sorted(finals, key=finals.get, reverse=True)[:2]
+    assert list(np.argsort(-result.fitness, kind="stable")[:2]) == top
+    # the others are ranked by the games they got to play, below the finalists
+    assert result.fitness[result.rung == 0].max() <= result.fitness[finalists].min()
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from ai.genetic_gym import GeneticGym
+from ai.steady_state import SteadyState
+from budget import EvalBudget
+
+BUDGET = EvalBudget(max_frames=300)
+
+
+def test_population_too_small_to_breed():
+    with pytest.raises(ValueError):
+        SteadyState(GeneticGym(1, backend="vector", budget=BUDGET)).run(3)
+
+
+def test_known_individuals_are_scored_from_the_cache():
+    first = GeneticGym(6, backend="vector", seed=0, budget=BUDGET)
+    SteadyState(first).run(6, report_every=10**9)
+
+    second = GeneticGym(6, backend="vector", seed=0, budget=BUDGET)
+    second.fitness_cache = first.fitness_cache
+    hits = first.fitness_cache.hits
+    steady = SteadyState(second)
+    stats = steady.run(2, report_every=10**9)
+    assert first.fitness_cache.hits - hits == 6
+    assert stats.evaluations == 2
+    assert stats.busy_seconds <= stats.seconds
+
+
+@pytest.mark.parametrize("size", [4, 6, 8])
+def test_a_restored_population_is_scored_from_scratch(size):
+    gym = GeneticGym(6, backend="vector", seed=0, budget=BUDGET)
+    steady = SteadyState(gym)
+    steady.run(6, report_every=10**9)
+
+    other = GeneticGym(size, backend="vector", seed=1, budget=BUDGET)
+    gym.restore(other.checkpoint())
+    steady.run(size, report_every=10**9)
+    assert len(steady.fitness) == size
+    assert not np.isnan(steady.fitness).any()
+    # the games were the restored individuals', no children were bred in their place
+    assert sorted(map(tuple, gym.genomes)) == sorted(map(tuple, other.genomes))
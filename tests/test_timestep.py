@@ -0,0 +1,57 @@
+import numpy as np
+import pygame
+import pytest
+
+from ai.genetic_gym import GeneticGym
+from constants import PHYSICS_STEP
+from main import Game
+from timestep import FixedTimestep, Interpolation
+
+
+class Dot(pygame.sprite.Sprite):
+    def __init__(self, x: float, rotation_angle: float = 0):
+        super().__init__()
+        self.position = pygame.Vector2(x, 0)
+        self.rotation_angle = rotation_angle
+        self.spawns = 0
+
+
+def test_fixed_timestep_carries_the_remainder_over():
+    timestep = FixedTimestep(0.01)
+    assert timestep.advance(0.025) == 2
+    assert timestep.alpha == pytest.approx(0.5)
+    assert timestep.advance(0.006) == 1
+    assert timestep.alpha == pytest.approx(0.1)
+
+
+def test_fixed_timestep_drops_a_backlog_it_cant_catch_up_with():
+    timestep = FixedTimestep(0.01, max_steps=5)
+    assert timestep.advance(1.005) == 5
+    assert timestep.alpha == pytest.approx(0.5)
+    with pytest.raises(ValueError):
+        FixedTimestep(0)
+
+
+def test_sprites_are_drawn_between_their_last_two_states():
+    sprites = [Dot(0, rotation_angle=350), Dot(0), Dot(0)]
+    interpolation = Interpolation()
+    interpolation.remember(sprites)
+    sprites[0].position.x, sprites[0].rotation_angle = 10, 10
+    sprites[1].position.x = 500
+    sprites[2].position.x, sprites[2].spawns = 10, 1
+
+    with interpolation.blended(sprites, 0.25):
+        # the short way around, teleports and recycled sprites aren't blended
+        assert (sprites[0].position.x, sprites[0].rotation_angle) == (2.5, 355)
+        assert sprites[1].position.x == 500
+        assert sprites[2].position.x == 10
+    assert (sprites[0].position.x, sprites[0].rotation_angle) == (10, 10)
+
+
+def test_sim_steps_only_override_the_physics_step_for_that_game():
+    ship = GeneticGym._ship_factory(np.random.default_rng(8))
+    game = Game(headless=True, seed=0)
+    result = game.sim(ship, dt=0.03)
+    assert game.physics_step == PHYSICS_STEP
+    assert result == Game(headless=True, seed=0, physics_step=0.03).sim(ship)
+    assert result.frames > Game(headless=True, seed=0).sim(ship).frames > 0
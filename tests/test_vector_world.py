@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from ai.arena import SharedArena
+from ai.batch_sim import BatchedSim
+from ai.genetic_gym import GeneticGym
+from constants import PHYSICS_STEP
+from main import Game
+from vector_world import ASTEROID, HEALTH, KIND, POS, SHOT, VEL, VectorGame
+
+
+def sprite_state(game: Game) -> tuple:
+    asteroids = [(*a.position, *a.velocity, a.health_points) for a in game.asteroids]
+    shots = [(*shot.position, *shot.velocity) for shot in game.shots]
+    return np.reshape(asteroids, (-1, 5)), np.reshape(shots, (-1, 4))
+
+
+def array_state(game: VectorGame) -> tuple:
+    rows = game.rows
+    asteroids = rows[rows[:, KIND] == ASTEROID]
+    shots = rows[rows[:, KIND] == SHOT]
+    return asteroids[:, np.r_[POS, VEL, HEALTH]], shots[:, np.r_[POS, VEL]]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_array_world_plays_the_sprite_worlds_game(seed):
+    ship = GeneticGym._ship_factory(np.random.default_rng(7))
+    sprites, arrays = Game(headless=True, seed=seed), VectorGame(seed=seed)
+
+    frames = 0
+    while sprites.player.alive():
+        # pygame's and NumPy's vector maths round differently in the last bits
+        for expected, actual in zip(sprite_state(sprites), array_state(arrays)):
+            assert actual.shape == expected.shape
+            assert np.allclose(actual, expected, atol=1e-6)
+        assert arrays.player.score == sprites.player.score
+        assert arrays.player.lives == sprites.player.lives
+
+        assert arrays.ai_move(ship, dt=PHYSICS_STEP) == sprites.step(ship)
+        arrays.step(dt=PHYSICS_STEP)
+        frames += 1
+
+    assert not arrays.player.alive()
+    assert frames > 100
+
+    # this one uses all of its actions, so `sim` doesn't write its games off
+    ship = GeneticGym._ship_factory(np.random.default_rng(8))
+    result = VectorGame(seed=seed).sim(ship)
+    assert result == Game(headless=True, seed=seed).sim(ship)
+    assert result.frames > 0
+
+
+def test_lock_step_games_end_like_the_sprite_games():
+    rng = np.random.default_rng(3)
+    ships = [GeneticGym._ship_factory(rng) for _ in range(6)]
+    seeds = [11, 11, 12, 13, 14, 15]
+
+    batched = BatchedSim(ships, seeds).run()
+    assert batched == [Game(headless=True, seed=seed).sim(ship) for ship, seed in zip(ships, seeds)]
+    # the games end at different frames, the ones still running keep their places
+    assert len({result.frames for result in batched}) > 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_a_ship_alone_in_the_arena_plays_its_own_game(seed):
+    ship = GeneticGym._ship_factory(np.random.default_rng(8))
+    sprites, arena = Game(headless=True, seed=seed), SharedArena([ship], seed)
+
+    while sprites.player.alive():
+        present = arena.present[0]
+        asteroids = arena.field.rows[present]
+        state = (
+            np.c_[asteroids[:, np.r_[POS, VEL]], arena.health[0, present]],
+            arena.own_rows[:, np.r_[POS, VEL]],
+        )
+        for expected, actual in zip(sprite_state(sprites), state):
+            assert actual.shape == expected.shape
+            assert np.allclose(actual, expected, atol=1e-6)
+        assert arena.score[0] == sprites.player.score
+        assert arena.lives[0] == sprites.player.lives
+
+        sprites.step(ship)
+        arena.step()
+
+    arena.step()
+    assert arena.results == [Game(headless=True, seed=seed).sim(ship)]
+    assert arena.results[0].frames > 0
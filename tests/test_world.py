@@ -0,0 +1,93 @@
+import random
+
+import numpy as np
+import pygame
+import pytest
+
+from ai.genetic_gym import GeneticGym
+from controls import NoInput
+from debris import DebrisParticle
+from explosion import Explosion
+from main import Game
+from shot import Shot
+from vector_world import VectorGame
+
+
+@pytest.fixture(scope="module")
+def ship():
+    return GeneticGym._ship_factory(np.random.default_rng(7))
+
+
+def snapshot(game: Game) -> tuple:
+    return (
+        [(*asteroid.position, *asteroid.velocity) for asteroid in game.asteroids],
+        [(*shot.position, *shot.velocity) for shot in game.shots],
+        game.player.score,
+        game.player.lives,
+    )
+
+
+def test_games_side_by_side_keep_to_themselves(ship):
+    alone = Game(headless=True, seed=0)
+    together = [Game(headless=True, seed=seed) for seed in (0, 1, 0)]
+    for _ in range(300):
+        alone.step(ship)
+        for game in together:
+            game.step(ship)
+            # the games draw from streams of their own, never from the global one
+            random.random()
+        assert snapshot(together[0]) == snapshot(alone) == snapshot(together[2])
+
+    first, second, _ = together
+    assert snapshot(second) != snapshot(first)
+    assert not set(first.updateables) & set(second.updateables)
+    assert all(sprite.world is first.world for sprite in first.updateables)
+
+
+def test_headless_games_need_no_display_and_make_no_effects(ship):
+    pygame.quit()
+    game = Game(headless=True, seed=0)
+    while game.player.alive():
+        game.step(ship)
+        assert {type(sprite) for sprite in game.updateables}.isdisjoint((DebrisParticle, Explosion))
+
+    assert game.player.score > 0
+    assert not pygame.get_init()
+    assert not {DebrisParticle, Explosion} & set(game.world.pools)
+
+
+@pytest.mark.parametrize("seed", [0, 5])
+def test_seeded_games_repeat(ship, seed):
+    games = [Game(headless=True, seed=seed) for _ in range(2)]
+    while games[0].player.alive():
+        for game in games:
+            game.step(ship)
+        assert snapshot(games[1]) == snapshot(games[0])
+
+    assert not games[1].player.alive()
+    # a ship that uses all of its actions, or `sim` writes its games off
+    ship = GeneticGym._ship_factory(np.random.default_rng(8))
+    result = VectorGame(seed=seed).sim(ship)
+    assert result == VectorGame(seed=seed).sim(ship)
+    assert result.frames > 0
+
+
+
+@pytest.mark.parametrize("effects, pooling", [(False, False), (True, True), (True, False)])
+def test_effects_and_pooling_leave_the_game_alone(ship, effects, pooling):
+    reference = Game(headless=True, seed=3)
+    game = Game(
+        headless=not effects,
+        controls=NoInput(),
+        seed=3,
+        pool_caps=None if pooling else {Shot: 0, DebrisParticle: 0, Explosion: 0},
+    )
+    while reference.player.alive():
+        reference.step(ship)
+        game.step(ship)
+        assert snapshot(game) == snapshot(reference)
+    assert not game.player.alive()
+
+    stats = game.world.pool_stats()
+    assert (stats["Shot"]["hits"] > 0) == pooling
+    assert ("Explosion" in stats and "DebrisParticle" in stats) == effects
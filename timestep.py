@@ -0,0 +1,117 @@
+"""Fixed-timestep game loop helpers - the physics always advances by the same step."""
+
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+
+import pygame
+
+MAX_CATCH_UP_STEPS = 5
+"""Physics steps a single rendered frame may run, slower frames lose the extra time."""
+
+_TELEPORT_DISTANCE = 100
+"""Moves longer than this in one step (wrapping, respawning) are drawn without blending."""
+
+
+class FixedTimestep:
+    """
+    Accumulates real time and turns it into whole physics steps.
+
+    The remainder that doesn't make up a full step is carried over to the next frame,
+    `alpha` says how far into the next step the rendered frame is. When a frame is so
+    slow that it would need more than `max_steps` steps, the backlog is dropped instead
+    of trying to catch up - otherwise every frame would get slower than the last.
+    """
+
+    def __init__(self, step: float, max_steps: int = MAX_CATCH_UP_STEPS):
+        if step <= 0:
+            raise ValueError("the physics step must be positive")
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, elapsed: float) -> int:
+        """Adds `elapsed` seconds of real time, returns how many physics steps to run."""
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator %= self.step
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        """Progress (0 to 1) between the last two physics states the frame is drawn at."""
+        return self.accumulator / self.step
+
+
+class Interpolation:
+    """
+    Remembers where the sprites were before the last physics step and draws them blended
+    between that and their current state, so motion is smooth at any display rate.
+
+    Snapshots are per spawn of a pooled sprite, one that was recycled during the step
+    doesn't blend with where its previous life was.
+    """
+
+    def __init__(self):
+        self._previous: dict[pygame.sprite.Sprite, tuple[int, tuple]] = {}
+
+    def remember(self, sprites: Iterable[pygame.sprite.Sprite]) -> None:
+        """Snapshots the sprites, call right before a physics step."""
+        self._previous = {sprite: (_spawns(sprite), _state(sprite)) for sprite in sprites}
+
+    @contextmanager
+    def blended(self, sprites: Iterable[pygame.sprite.Sprite], alpha: float) -> Iterator[None]:
+        """Moves the sprites to their blended state for drawing and back afterwards."""
+        restore = []
+        for sprite in sprites:
+            spawns, previous = self._previous.get(sprite, (None, None))
+            if spawns != _spawns(sprite):
+                # spawned (or recycled) in the last step, there's nothing to blend with
+                continue
+            current = _state(sprite)
+            restore.append((sprite, current))
+            _set_state(sprite, _blend(previous, current, alpha))
+        try:
+            yield
+        finally:
+            for sprite, state in restore:
+                _set_state(sprite, state)
+
+
+def _spawns(sprite: pygame.sprite.Sprite) -> int:
+    return getattr(sprite, "spawns", 0)
+
+
+def _angle_name(sprite: pygame.sprite.Sprite) -> Optional[str]:
+    for name in ("rotation", "rotation_angle"):
+        if hasattr(sprite, name):
+            return name
+    return None
+
+
+def _state(sprite: pygame.sprite.Sprite) -> tuple:
+    angle = _angle_name(sprite)
+    return (
+        pygame.Vector2(sprite.position),  # type: ignore
+        getattr(sprite, angle) if angle else None,
+    )
+
+
+def _set_state(sprite: pygame.sprite.Sprite, state: tuple) -> None:
+    position, angle = state
+    sprite.position = position  # type: ignore
+    if angle is not None:
+        setattr(sprite, _angle_name(sprite), angle)  # type: ignore
+
+
+def _blend(previous: tuple, current: tuple, alpha: float) -> tuple:
+    (old_position, old_angle), (position, angle) = previous, current
+    if old_position.distance_to(position) > _TELEPORT_DISTANCE:
+        return current
+    if angle is not None and old_angle is not None:
+        # the shorter way around
+        angle = old_angle + ((angle - old_angle + 180) % 360 - 180) * alpha
+    return old_position.lerp(position, alpha), angle
@@ -1,3 +1,5 @@
+import numpy as np
+
 from constants import SCREEN_WIDTH, SCREEN_HEIGHT
 from circleshape import CircleShape
 
@@ -15,3 +17,14 @@ def is_colliding(obj_one: "CircleShape", obj_two: "CircleShape") -> bool:
         obj_one.position.distance_to(obj_two.position)
         <= obj_one.radius + obj_two.radius
     )
+
+
+def rotate_points(points: np.ndarray, angles: np.ndarray) -> np.ndarray:
+    """
+    Rotates many shapes at once - `points` are (N, V, 2) vertices relative to the shapes'
+    centers, `angles` are (N,) rotations in degrees.
+    """
+    angles = np.radians(angles)[:, np.newaxis]
+    cos_a, sin_a = np.cos(angles), np.sin(angles)
+    x, y = points[..., 0], points[..., 1]
+    return np.stack((x * cos_a - y * sin_a, x * sin_a + y * cos_a), axis=-1)
@@ -0,0 +1,596 @@
+"""
+Structure-of-arrays game world for fast headless simulation.
+
+Instead of one sprite per object, the state of the player, all asteroids and all shots
+is kept in one contiguous NumPy table (a row per object, a column per attribute) and
+each frame is a handful of batched array operations over it. The game rules (spawning,
+splitting, scoring, respawning) are the same as in `Game`, sprites are only built when
+the world is drawn.
+
+A frame of a few dozen objects is mostly NumPy call overhead, not arithmetic - the array
+world is 2-4x as fast as the sprite world, see `benchmarks/bench_world.py`. Frames where
+asteroids bump into each other are resolved pair by pair in `Game`'s order, which keeps
+both worlds playing the same game but costs crowded fields most of their lead.
+"""
+
+import itertools
+import math
+import random
+from collections import Counter
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+import pygame
+
+from asteroid import SHAPE_SPIKINESS, SHAPE_VERTICES
+from asteroidfield import AsteroidField
+from budget import BudgetTracker, EvalBudget, SimResult, Termination
+from constants import *
+from game_state import NN_INPUTS
+
+if TYPE_CHECKING:
+    from ai.nn import NeuralNetwork
+    from asteroid import Asteroid
+    from player import Player
+
+    NDArray = np.ndarray
+
+
+# Object kinds:
+PLAYER, ASTEROID, SHOT = 0, 1, 2
+
+# Table columns:
+POS = slice(0, 2)
+VEL = slice(2, 4)
+CENTER = slice(4, 6)
+HALF_SIZE = slice(6, 8)
+"""Objects leaving the box given by its (center, half size) are culled."""
+RADIUS = 8
+HEALTH = 9
+"""Health points of asteroids, damage of shots."""
+KIND = 10
+ID = 11
+ROTATION_SPEED = 12
+BIRTH = 13
+"""Time the object was spawned at, asteroid rotation is derived from it when drawing."""
+COLUMNS = 14
+
+_ASTEROID_MARGIN = ASTEROID_MAX_RADIUS * 2
+
+
+class VectorPlayer:
+    """Plain player state, follows the rules of `Player` without being a sprite."""
+
+    def __init__(self, world: "VectorGame"):
+        self._world = world
+        self.radius = PLAYER_RADIUS
+        self.lives = PLAYER_LIVES
+        self.rotation = 0
+        self.shot_timer = 0
+        self.score = 0
+        self.shots_hit = 0
+        self.shots_fired = 0
+        self.accuracy = 0
+        self._alive = True
+
+    @property
+    def position(self) -> "NDArray":
+        """The player is always the first row of the world table."""
+        return self._world.table[0, POS]
+
+    def alive(self) -> bool:
+        return self._alive
+
+    def forward(self) -> tuple[float, float]:
+        """Unit vector the ship is facing, same as `Vector2(0, 1).rotate(rotation)`."""
+        angle = math.radians(self.rotation)
+        return -math.sin(angle), math.cos(angle)
+
+    def rotate(self, dt: float) -> None:
+        self.rotation += PLAYER_TURN_SPEED * dt
+
+        if self.rotation < 0:
+            self.rotation += 360
+        elif self.rotation > 360:
+            self.rotation -= 360
+
+    def move(self, dt: float) -> None:
+        fx, fy = self.forward()
+        position = self.position
+        x, y = position.tolist()
+        next_x = x + fx * PLAYER_SPEED * dt
+        next_y = y + fy * PLAYER_SPEED * dt
+
+        if next_x < 0:
+            next_x = SCREEN_WIDTH
+        elif next_x > SCREEN_WIDTH:
+            next_x -= SCREEN_WIDTH
+
+        if next_y < 0:
+            next_y = SCREEN_HEIGHT
+        elif next_y > SCREEN_HEIGHT:
+            next_y -= SCREEN_HEIGHT
+
+        position[0], position[1] = next_x, next_y
+
+    def respawn(self, points_lost: float) -> None:
+        self.lives -= 1
+        if not self.lives:
+            self._alive = False
+            return
+
+        self.score = max(0, self.score - points_lost)
+
+    def update_accuracy(self) -> None:
+        if self.shots_fired == 0:
+            self.accuracy = 0
+        else:
+            self.accuracy = (self.shots_hit / self.shots_fired) * 100
+
+
+class VectorGame:
+    """
+    A headless game whose objects live in a NumPy table.
+
+    Only the first `count` rows of `table` are in use, row 0 is always the player.
+    Objects are appended at the end and dead ones are compacted away, so the rows
+    keep their spawn order - the same order `Game` iterates its sprite groups in.
+    """
+
+    def __init__(self, capacity: int = 64, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        """Gameplay randomness, the same stream `World.rng` is for a `Game`."""
+        self.table = np.zeros((capacity, COLUMNS))
+        self.count = 0
+        self.player = VectorPlayer(world=self)
+        self.spawn_timer = 0.0
+        self.time = 0.0
+
+        self._next_id = itertools.count()
+        self._spawned: list[tuple[float, float, float, float, float, float]] = []
+        """Fragments of the asteroids split this frame, they join once it's over."""
+        self._reach: Optional["NDArray"] = None
+        self._asteroid_rows = np.zeros(0, dtype=int)
+        self._sprites: dict[int, "Asteroid"] = {}
+        self._player_sprite: Optional["Player"] = None
+        self._nn_inputs = np.zeros(NN_INPUTS)
+
+        self._append(
+            SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2, 0, 0, PLAYER_RADIUS, 0, PLAYER, np.inf
+        )
+
+    @property
+    def rows(self) -> "NDArray":
+        """The rows of the table that are in use."""
+        return self.table[: self.count]
+
+    @property
+    def asteroid_count(self) -> int:
+        return int(np.count_nonzero(self.rows[:, KIND] == ASTEROID))
+
+    def sim(
+        self,
+        ship_ai: "NeuralNetwork",
+        dt: float = PHYSICS_STEP,
+        budget: Optional[EvalBudget] = None,
+    ) -> SimResult:
+        """Same as `Game.sim`, but on the array backed world."""
+        taken_actions = Counter()
+        tracker = budget.tracker(dt) if budget is not None else None
+
+        for i in itertools.count():
+            reason = self.termination(i, tracker)
+            if reason is not None:
+                # punish the ships that are not using all outputs
+                if len(taken_actions) < 4:
+                    return SimResult(0, 0, reason)
+                return SimResult(i, self.player.score, reason)
+
+            action = self.ai_move(ship_ai, dt=dt)
+            taken_actions[action] += 1
+            self.step(dt=dt)
+
+        raise RuntimeError("needed for typehint")
+
+    def termination(self, frame: int, tracker: Optional[BudgetTracker]) -> Optional[Termination]:
+        """Why the game has to end before playing `frame`, if it has to."""
+        if not self.player.alive():
+            return Termination.DIED
+        if tracker is None:
+            return None
+        x, y = self.player.position.tolist()
+        return tracker.check(frame, self.player.score, x, y)
+
+    def ai_move(self, ship_ai: "NeuralNetwork", dt: float) -> Optional[int]:
+        """The AI makes a move based on current game state."""
+        inputs = self.get_inputs(out=self._nn_inputs)
+        if inputs is None:
+            return
+
+        ai_action = int(ship_ai.predict(inputs))  # 0, 1, 2, 3
+        self.act(ai_action, dt=dt)
+        return ai_action
+
+    def act(self, ai_action: int, dt: float) -> None:
+        """Carries out an action chosen by the AI."""
+        if ai_action == 0:
+            self.player.move(dt=dt)
+        if ai_action == 1:
+            self.player.rotate(dt=dt)
+        if ai_action == 2:
+            self.player.rotate(dt=dt)
+        if ai_action == 3:
+            self.shoot()
+
+    def get_inputs(self, out: Optional["NDArray"] = None) -> Optional["NDArray"]:
+        """
+        NN inputs for the current state, the same values as `get_game_state` followed
+        by `NeuralNetwork.get_inputs`, with the nearest asteroid found in one pass.
+        They're written into `out` when it's given, a new array otherwise.
+        """
+        rows = self.rows
+        asteroids = np.flatnonzero(rows[:, KIND] == ASTEROID)
+        if not len(asteroids):
+            return
+
+        rotation = self.player.rotation
+        delta = rows[0, POS] - rows[asteroids, POS]
+        dists = np.hypot(delta[:, 0], delta[:, 1])
+        nearest = int(dists.argmin())
+        dx, dy = delta[nearest].tolist()
+        # the player never has a velocity of its own
+        rel_vx, rel_vy = rows[asteroids[nearest], VEL].tolist()
+        angle = (math.degrees(math.atan2(dy, dx)) - rotation) % 360
+
+        if out is None:
+            out = np.empty(NN_INPUTS)
+        out[0] = (round(rotation, 3) - 180) / 180
+        out[1] = round(float(dists[nearest]), 3) / SCREEN_DIAGONAL
+        out[2] = (angle - 180) / 180
+        out[3] = round(rel_vx, 3) / SCREEN_WIDTH
+        out[4] = round(rel_vy, 3) / SCREEN_HEIGHT
+        return out
+
+    def shoot(self) -> bool:
+        """Shoots the ship's gun, see `Player.shoot`."""
+        player = self.player
+        if player.shot_timer > 0:
+            return False
+        fx, fy = player.forward()
+        x, y = player.position.tolist()
+        self._append(
+            x,
+            y,
+            fx * PLAYER_SHOOT_SPEED,
+            fy * PLAYER_SHOOT_SPEED,
+            SHOT_RADIUS,
+            PRIMARY_WEOPON_DAMAGE,
+            SHOT,
+            0,
+        )
+        player.shot_timer = PLAYER_SHOOT_COOLDOWN
+        player.shots_fired += 1
+        player.update_accuracy()
+        return True
+
+    def step(self, dt: float) -> None:
+        """Advances the world by one frame - movement, culling, spawning and collisions."""
+        self.player.shot_timer -= dt
+        self.time += dt
+
+        # Movement and off-screen culling:
+        rows = self.rows
+        pos = rows[:, POS]
+        pos += rows[:, VEL] * dt
+        inside = np.abs(pos - rows[:, CENTER]) <= rows[:, HALF_SIZE]
+        alive = inside[:, 0] & inside[:, 1]
+
+        # a new asteroid can collide right away, like the sprite that `AsteroidField` adds
+        # in the middle of `Game`'s update
+        self._update_field(dt=dt)
+        if self.count > len(alive):
+            alive = np.concatenate((alive, np.ones(self.count - len(alive), dtype=bool)))
+        self._collide(alive)
+
+        # Drop the dead, add the fragments:
+        if not alive.all():
+            alive[0] = True  # the player dies through `alive()`, never through the table
+            kept = self.rows[alive]
+            self.count = len(kept)
+            self.table[: self.count] = kept
+            self._reach = None
+        for radius, x, y, vx, vy, rotation_speed in self._spawned:
+            self._append_asteroid(radius, x, y, vx, vy, rotation_speed)
+        self._spawned.clear()
+
+    def _append(
+        self,
+        x: float,
+        y: float,
+        vx: float,
+        vy: float,
+        radius: float,
+        health: float,
+        kind: int,
+        margin: float,
+        rotation_speed: float = 0.0,
+    ) -> None:
+        """Adds an object as the last row, it's culled once `margin` off the screen."""
+        if self.count == len(self.table):
+            self.table = np.concatenate((self.table, np.zeros_like(self.table)))
+        row = self.table[self.count]
+        row[POS] = x, y
+        row[VEL] = vx, vy
+        row[CENTER] = SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2
+        row[HALF_SIZE] = SCREEN_WIDTH / 2 + margin, SCREEN_HEIGHT / 2 + margin
+        row[RADIUS] = radius
+        row[HEALTH] = health
+        row[KIND] = kind
+        row[ID] = next(self._next_id)
+        row[ROTATION_SPEED] = rotation_speed
+        row[BIRTH] = self.time
+        self.count += 1
+        self._reach = None
+
+    def spawn(self, radius: float, position, velocity) -> None:
+        """Adds an asteroid, same as `AsteroidField.spawn`."""
+        rotation_speed = self._asteroid_draws(radius)
+        self._append_asteroid(
+            radius, position[0], position[1], velocity[0], velocity[1], rotation_speed
+        )
+
+    def _append_asteroid(
+        self, radius: float, x: float, y: float, vx: float, vy: float, rotation_speed: float
+    ) -> None:
+        self._append(x, y, vx, vy, radius, radius, ASTEROID, _ASTEROID_MARGIN, rotation_speed)
+
+    def _asteroid_draws(self, radius: float) -> float:
+        """
+        Draws what a new `Asteroid` draws from the gameplay stream - its outline, then
+        its rotation speed - so the stream stays in step with `Game`'s. Returns the speed,
+        the outline only matters to sprites.
+        """
+        for _ in range(SHAPE_VERTICES):
+            self.rng.uniform(0, SHAPE_SPIKINESS * radius)
+        return self.rng.uniform(-40, 40)
+
+    def _update_field(self, dt: float) -> None:
+        """Spawns asteroids at the edges of the screen, see `AsteroidField.update`."""
+        self.spawn_timer += dt
+        if self.spawn_timer > ASTEROID_SPAWN_RATE:
+            self.spawn_timer = 0
+
+            edge = self.rng.choice(AsteroidField.edges)
+            speed = self.rng.randint(40, 100)
+            velocity = edge[0] * speed
+            velocity = velocity.rotate(self.rng.randint(-30, 30))
+            position = edge[1](self.rng.uniform(0, 1))
+            kind = self.rng.randint(1, ASTEROID_KINDS)
+            self.spawn(ASTEROID_MIN_RADIUS * kind, position, velocity)
+
+    def _index(self) -> None:
+        """
+        Caches which rows are asteroids and their collision distance to every row - they
+        only change when objects come and go. Only asteroids collide with anything, with
+        the player, the shots and the asteroids after them, every other pair gets a
+        negative distance so it never collides.
+        """
+        rows = self.rows
+        kind = rows[:, KIND]
+        radius = rows[:, RADIUS]
+        self._asteroid_rows = asteroids = np.flatnonzero(kind == ASTEROID)
+        reach = radius[asteroids][:, None] + radius[None, :]
+        later = np.arange(self.count)[None, :] > asteroids[:, None]
+        self._reach = np.where((kind != ASTEROID)[None, :] | later, reach, -1.0)
+
+    def _collide(self, alive: "NDArray") -> None:
+        """
+        Detects the collisions of asteroids with each other, the player and the shots in
+        one (asteroids, objects) distance matrix, then resolves the hits in bulk.
+        """
+        if self._reach is None:
+            self._index()
+        asteroids = self._asteroid_rows
+
+        # positions as complex numbers make the distance matrix a single `abs`
+        z = self.rows[:, POS].view(np.complex128)[:, 0]
+        dist = np.abs(z[asteroids][:, None] - z[None, :])
+        contact = dist <= self._reach
+        if not contact.any():
+            return
+        contact &= alive[asteroids][:, None] & alive[None, :]
+
+        rows = self.rows
+        k, j = np.nonzero(contact)
+        i = asteroids[k]
+        kind_j = rows[j, KIND]
+        if (kind_j == ASTEROID).any():
+            # pushing asteroids apart moves them, the later tests have to see where to
+            self._collide_in_order(asteroids, contact, alive)
+            return
+        player = self.player
+
+        # asteroid - player, the player is row 0
+        for a in i[j == 0].tolist():
+            if not player.alive():
+                break
+            alive[a] = False
+            player.respawn(points_lost=float(rows[a, RADIUS]) * 1.5 / 2)
+
+        # asteroid - shot, asteroids in spawn order use up the shots touching them
+        shots = kind_j == SHOT
+        if shots.any():
+            self._hit(i[shots], j[shots], alive)
+
+    def _collide_in_order(self, asteroids: "NDArray", contact: "NDArray", alive: "NDArray") -> None:
+        """
+        `Game`'s collision pass, asteroid by asteroid in spawn order - the player first,
+        then the later asteroids, then the shots. Asteroids pushed apart are tested again
+        where they were pushed to, the rest keep the contacts of the frame's start.
+        """
+        rows = self.rows
+        player = self.player
+        z = rows[:, POS].view(np.complex128)[:, 0]
+        positions, radius, health = z.tolist(), rows[:, RADIUS].tolist(), rows[:, HEALTH]
+        kind = rows[:, KIND]
+        is_asteroid, is_shot = kind == ASTEROID, kind == SHOT
+        # the contacts at the frame's start, by asteroid row
+        k, j = contact.nonzero()
+        other_asteroids = [[] for _ in range(self.count)]
+        shots_touching = [[] for _ in range(self.count)]
+        for a, b, kind_b in zip(asteroids[k].tolist(), j.tolist(), kind[j].tolist()):
+            if kind_b == ASTEROID:
+                other_asteroids[a].append(b)
+            elif kind_b == SHOT:
+                shots_touching[a].append(b)
+        # where the asteroids pushed apart so far are, the others haven't moved
+        pushed = {}
+
+        for a in asteroids.tolist():
+            if not alive[a]:
+                continue
+            reach = radius[a]
+            here = pushed.get(a, positions[a])
+            if player.alive() and abs(here - positions[0]) <= reach + radius[0]:
+                alive[a] = False
+                player.respawn(points_lost=reach * 1.5 / 2)
+
+            if a in pushed:
+                others = self._touching(a, a + 1, is_asteroid)
+            else:
+                # asteroids only move when pushed, the rest can't have come any closer
+                others = other_asteroids[a] + [
+                    b
+                    for b, there in pushed.items()
+                    if b > a and abs(here - there) <= reach + radius[b] + 1e-6
+                ]
+                others = sorted(set(others))
+            while alive[a] and others:
+                b = others.pop(0)
+                if alive[b] and self._resolve_pair(a, b):
+                    pushed[a], pushed[b] = complex(z[a]), complex(z[b])
+                    others = self._touching(a, b + 1, is_asteroid)
+
+            # like `Game` this doesn't ask whether the asteroid is still alive
+            for shot in self._touching(a, 1, is_shot) if a in pushed else shots_touching[a]:
+                if alive[shot]:
+                    alive[shot] = False
+                    player.shots_hit += 1
+                    health[a] -= health[shot]
+                    if health[a] <= 0:
+                        alive[a] = False
+                        player.score += self._kill(a)
+
+    def _touching(self, a: int, start: int, kind: "NDArray") -> list[int]:
+        """The rows from `start` on of the given kind that touch row `a` right now."""
+        rows = self.rows[start:]
+        z = rows[:, POS].view(np.complex128)[:, 0]
+        near = np.abs(z - complex(*self.rows[a, POS])) <= rows[:, RADIUS] + self.rows[a, RADIUS]
+        return (start + np.flatnonzero(near & kind[start:])).tolist()
+
+    def _resolve_pair(self, a: int, b: int) -> bool:
+        """`Asteroid.resolve_collision` for two asteroid rows, whether it pushed them apart."""
+        rows = self.rows
+        (ax, ay), (bx, by) = rows[a, POS].tolist(), rows[b, POS].tolist()
+        dx, dy = ax - bx, ay - by
+        distance = math.sqrt(dx * dx + dy * dy)
+        reach = float(rows[a, RADIUS] + rows[b, RADIUS])
+        if distance > reach or distance == 0:
+            return False
+        nx, ny = dx / distance, dy / distance
+        (avx, avy), (bvx, bvy) = rows[a, VEL].tolist(), rows[b, VEL].tolist()
+        along = (avx - bvx) * nx + (avy - bvy) * ny
+        if along > 0:
+            return False
+        rows[a, VEL] = avx - nx * along, avy - ny * along
+        rows[b, VEL] = bvx + nx * along, bvy + ny * along
+        overlap = reach - distance
+        if overlap <= 0:
+            return False
+        cx, cy = nx * (overlap / 2), ny * (overlap / 2)
+        rows[a, POS] = ax + cx, ay + cy
+        rows[b, POS] = bx - cx, by - cy
+        return True
+
+    def _hit(self, asteroids: "NDArray", shots: "NDArray", alive: "NDArray") -> None:
+        """
+        Resolves the (asteroid, shot) contacts, sorted by asteroid and then shot - every
+        shot damages the first asteroid it touches, each hit that leaves an asteroid
+        without health splits it, as `Asteroid.split` does.
+        """
+        _, first = np.unique(shots, return_index=True)
+        used = np.sort(first)
+        asteroids, shots = asteroids[used], shots[used]
+        health = self.table[:, HEALTH]
+        damage = health[shots]
+
+        # the health left after every hit, the hits of an asteroid are consecutive
+        spent = np.cumsum(damage)
+        starts = np.flatnonzero(np.r_[True, asteroids[1:] != asteroids[:-1]])
+        spent -= np.repeat(spent[starts] - damage[starts], np.diff(np.r_[starts, len(spent)]))
+        left = health[asteroids] - spent
+        np.subtract.at(health, asteroids, damage)
+
+        alive[shots] = False
+        player = self.player
+        player.shots_hit += len(shots)
+        for index in asteroids[left <= 0].tolist():
+            alive[index] = False
+            player.score += self._kill(index)
+
+    def _kill(self, index: int) -> float:
+        """Points for shooting down an asteroid, big ones split in two - see `Asteroid.split`."""
+        row = self.table[index]
+        radius = float(row[RADIUS])
+        if radius <= ASTEROID_MIN_RADIUS:
+            return radius * 1.5
+
+        velocity = pygame.Vector2(row[VEL].tolist())
+        x, y = row[POS].tolist()
+        v1 = velocity.rotate(self.rng.uniform(20, 50)) * 1.2
+        v2 = velocity.rotate(self.rng.uniform(-20, -50)) * 1.2
+        new_rad = radius - ASTEROID_MIN_RADIUS
+        for v in (v1, v2):
+            self._spawned.append((new_rad, x, y, v.x, v.y, self._asteroid_draws(new_rad)))
+        return radius * 1.5 - radius / 2
+
+    def sprites(self) -> list:
+        """Materialises the world as sprites, only needed for rendering."""
+        from asteroid import Asteroid
+        from player import Player
+        from shot import Shot
+
+        rows = self.rows.tolist()
+        if self._player_sprite is None:
+            self._player_sprite = Player(*rows[0][POS])
+        self._player_sprite.position.update(*rows[0][POS])
+        self._player_sprite.rotation = self.player.rotation
+
+        sprites: list = [self._player_sprite] if self.player.alive() else []
+        asteroids = {}
+        for row in rows[1:]:
+            x, y = row[POS]
+            if row[KIND] == SHOT:
+                sprites.append(Shot(x=x, y=y, damage=row[HEALTH]))
+                continue
+
+            # keep the sprites between frames so the asteroid shapes don't change
+            asteroid = self._sprites.get(int(row[ID]))
+            if asteroid is None:
+                asteroid = Asteroid(x=x, y=y, radius=row[RADIUS])
+            asteroid.position.update(x, y)
+            asteroid.rotation_angle = (row[ROTATION_SPEED] * (self.time - row[BIRTH])) % 360
+            asteroids[int(row[ID])] = asteroid
+            sprites.append(asteroid)
+        self._sprites = asteroids
+
+        return sprites
+
+    def draw(self, screen: "pygame.Surface") -> None:
+        """Draws the world."""
+        from asteroid import Asteroid
+
+        sprites = self.sprites()
+        Asteroid.prepare_outlines(sprite for sprite in sprites if isinstance(sprite, Asteroid))
+        for sprite in sprites:
+            sprite.draw(screen=screen)
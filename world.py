@@ -0,0 +1,54 @@
+"""Registry of the sprites that make up one game."""
+
+import random
+from typing import TYPE_CHECKING, Optional
+
+import pygame
+
+from pool import POOL_CAP, Pool
+
+if TYPE_CHECKING:
+    from pygame.sprite import Sprite
+
+
+class World:
+    """
+    Holds the sprite groups and random number generators of a single game. Entities are
+    given the world they live in and join its groups themselves, so any number of games
+    can exist side by side.
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        visual_effects: bool = True,
+        pool_caps: Optional[dict[type, int]] = None,
+    ):
+        self.rng = random.Random(seed)
+        """Gameplay randomness - spawns, asteroid shapes, splits."""
+        self.fx_rng = random.Random(None if seed is None else f"{seed}/fx")
+        """Cosmetic randomness, kept apart so effects never change how a game plays out."""
+        self.visual_effects = visual_effects
+        """Whether purely cosmetic sprites (debris, explosions) are created."""
+        self.updateables = pygame.sprite.Group()
+        self.drawables = pygame.sprite.Group()
+        self.asteroids = pygame.sprite.Group()
+        self.shots = pygame.sprite.Group()
+        self.pool_caps = pool_caps or {}
+        """Free list sizes by class, classes not listed get `POOL_CAP`, 0 disables pooling."""
+        self.pools: dict[type, Pool] = {}
+
+    def groups_for(self, sprite: "Sprite") -> list["pygame.sprite.Group"]:
+        """Groups a sprite belongs to, as named by its `group_names`."""
+        return [getattr(self, name) for name in getattr(sprite, "group_names", ())]
+
+    def pool(self, cls: type) -> Pool:
+        """The world's pool of killed objects of `cls`, created on first use."""
+        pool = self.pools.get(cls)
+        if pool is None:
+            pool = self.pools[cls] = Pool(cls, cap=self.pool_caps.get(cls, POOL_CAP))
+        return pool
+
+    def pool_stats(self) -> dict[str, dict]:
+        """Hit rates and sizes of the pools, by class name."""
+        return {cls.__name__: pool.stats() for cls, pool in self.pools.items()}